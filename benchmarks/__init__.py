@@ -0,0 +1,5 @@
+"""
+Benchmarks for the template service hot paths
+
+Run with ``python -m benchmarks run``; see docs/README.md.
+"""
@@ -0,0 +1,280 @@
+"""
+Command line entry point: python -m benchmarks run|compare|load
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import shutil
+import sys
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from .synthetic import SYNTHETIC_TEMPLATES, build_synthetic
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_WORK_DIR = REPO_ROOT / "runtime" / "bench"
+DEFAULT_BASELINE = Path(__file__).resolve().parent / "baselines" / "reference.json"
+
+
+def prepare_environment(work_dir: Path, synthetic: bool) -> Tuple[List[str], List[str]]:
+    """
+    Point the service at a private copy of the bundled templates (plus the
+    synthetic ones) and private cache, catalog and key files, then chdir into
+    ``work_dir`` so nothing is written to the checkout. Must run before the
+    service is imported. Returns (bundled template names, synthetic names).
+    """
+    templates_dir = work_dir / "templates"
+    templates_dir.mkdir(parents=True, exist_ok=True)
+    bundled = sorted(path.name for path in (REPO_ROOT / "templates").iterdir() if path.is_dir())
+    for name in bundled:
+        shutil.rmtree(templates_dir / name, ignore_errors=True)
+        shutil.copytree(REPO_ROOT / "templates" / name, templates_dir / name)
+    synthetic_names = []
+    if synthetic:
+        for spec in SYNTHETIC_TEMPLATES.values():
+            print(f"Preparing {spec.name}...", file=sys.stderr)
+            build_synthetic(templates_dir, spec)
+            synthetic_names.append(spec.name)
+
+    for candidate in ("config/settings.yaml", "settings.yaml"):
+        if (REPO_ROOT / candidate).is_file():
+            os.environ.setdefault("SETTINGS_FILE", str(REPO_ROOT / candidate))
+            break
+    os.environ.update({
+        "TEMPLATES_DIR": str(templates_dir),
+        "CATALOG_PATH": str(work_dir / "catalog.sqlite3"),
+        "ARTIFACT_CACHE_DIR": str(work_dir / "artifacts"),
+        "JOBS_DIR": str(work_dir / "jobs"),
+        "API_KEYS_FILE": str(work_dir / "api_keys.json"),
+        # Measure rendering, not cache lookups or quota rejections
+        "ARTIFACT_CACHE_ENABLED": "false",
+        "RATE_LIMIT_ENABLED": "false",
+    })
+    os.chdir(work_dir)
+    if str(REPO_ROOT) not in sys.path:
+        sys.path.insert(0, str(REPO_ROOT))
+    return bundled, synthetic_names
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+            rss_tolerance: float) -> List[str]:
+    """Describe every case that got slower or bigger than the baseline allows"""
+    regressions = []
+    for name, base in baseline.get("results", {}).items():
+        result = current.get("results", {}).get(name)
+        if result is None:
+            continue
+        # Both must agree: one noisy run moves one of them, a real slowdown moves both
+        slower = base["p50_ms"] and result["p50_ms"] > base["p50_ms"] * (1 + tolerance)
+        fewer = result["throughput"] and base["throughput"] > result["throughput"] * (1 + tolerance)
+        if slower and fewer:
+            regressions.append(
+                f"{name}: p50 {result['p50_ms']:.3f} ms vs {base['p50_ms']:.3f} ms, "
+                f"throughput {result['throughput']:.1f}/s vs {base['throughput']:.1f}/s"
+            )
+        # Small absolute differences are allocator noise
+        rss_growth = result["peak_rss_mb"] - base["peak_rss_mb"]
+        if base["peak_rss_mb"] and rss_growth > 8 and rss_growth > base["peak_rss_mb"] * rss_tolerance:
+            regressions.append(f"{name}: peak RSS {result['peak_rss_mb']:.1f} MB vs {base['peak_rss_mb']:.1f} MB")
+    return regressions
+
+
+def print_table(results: List[Dict[str, Any]]):
+    width = max([len(result["name"]) for result in results] + [4])
+    print(f"{'case':<{width}}  {'runs':>6}  {'ops/s':>10}  {'p50 ms':>10}  {'p99 ms':>10}  {'RSS MB':>8}")
+    for result in results:
+        print(f"{result['name']:<{width}}  {result['runs']:>6}  {result['throughput']:>10.1f}  "
+              f"{result['p50_ms']:>10.3f}  {result['p99_ms']:>10.3f}  {result['peak_rss_mb']:>8.1f}")
+
+
+def load_report(path: Path) -> Dict[str, Any]:
+    return json.loads(path.read_text())
+
+
+def run(args) -> int:
+    save = Path(args.save).resolve() if args.save else None
+    baseline_path = Path(args.compare).resolve() if args.compare else None
+    work_dir = Path(args.work_dir).resolve()
+    bundled, synthetic = prepare_environment(work_dir, not args.no_synthetic)
+
+    from .harness import run_isolated
+    from .suite import CASES, plan_cases
+
+    templates = args.templates.split(",") if args.templates else bundled + synthetic
+    cases = args.cases.split(",") if args.cases else list(CASES)
+    unknown = sorted(set(cases) - set(CASES))
+    if unknown:
+        print(f"Unknown cases: {', '.join(unknown)} (choose from {', '.join(CASES)})", file=sys.stderr)
+        return 2
+
+    results = []
+    for case in plan_cases(templates, cases, args.min_time, frozenset(synthetic)):
+        measurement = run_isolated(case)
+        results.append(measurement.to_dict())
+        print(f"  {measurement.name}: p50 {measurement.p50_ms:.3f} ms, {measurement.throughput:.1f}/s",
+              file=sys.stderr)
+
+    report = {
+        "meta": {
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "min_time": args.min_time,
+        },
+        "results": {result["name"]: result for result in results},
+    }
+    print_table(results)
+    if save is not None:
+        save.parent.mkdir(parents=True, exist_ok=True)
+        save.write_text(json.dumps(report, indent=2) + "\n")
+        print(f"Saved {len(results)} results to {save}")
+    if baseline_path is not None:
+        return report_regressions(report, load_report(baseline_path), args.tolerance, args.rss_tolerance)
+    return 0
+
+
+def report_regressions(current: Dict[str, Any], baseline: Dict[str, Any], tolerance: float,
+                       rss_tolerance: float) -> int:
+    regressions = compare(current, baseline, tolerance, rss_tolerance)
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) against the baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print("✅ No regressions against the baseline")
+    return 0
+
+
+def find_api_key(explicit: Optional[str]) -> Optional[str]:
+    """--api-key, then BOILERFAB_API_KEY, then api_config.json (as written by the service or compose)"""
+    if explicit:
+        return explicit
+    if os.environ.get("BOILERFAB_API_KEY"):
+        return os.environ["BOILERFAB_API_KEY"]
+    for config in (Path(os.environ.get("API_CONFIG_FILE", "api_config.json")), Path("runtime/api_config.json")):
+        if config.is_file():
+            return json.loads(config.read_text()).get("api_key")
+    return None
+
+
+def load(args) -> int:
+    from .load import RequestPlanner, asgi_sender, discover_templates, http_sender, parse_mix, \
+        print_levels, saturation_point, sweep
+
+    try:
+        mix = parse_mix(args.mix)
+        levels = sorted({int(level) for level in args.concurrency.split(",") if level.strip()})
+    except ValueError as e:
+        print(e, file=sys.stderr)
+        return 2
+    save = Path(args.save).resolve() if args.save else None
+    close = None
+    if args.url:
+        api_key = find_api_key(args.api_key)
+        if api_key is None:
+            print("No API key: pass --api-key, set BOILERFAB_API_KEY or run next to api_config.json",
+                  file=sys.stderr)
+            return 2
+        send, close = http_sender(args.url, api_key, max(levels))
+        target = args.url
+    else:
+        prepare_environment(Path(args.work_dir).resolve(), args.synthetic)
+        if args.cache:
+            os.environ["ARTIFACT_CACHE_ENABLED"] = "true"
+        from services.template_service.auth.api_key import api_key_manager
+        from services.template_service.main import app
+        send = asgi_sender(app, api_key_manager.get_api_key())
+        target = "in-process"
+
+    async def drive():
+        templates = await discover_templates(send, args.templates.split(",") if args.templates else None)
+        planner = RequestPlanner(mix, templates, unique_projects=not args.repeat_projects)
+        print(f"Load test against {target}: {', '.join(templates)}; mix {args.mix}", file=sys.stderr)
+        return await sweep(send, planner, levels, args.duration, args.warmup,
+                           lambda line: print(line, file=sys.stderr))
+
+    try:
+        results = asyncio.run(drive())
+    except RuntimeError as e:
+        print(e, file=sys.stderr)
+        return 1
+    finally:
+        if close is not None:
+            close()
+
+    saturation = saturation_point(results, args.max_error_rate)
+    print_levels(results, saturation, args.max_error_rate)
+    if save is not None:
+        save.parent.mkdir(parents=True, exist_ok=True)
+        save.write_text(json.dumps({
+            "meta": {
+                "created_at": datetime.now().isoformat(timespec="seconds"),
+                "target": target,
+                "mix": mix,
+                "duration": args.duration,
+                "cpu_count": os.cpu_count(),
+            },
+            "levels": [asdict(result) for result in results],
+            "saturation": saturation.concurrency if saturation else None,
+        }, indent=2) + "\n")
+        print(f"Saved {len(results)} levels to {save}")
+    return 0 if saturation is not None else 1
+
+
+def add_compare_options(parser: argparse.ArgumentParser):
+    parser.add_argument("--tolerance", type=float, default=0.3,
+                        help="Allowed slowdown in p50 latency and throughput (0.3 = 30%%)")
+    parser.add_argument("--rss-tolerance", type=float, default=0.25, help="Allowed growth in peak RSS")
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(prog="boilerfab-bench", description="BoilerFab benchmarks")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = subparsers.add_parser("run", help="Run the hot-path benchmarks")
+    run_parser.add_argument("--templates", help="Comma-separated templates (default: all, plus synthetic)")
+    run_parser.add_argument("--cases", help="Comma-separated cases: list,validate,customize,generate,e2e")
+    run_parser.add_argument("--no-synthetic", action="store_true", help="Skip the 10k-file and 100 MB templates")
+    run_parser.add_argument("--min-time", type=float, default=1.0, help="Seconds to spend per case")
+    run_parser.add_argument("--work-dir", default=str(DEFAULT_WORK_DIR), help="Scratch directory")
+    run_parser.add_argument("--save", help="Write results as JSON (e.g. a new baseline)")
+    run_parser.add_argument("--compare", nargs="?", const=str(DEFAULT_BASELINE),
+                            help="Fail if slower than this baseline (default: the reference baseline)")
+    add_compare_options(run_parser)
+
+    compare_parser = subparsers.add_parser("compare", help="Compare two saved result files")
+    compare_parser.add_argument("current")
+    compare_parser.add_argument("baseline", nargs="?", default=str(DEFAULT_BASELINE))
+    add_compare_options(compare_parser)
+
+    load_parser = subparsers.add_parser("load", help="Load-test a service over a concurrency sweep")
+    load_parser.add_argument("--url", help="Base URL of a running service (default: drive the app in-process)")
+    load_parser.add_argument("--api-key", help="API key for --url (default: BOILERFAB_API_KEY or api_config.json)")
+    load_parser.add_argument("--mix", default="list=1,detail=2,validate=4,generate=3",
+                             help="Weighted operations: list, detail, validate, generate")
+    load_parser.add_argument("--templates", help="Comma-separated templates (default: every listed template)")
+    load_parser.add_argument("--concurrency", default="1,2,4,8,16,32", help="Concurrent clients per level")
+    load_parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds per level")
+    load_parser.add_argument("--warmup", type=float, default=1.0, help="Unmeasured seconds before each level")
+    load_parser.add_argument("--max-error-rate", type=float, default=0.01,
+                             help="Levels with more errors than this cannot be the saturation point")
+    load_parser.add_argument("--repeat-projects", action="store_true",
+                             help="Reuse one project name so repeated generations can hit the artifact cache")
+    load_parser.add_argument("--cache", action="store_true", help="In-process: keep the artifact cache enabled")
+    load_parser.add_argument("--synthetic", action="store_true", help="In-process: add the synthetic templates")
+    load_parser.add_argument("--work-dir", default=str(DEFAULT_WORK_DIR), help="In-process scratch directory")
+    load_parser.add_argument("--save", help="Write the sweep as JSON")
+
+    args = parser.parse_args(argv)
+    if args.command == "run":
+        sys.exit(run(args))
+    if args.command == "load":
+        sys.exit(load(args))
+    sys.exit(report_regressions(
+        load_report(Path(args.current)), load_report(Path(args.baseline)), args.tolerance, args.rss_tolerance
+    ))
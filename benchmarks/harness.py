@@ -0,0 +1,122 @@
+"""
+Timing harness: repeated calls, latency percentiles and peak RSS per case
+"""
+import math
+import multiprocessing
+import resource
+import sys
+import time
+import traceback
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+
+@dataclass
+class Measurement:
+    name: str
+    runs: int
+    seconds: float
+    throughput: float
+    p50_ms: float
+    p99_ms: float
+    mean_ms: float
+    peak_rss_mb: float = 0.0
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+_SAMPLE_VALUES = {"string": "demo", "integer": 1, "float": 1.5, "number": 1, "boolean": True}
+
+
+def sample_parameters(parameters: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Values for every declared parameter (metadata.json form), valid under its type and constraints"""
+    values = {}
+    for parameter in parameters:
+        if parameter.get("enum"):
+            values[parameter["name"]] = parameter["enum"][0]
+        elif parameter.get("default") is not None:
+            values[parameter["name"]] = parameter["default"]
+        elif parameter.get("minimum") is not None:
+            values[parameter["name"]] = parameter["minimum"]
+        else:
+            values[parameter["name"]] = _SAMPLE_VALUES.get(parameter.get("type"), "demo")
+    return values
+
+
+def percentile(sorted_values: List[float], fraction: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, math.ceil(fraction * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports KiB, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def measure(name: str, func: Callable[[Any], Any], setup: Optional[Callable[[], Any]] = None,
+            min_time: float = 1.0, min_runs: int = 5, max_runs: int = 200_000, warmup: int = 1) -> Measurement:
+    """
+    Call ``func`` until ``min_time`` has passed and it ran at least ``min_runs``
+    times. ``setup`` runs untimed before every call and its result is passed
+    to ``func``; warmup calls are not recorded.
+    """
+    for _ in range(warmup):
+        func(setup() if setup else None)
+    latencies = []
+    total = 0.0
+    perf_counter = time.perf_counter
+    while len(latencies) < max_runs and (total < min_time or len(latencies) < min_runs):
+        argument = setup() if setup else None
+        started = perf_counter()
+        func(argument)
+        elapsed = perf_counter() - started
+        latencies.append(elapsed)
+        total += elapsed
+    latencies.sort()
+    return Measurement(
+        name=name,
+        runs=len(latencies),
+        seconds=round(total, 6),
+        throughput=round(len(latencies) / total, 3) if total else 0.0,
+        p50_ms=round(percentile(latencies, 0.50) * 1000, 4),
+        p99_ms=round(percentile(latencies, 0.99) * 1000, 4),
+        mean_ms=round(total / len(latencies) * 1000, 4),
+    )
+
+
+def _child(connection, case: Callable[[], Measurement]):
+    try:
+        result = case()
+        result.peak_rss_mb = round(peak_rss_mb(), 1)
+        connection.send(("ok", result))
+    except BaseException:
+        connection.send(("error", traceback.format_exc()))
+    finally:
+        connection.close()
+
+
+def run_isolated(case: Callable[[], Measurement]) -> Measurement:
+    """
+    Run one case in a forked child so its peak RSS is its own and caches it
+    fills do not leak into the next case.
+    """
+    context = multiprocessing.get_context("fork")
+    parent, child = context.Pipe(duplex=False)
+    process = context.Process(target=_child, args=(child, case))
+    process.start()
+    child.close()
+    try:
+        status, payload = parent.recv()
+    except EOFError:
+        status, payload = "error", f"benchmark process exited with code {process.exitcode}"
+    process.join()
+    if status != "ok":
+        raise RuntimeError(payload)
+    return payload
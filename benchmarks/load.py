@@ -0,0 +1,273 @@
+"""
+Closed-loop load generator with concurrency sweeps
+
+Drives either a running service over HTTP (standard library only) or the
+app in-process through the ASGI client, with a weighted mix of list,
+detail, validate and generate calls.
+"""
+import asyncio
+import http.client
+import itertools
+import json
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote, urlsplit
+
+from .harness import percentile, sample_parameters
+
+OPERATIONS = ("list", "detail", "validate", "generate")
+
+DEFAULT_MIX = {"list": 1, "detail": 2, "validate": 4, "generate": 3}
+
+
+@dataclass
+class Request:
+    operation: str
+    method: str
+    path: str
+    body: Optional[Dict[str, Any]] = None
+
+
+# send(request, keep_body) -> (status, response size, body if keep_body else b""); raises on transport errors
+Sender = Callable[[Request, bool], Awaitable[Tuple[int, int, bytes]]]
+
+
+@dataclass
+class LevelResult:
+    concurrency: int
+    requests: int
+    seconds: float
+    throughput: float
+    p50_ms: float
+    p90_ms: float
+    p99_ms: float
+    error_rate: float
+    bytes_received: int
+    statuses: Dict[str, int] = field(default_factory=dict)
+    operations: Dict[str, Dict[str, float]] = field(default_factory=dict)
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    """'list=1,generate=3' -> {'list': 1.0, 'generate': 3.0}"""
+    mix = {}
+    for part in filter(None, (item.strip() for item in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in OPERATIONS:
+            raise ValueError(f"Unknown operation '{name}' (choose from {', '.join(OPERATIONS)})")
+        mix[name] = float(weight or 1)
+    if not mix or sum(mix.values()) <= 0:
+        raise ValueError("The mix needs at least one operation with a positive weight")
+    return mix
+
+
+class RequestPlanner:
+    """Picks the next request from the weighted mix, round-robin over templates"""
+
+    def __init__(self, mix: Dict[str, float], templates: Dict[str, Dict[str, Any]], unique_projects: bool,
+                 seed: int = 42):
+        self.operations = [name for name, weight in mix.items() if weight > 0]
+        self.weights = [mix[name] for name in self.operations]
+        self.templates = templates
+        self.names = list(templates)
+        self.unique_projects = unique_projects
+        self._random = random.Random(seed)
+        self._counter = itertools.count()
+
+    def next(self) -> Request:
+        operation = self._random.choices(self.operations, self.weights)[0]
+        index = next(self._counter)
+        template = self.names[index % len(self.names)]
+        parameters = self.templates[template]
+        if operation == "list":
+            return Request(operation, "GET", "/api/v1/templates")
+        if operation == "detail":
+            return Request(operation, "GET", f"/api/v1/templates/{quote(template)}")
+        if operation == "validate":
+            return Request(operation, "POST", f"/api/v1/templates/{quote(template)}/validate-parameters", parameters)
+        project = f"load-{index}" if self.unique_projects else "load-project"
+        return Request(operation, "POST", "/api/v1/generate",
+                       {"template_name": template, "project_name": project, "parameters": parameters})
+
+
+def http_sender(base_url: str, api_key: str, concurrency: int) -> Tuple[Sender, Callable[[], None]]:
+    """Sender for a running service: one keep-alive connection per worker thread"""
+    parts = urlsplit(base_url)
+    connection_class = http.client.HTTPSConnection if parts.scheme == "https" else http.client.HTTPConnection
+    local = threading.local()
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="boilerfab-load")
+    headers = {"X-API-Key": api_key, "Content-Type": "application/json"}
+
+    def blocking(request: Request, keep_body: bool) -> Tuple[int, int, bytes]:
+        connection = getattr(local, "connection", None)
+        if connection is None:
+            connection = local.connection = connection_class(parts.hostname, parts.port, timeout=120)
+        body = json.dumps(request.body) if request.body is not None else None
+        try:
+            connection.request(request.method, request.path, body=body, headers=headers)
+            response = connection.getresponse()
+            size = 0
+            chunks = []
+            # Archives can be large: count them, keep only what the caller needs
+            while True:
+                chunk = response.read(65536)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if keep_body:
+                    chunks.append(chunk)
+            return response.status, size, b"".join(chunks)
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            local.connection = None
+            raise
+
+    async def send(request: Request, keep_body: bool = False) -> Tuple[int, int, bytes]:
+        return await asyncio.get_running_loop().run_in_executor(executor, blocking, request, keep_body)
+
+    return send, lambda: executor.shutdown(wait=False)
+
+
+def asgi_sender(app, api_key: str) -> Sender:
+    """Sender for the app running in this process"""
+    from .asgi import asgi_request
+
+    headers = {"X-API-Key": api_key}
+
+    async def send(request: Request, keep_body: bool = False) -> Tuple[int, int, bytes]:
+        response = await asgi_request(app, request.method, request.path, headers, request.body)
+        return response.status, len(response.body), response.body if keep_body else b""
+
+    return send
+
+
+async def run_level(send: Sender, planner: RequestPlanner, concurrency: int, duration: float,
+                    warmup: float = 0.0) -> LevelResult:
+    """Keep ``concurrency`` requests in flight for ``duration`` seconds (after ``warmup``)"""
+    loop = asyncio.get_running_loop()
+    record_from = loop.time() + warmup
+    stop_at = record_from + duration
+    samples: List[Tuple[str, float, str]] = []
+    received = 0
+
+    async def worker():
+        nonlocal received
+        while loop.time() < stop_at:
+            request = planner.next()
+            started = time.perf_counter()
+            try:
+                status, size, _ = await send(request, False)
+                outcome = str(status)
+            except Exception as e:
+                size, outcome = 0, type(e).__name__
+            elapsed = time.perf_counter() - started
+            if loop.time() >= record_from:
+                samples.append((request.operation, elapsed, outcome))
+                received += size
+
+    started = loop.time()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    seconds = max(loop.time() - max(started, record_from), 1e-9)
+    return summarize(concurrency, samples, seconds, received)
+
+
+def _is_error(outcome: str) -> bool:
+    return not (outcome.isdigit() and 200 <= int(outcome) < 400)
+
+
+def summarize(concurrency: int, samples: List[Tuple[str, float, str]], seconds: float,
+              received: int) -> LevelResult:
+    latencies = sorted(elapsed for _, elapsed, _ in samples)
+    errors = sum(1 for _, _, outcome in samples if _is_error(outcome))
+    operations = {}
+    for operation in sorted({operation for operation, _, _ in samples}):
+        timings = sorted(elapsed for name, elapsed, _ in samples if name == operation)
+        operations[operation] = {
+            "requests": len(timings),
+            "p50_ms": round(percentile(timings, 0.50) * 1000, 3),
+            "p99_ms": round(percentile(timings, 0.99) * 1000, 3),
+            "errors": sum(1 for name, _, outcome in samples if name == operation and _is_error(outcome)),
+        }
+    return LevelResult(
+        concurrency=concurrency,
+        requests=len(samples),
+        seconds=round(seconds, 3),
+        throughput=round((len(samples) - errors) / seconds, 2),
+        p50_ms=round(percentile(latencies, 0.50) * 1000, 3),
+        p90_ms=round(percentile(latencies, 0.90) * 1000, 3),
+        p99_ms=round(percentile(latencies, 0.99) * 1000, 3),
+        error_rate=round(errors / len(samples), 4) if samples else 0.0,
+        bytes_received=received,
+        statuses=dict(Counter(outcome for _, _, outcome in samples)),
+        operations=operations,
+    )
+
+
+def saturation_point(levels: List[LevelResult], max_error_rate: float = 0.01,
+                     threshold: float = 0.95) -> Optional[LevelResult]:
+    """
+    The lowest concurrency that reaches ``threshold`` of the best error-free
+    throughput: past it, more clients only add queueing latency. None if every
+    level has too many errors.
+    """
+    healthy = [level for level in levels if level.error_rate <= max_error_rate]
+    if not healthy:
+        return None
+    best = max(level.throughput for level in healthy)
+    for level in sorted(healthy, key=lambda level: level.concurrency):
+        if level.throughput >= best * threshold:
+            return level
+    return None
+
+
+async def _get_json(send: Sender, path: str) -> Any:
+    status, _, body = await send(Request("discover", "GET", path), True)
+    if status != 200:
+        raise RuntimeError(f"GET {path} failed with HTTP {status}: {body[:200].decode(errors='replace')}")
+    return json.loads(body)
+
+
+async def discover_templates(send: Sender, names: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+    """Template name -> sample parameters, read from the service under test"""
+    if not names:
+        names = [template["name"] for template in await _get_json(send, "/api/v1/templates")]
+    if not names:
+        raise RuntimeError("The service has no templates to load-test")
+    templates = {}
+    for name in names:
+        detail = await _get_json(send, f"/api/v1/templates/{quote(name)}")
+        templates[name] = sample_parameters(detail.get("parameters", []))
+    return templates
+
+
+async def sweep(send: Sender, planner: RequestPlanner, levels: List[int], duration: float, warmup: float,
+                log: Callable[[str], None] = lambda line: None) -> List[LevelResult]:
+    """Run one level per concurrency, lowest first"""
+    results = []
+    for concurrency in levels:
+        result = await run_level(send, planner, concurrency, duration, warmup)
+        log(f"  {concurrency} clients: {result.throughput:.1f} req/s, p99 {result.p99_ms:.1f} ms, "
+            f"{result.error_rate:.2%} errors")
+        results.append(result)
+    return results
+
+
+def print_levels(levels: List[LevelResult], saturation: Optional[LevelResult], max_error_rate: float):
+    print(f"{'clients':>7}  {'req/s':>9}  {'p50 ms':>9}  {'p90 ms':>9}  {'p99 ms':>9}  {'errors':>7}  statuses")
+    for level in levels:
+        statuses = " ".join(f"{status}:{count}" for status, count in sorted(level.statuses.items()))
+        flag = "  <- saturation" if saturation is level else ""
+        print(f"{level.concurrency:>7}  {level.throughput:>9.1f}  {level.p50_ms:>9.2f}  {level.p90_ms:>9.2f}  "
+              f"{level.p99_ms:>9.2f}  {level.error_rate:>7.2%}  {statuses}{flag}")
+    if saturation is None:
+        print(f"No level stayed under {max_error_rate:.0%} errors; the service is overloaded at every level")
+    elif saturation is levels[-1] and len(levels) > 1:
+        print(f"Throughput still rising at {saturation.concurrency} clients ({saturation.throughput:.1f} req/s); "
+              f"extend --concurrency to find the saturation point")
+    else:
+        print(f"Saturation at {saturation.concurrency} concurrent clients: {saturation.throughput:.1f} req/s, "
+              f"p99 {saturation.p99_ms:.1f} ms. More clients add latency, not throughput.")
@@ -0,0 +1,121 @@
+"""
+Benchmark cases for the template service
+
+Import this module only after ``cli.prepare_environment()``: the service
+reads its settings at import time.
+"""
+import asyncio
+import shutil
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+from services.template_service.auth.api_key import api_key_manager
+from services.template_service.main import app
+from services.template_service.utils.template_service import (
+    customize_project,
+    generate_project_zip,
+    get_available_templates,
+    get_template_detail,
+    validate_parameters
+)
+from .asgi import asgi_request
+from .harness import Measurement, measure, sample_parameters
+
+CASES = ("list", "validate", "customize", "generate", "e2e")
+
+PROJECT_NAME = "bench-project"
+
+
+def _timing(heavy: bool, min_time: float) -> Dict[str, Any]:
+    # Synthetic templates take seconds per call; a few runs are enough
+    return {"min_time": min_time, "min_runs": 3 if heavy else 5}
+
+
+def list_case(min_time: float) -> Callable[[], Measurement]:
+    def run() -> Measurement:
+        result = measure("list", lambda _: get_available_templates(), min_time=min_time)
+        result.extra = {"case": "list", "templates": len(get_available_templates())}
+        return result
+    return run
+
+
+def template_case(case: str, template: str, min_time: float, heavy: bool = False) -> Callable[[], Measurement]:
+    """One hot path for one template, as a callable to hand to run_isolated()"""
+    def run() -> Measurement:
+        parameters = sample_parameters([p.model_dump() for p in get_template_detail(template).parameters])
+        name = f"{case}/{template}"
+        extra = {"case": case, "template": template}
+        timing = _timing(heavy, min_time)
+
+        if case == "validate":
+            result = measure(name, lambda _: validate_parameters(template, parameters), **timing)
+        elif case == "generate":
+            sizes = []
+            result = measure(
+                name, lambda _: sizes.append(len(generate_project_zip(template, PROJECT_NAME, parameters).getbuffer())),
+                **timing
+            )
+            extra["archive_bytes"] = sizes[-1]
+        elif case == "customize":
+            result = _measure_customize(name, template, parameters, timing)
+        elif case == "e2e":
+            result = _measure_e2e(name, template, parameters, timing)
+            extra["status"] = 200
+        else:
+            raise ValueError(f"Unknown benchmark case '{case}'")
+        result.extra = extra
+        return result
+    return run
+
+
+def _measure_customize(name: str, template: str, parameters: Dict[str, Any], timing: Dict[str, Any]) -> Measurement:
+    """customize_project() on a fresh copy of the template each run; copying is not timed"""
+    from services.template_service.utils.registry import template_registry
+
+    source = template_registry.get_path(template)
+    scratch = Path(tempfile.mkdtemp(prefix="boilerfab-bench-"))
+    target = scratch / "project"
+
+    def setup() -> Path:
+        shutil.rmtree(target, ignore_errors=True)
+        shutil.copytree(source, target)
+        return target
+
+    def run(path: Path):
+        customize_project(path, PROJECT_NAME, parameters)
+
+    try:
+        return measure(name, run, setup=setup, **timing)
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+def _measure_e2e(name: str, template: str, parameters: Dict[str, Any], timing: Dict[str, Any]) -> Measurement:
+    """POST /api/v1/generate through the full middleware stack, reading the whole body"""
+    loop = asyncio.new_event_loop()
+    headers = {"X-API-Key": api_key_manager.get_api_key()}
+    payload = {"template_name": template, "project_name": PROJECT_NAME, "parameters": parameters}
+
+    def run(_):
+        response = loop.run_until_complete(asgi_request(app, "POST", "/api/v1/generate", headers, payload))
+        if response.status != 200:
+            raise RuntimeError(f"{name}: HTTP {response.status}: {response.body[:200]!r}")
+
+    try:
+        return measure(name, run, **timing)
+    finally:
+        loop.close()
+
+
+def plan_cases(templates: List[str], cases: List[str], min_time: float,
+               heavy: frozenset = frozenset()) -> List[Callable[[], Measurement]]:
+    planned = []
+    if "list" in cases:
+        planned.append(list_case(min_time))
+    for case in cases:
+        if case == "list":
+            continue
+        for template in templates:
+            planned.append(template_case(case, template, min_time, template in heavy))
+    return planned
@@ -0,0 +1,79 @@
+"""
+Synthetic templates for worst-case sizes: many small files, or a few very large ones
+"""
+import json
+import random
+import shutil
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict
+
+
+@dataclass(frozen=True)
+class SyntheticSpec:
+    name: str
+    files: int
+    total_bytes: int
+    # Share of files that are placeholder-bearing text; the rest are random binary
+    text_ratio: float = 1.0
+    seed: int = 1234
+
+
+SYNTHETIC_TEMPLATES: Dict[str, SyntheticSpec] = {
+    spec.name: spec for spec in (
+        SyntheticSpec("synthetic-10k-files", files=10_000, total_bytes=10 * 1024 * 1024),
+        SyntheticSpec("synthetic-100mb", files=200, total_bytes=100 * 1024 * 1024, text_ratio=0.5),
+    )
+}
+
+_LINE = "def handler_{index}():  # {{{{PROJECT_NAME}}}} by {{{{author}}}}\n    return '{{{{PROJECT_NAME}}}}-{index}'\n"
+
+
+def _text(size: int, rng: random.Random) -> bytes:
+    lines = []
+    length = 0
+    while length < size:
+        line = _LINE.format(index=rng.randrange(1_000_000))
+        lines.append(line)
+        length += len(line)
+    return "".join(lines).encode()[:size]
+
+
+def build_synthetic(root: Path, spec: SyntheticSpec) -> Path:
+    """
+    Write the template under ``root`` unless an identical one is already
+    there; the content is deterministic for a given spec.
+    """
+    path = root / spec.name
+    # Kept next to the template, not in it, so it never ends up in generated projects
+    marker = root / f".{spec.name}.json"
+    if marker.exists() and json.loads(marker.read_text()) == asdict(spec):
+        return path
+    if path.exists():
+        shutil.rmtree(path)
+    path.mkdir(parents=True)
+
+    rng = random.Random(spec.seed)
+    per_file = max(1, spec.total_bytes // spec.files)
+    text_files = int(spec.files * spec.text_ratio)
+    for index in range(spec.files):
+        directory = path / f"pkg_{index % 100:02d}"
+        directory.mkdir(exist_ok=True)
+        if index < text_files:
+            (directory / f"module_{index}.py").write_bytes(_text(per_file, rng))
+        else:
+            (directory / f"blob_{index}.bin").write_bytes(rng.randbytes(per_file))
+
+    metadata = {
+        "name": spec.name,
+        "description": f"Synthetic benchmark template: {spec.files} files, {spec.total_bytes // (1024 * 1024)} MB",
+        "version": "1.0.0",
+        "author": "benchmarks",
+        "tags": ["synthetic", "benchmark"],
+        "parameters": [
+            {"name": "author", "type": "string", "description": "Author name", "default": "bench", "required": False}
+        ]
+    }
+    (path / "metadata.json").write_text(json.dumps(metadata, indent=2))
+    marker.write_text(json.dumps(asdict(spec)))
+    return path
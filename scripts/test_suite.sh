@@ -10,7 +10,11 @@ start_service() {
     echo "Starting service..."
             python -c 'from services.template_service import main; import uvicorn; uvicorn.run("services.template_service.main:app", host="127.0.0.1", port=8000, log_level="error")' > /dev/null 2>&1 || true
     SERVICE_PID=$!
-    sleep 3  # Wait for service to start
+    # Wait until startup warm-up is done (up to 30s)
+    for _ in $(seq 300); do
+        curl -sf http://localhost:8000/readyz > /dev/null 2>&1 && break
+        sleep 0.1
+    done
     echo "Service started with PID: $SERVICE_PID"
 }
 
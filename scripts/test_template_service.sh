@@ -9,7 +9,11 @@ echo "Starting FastAPI Template Service End-to-End Test..."
 echo "Starting service..."
 make dev-run > /dev/null 2>&1 &
 SERVICE_PID=$!
-sleep 8  # Wait for service to start (include time to generate API key)
+# Wait until startup warm-up is done (up to 30s)
+for _ in $(seq 300); do
+    curl -sf http://localhost:8000/readyz > /dev/null 2>&1 && break
+    sleep 0.1
+done
 
 echo "Service started with PID: $SERVICE_PID"
 
@@ -1,18 +1,41 @@
 """
 API routes for the FastAPI Template Service
 """
-from fastapi import APIRouter, HTTPException, Request
-from fastapi.responses import StreamingResponse
-from typing import List, Dict, Any
-from ..models.schemas import TemplateInfo, TemplateMetadata, TemplateRegistrationRequest, GenerateRequest
+import asyncio
+import os
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+from starlette.background import BackgroundTask
+from typing import List, Dict, Any, Optional
+from ..models.schemas import TemplateInfo, TemplateMetadata, TemplateSearchResult, TemplateRegistrationRequest, GenerateRequest, BatchGenerateRequest, BatchValidateRequest, BatchValidateResponse, JobInfo
 from ..utils.template_service import (
     get_available_templates, 
-    generate_project_zip, 
+    prepare_generation,
+    prepare_batch,
+    stream_project_archive,
+    stream_batch_zip,
     get_template_detail,
     register_template,
-    validate_parameters
+    validate_parameters,
+    validate_batch,
+    unresolved_placeholders
 )
-from ..utils.auth import verify_api_key, require_api_key
+from ..auth.quota import quota_manager
+from ..config.settings import settings
+from ..utils.archive import ARCHIVE_FORMATS
+from ..utils.artifact_cache import artifact_cache, Artifact
+from ..utils.http_cache import CachedJSON, conditional_response
+from ..utils.jobs import job_manager, COMPLETED
+from ..utils.auth import require_admin
+from ..utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, GenerationTimings, registry as metrics_registry
+from ..utils.profiling import ProfilerBusyError, profiler, pstats_dump, pstats_text
+from ..utils.registry import template_registry
+from ..utils.search import search_index
+from ..utils.singleflight import single_flight
+from ..utils.snapshot import snapshot_store
+from ..utils.validators import ParameterValidationError, validator_cache
+from ..utils.warmup import warmup
+from ..utils.workers import generation_pool, PoolSaturatedError
 
 
 router = APIRouter()
@@ -20,15 +43,11 @@ router = APIRouter()
 
 @router.get("/", response_model=dict)
 async def root(request: Request):
-    if not verify_api_key(request):
-        raise HTTPException(status_code=401, detail="Invalid API Key")
     return {"message": "FastAPI Template Service", "status": "running"}
 
 
 @router.get("/health", response_model=dict)
 async def health(request: Request):
-    if not verify_api_key(request):
-        raise HTTPException(status_code=401, detail="Invalid API Key")
     return {"status": "healthy"}
 
 
@@ -38,27 +57,108 @@ async def healthz():
     return {"status": "healthy", "service": "boilerfab"}
 
 
+@router.get("/readyz", response_model=dict)
+async def readyz():
+    """Public readiness endpoint: 503 while warming; 200 once warm, or degraded after warm-up gave up"""
+    return JSONResponse(warmup.status(), status_code=200 if warmup.ready else 503)
+
+
 @router.get("/ping", response_model=dict)
 async def ping():
     """Simple ping endpoint for health checks"""
     return {"pong": True}
 
 
+@router.get("/metrics")
+async def metrics():
+    """Prometheus metrics in the text exposition format"""
+    return Response(metrics_registry.render(), media_type=METRICS_CONTENT_TYPE)
+
+
+# Handlers that touch the registry are plain functions: FastAPI runs them on its
+# threadpool, so catalog reconciles and metadata reads never block the event loop
+
 @router.get("/api/v1/templates", response_model=List[TemplateInfo])
-async def list_templates(request: Request):
-    """List all available templates"""
-    if not verify_api_key(request):
-        raise HTTPException(status_code=401, detail="Invalid API Key")
-    return get_available_templates()
+def list_templates(
+    request: Request,
+    limit: Optional[int] = Query(None, ge=1, le=settings.templates_page_max),
+    cursor: Optional[str] = None,
+    tag: Optional[List[str]] = Query(None),
+    author: Optional[str] = None,
+    fields: Optional[str] = None
+):
+    """
+    List available templates.
+
+    Filters by every ``tag`` given and by ``author``; ``limit``/``cursor`` page
+    through the result (the next cursor is sent in ``X-Next-Cursor``) and
+    ``fields`` is a comma-separated projection such as ``name,version``.
+    """
+    if limit is None and cursor is None and not tag and author is None and fields is None:
+        cached = template_registry.memoize(
+            "list", lambda: CachedJSON.from_payload(get_available_templates())
+        )
+        return conditional_response(request, cached)
+
+    projection = None
+    if fields is not None:
+        projection = {field.strip() for field in fields.split(",") if field.strip()}
+        unknown = projection - set(TemplateInfo.model_fields)
+        if unknown or not projection:
+            raise HTTPException(
+                status_code=400,
+                detail=f"Unknown fields: {', '.join(sorted(unknown)) or '(none given)'}"
+            )
+    try:
+        infos, next_cursor = template_registry.query(tag, author, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    payload = [info.model_dump(include=projection) for info in infos]
+    response = conditional_response(request, CachedJSON.from_payload(payload))
+    if next_cursor is not None:
+        response.headers["X-Next-Cursor"] = next_cursor
+        response.headers["Link"] = f'<{request.url.include_query_params(cursor=next_cursor)}>; rel="next"'
+    return response
+
+
+@router.get("/api/v1/templates/search", response_model=List[TemplateSearchResult])
+def search_templates(request: Request, q: str, limit: int = Query(20, ge=1, le=100)):
+    """Search template names, tags, descriptions and READMEs, best matches first"""
+    return [
+        TemplateSearchResult(**info.model_dump(), score=score)
+        for info, score in search_index.search(q, limit)
+    ]
+
+
+@router.get("/api/v1/registry/stats", response_model=dict)
+async def registry_stats(request: Request):
+    """Report template registry cache counters"""
+    return {**template_registry.stats(), "snapshots": snapshot_store.stats(), "search": search_index.stats(),
+            "validators": validator_cache.stats()}
+
+
+@router.get("/api/v1/cache/stats", response_model=dict)
+async def cache_stats(request: Request):
+    """Report generated-archive cache counters"""
+    return artifact_cache.stats()
+
+
+@router.get("/api/v1/pool/stats", response_model=dict)
+async def pool_stats(request: Request):
+    """Report generation worker pool usage"""
+    return {**generation_pool.stats(), "singleflight": single_flight.stats(), "jobs": job_manager.stats(),
+            "quotas": quota_manager.stats()}
 
 
 @router.get("/api/v1/templates/{template_name}", response_model=TemplateMetadata)
-async def get_template(template_name: str, request: Request):
+def get_template(template_name: str, request: Request):
     """Get detailed information about a specific template"""
-    if not verify_api_key(request):
-        raise HTTPException(status_code=401, detail="Invalid API Key")
     try:
-        return get_template_detail(template_name)
+        cached = template_registry.memoize(
+            ("detail", template_name), lambda: CachedJSON.from_payload(get_template_detail(template_name))
+        )
+        return conditional_response(request, cached)
     except FileNotFoundError:
         raise HTTPException(status_code=404, detail=f"Template '{template_name}' not found")
     except ValueError as e:
@@ -66,10 +166,8 @@ async def get_template(template_name: str, request: Request):
 
 
 @router.post("/api/v1/templates", status_code=201)
-async def create_template(request: TemplateRegistrationRequest, http_request: Request):
+def create_template(request: TemplateRegistrationRequest, http_request: Request):
     """Register a new template in the system"""
-    if not verify_api_key(http_request):
-        raise HTTPException(status_code=401, detail="Invalid API Key")
     try:
         success = register_template(request)
         if success:
@@ -82,18 +180,32 @@ async def create_template(request: TemplateRegistrationRequest, http_request: Re
         raise HTTPException(status_code=500, detail=f"Error registering template: {str(e)}")
 
 
+@router.post("/api/v1/templates/validate-parameters/batch", response_model=BatchValidateResponse)
+def validate_parameters_batch(request: BatchValidateRequest, http_request: Request):
+    """Validate many (template, parameters) pairs, reporting each item separately"""
+    if len(request.items) > settings.validate_batch_max_items:
+        raise HTTPException(status_code=400, detail=f"Batch is limited to {settings.validate_batch_max_items} items")
+    try:
+        results = validate_batch([(item.template_name, item.parameters) for item in request.items])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Error validating parameters: {str(e)}")
+    valid = sum(1 for result in results if result.valid)
+    return BatchValidateResponse(results=results, valid=valid, invalid=len(results) - valid)
+
+
 @router.post("/api/v1/templates/{template_name}/validate-parameters")
-async def validate_template_parameters(template_name: str, parameters: Dict[str, Any], http_request: Request):
+def validate_template_parameters(template_name: str, parameters: Dict[str, Any], http_request: Request):
     """Validate parameters against a template's requirements"""
-    if not verify_api_key(http_request):
-        raise HTTPException(status_code=401, detail="Invalid API Key")
     try:
         validated_params = validate_parameters(template_name, parameters)
         return {
             "valid": True,
             "parameters": validated_params,
+            "unresolved_placeholders": unresolved_placeholders(template_name, validated_params),
             "message": "Parameters are valid for the template"
         }
+    except ParameterValidationError as e:
+        raise HTTPException(status_code=400, detail={"message": str(e), "errors": e.errors})
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except FileNotFoundError:
@@ -103,28 +215,273 @@ async def validate_template_parameters(template_name: str, parameters: Dict[str,
 
 
 @router.post("/api/v1/generate")
-async def generate_project(request: GenerateRequest, http_request: Request):
-    """Generate a project from a template and return as zip file"""
-    if not verify_api_key(http_request):
-        raise HTTPException(status_code=401, detail="Invalid API Key")
+async def generate_project(request: GenerateRequest, http_request: Request, compression: Optional[str] = None,
+                           archive_format: Optional[str] = Query(None, alias="format")):
+    """Generate a project from a template and return it as an archive (zip by default)"""
+    try:
+        slot = await generation_pool.acquire()
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    # Only set while an admin is profiling the next generate requests
+    ticket = profiler.claim()
+    artifact = None
+    background = None
     try:
-        zip_buffer = generate_project_zip(
+        try:
+            plan = await generation_pool.run(
+                ticket.wrap(prepare_generation) if ticket is not None else prepare_generation,
+                request.template_name,
+                request.project_name,
+                request.parameters,
+                compression,
+                archive_format
+            )
+        except FileNotFoundError as e:
+            slot.release()
+            raise HTTPException(status_code=404, detail=str(e))
+        except ValueError as e:
+            slot.release()
+            raise HTTPException(status_code=400, detail=str(e))
+        except Exception as e:
+            slot.release()
+            raise HTTPException(status_code=500, detail=f"Error generating project: {str(e)}")
+        http_request.state.timings = plan.timings
+
+        headers = {
+            "Content-Disposition": f"attachment; filename={plan.filename}"
+        }
+        if plan.unresolved:
+            headers["X-Unresolved-Placeholders"] = ",".join(plan.unresolved)
+
+        artifact = artifact_cache.get(plan.cache_key)
+        flight = None
+        # Followers are served from the leader's cached archive, so coalescing needs the cache
+        if artifact is None and settings.singleflight_enabled and artifact_cache.enabled:
+            flight, leader = single_flight.join(plan.cache_key)
+            if not leader:
+                # An identical generation is already running: wait for its result
+                # without holding a worker slot
+                slot.release()
+                artifact = await single_flight.wait(flight)
+                flight = None
+                if artifact is not None and artifact.data is None:
+                    # Read through a handle of our own; the entry may have been evicted since
+                    artifact = artifact_cache.get(plan.cache_key, count=False)
+                if artifact is not None:
+                    headers["X-Coalesced"] = "true"
+                else:
+                    try:
+                        slot = await generation_pool.acquire()
+                    except PoolSaturatedError as e:
+                        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+        if artifact is not None:
+            slot.release()
+            if ticket is not None:
+                ticket.close()
+            headers["X-Cache"] = "MISS" if "X-Coalesced" in headers else "HIT"
+            headers["Content-Length"] = str(artifact.size)
+            body = artifact_cache.iter_artifact(artifact)
+            if artifact.file is not None:
+                # Also runs when the client leaves before the body starts
+                background = BackgroundTask(artifact.file.close)
+        else:
+            chunks = stream_project_archive(plan)
+            if artifact_cache.enabled:
+                headers["X-Cache"] = "MISS"
+                chunks = artifact_cache.tee(plan.cache_key, chunks)
+            else:
+                headers["X-Cache"] = "BYPASS"
+            if ticket is not None:
+                chunks = ticket.iterate(chunks)
+            body = generation_pool.stream(slot, chunks)
+            if flight is not None:
+                body = single_flight.lead(flight, body, result=lambda: _shared_artifact(plan.cache_key))
+    except BaseException:
+        # Every early exit ends the request; on success the ticket is closed or handed to the stream
+        if ticket is not None:
+            ticket.close()
+        if artifact is not None and artifact.file is not None:
+            artifact.file.close()
+        raise
+
+    # Archive bytes are produced file by file on the worker pool while the
+    # response is sent
+    return StreamingResponse(
+        body,
+        media_type=plan.media_type,
+        headers=headers,
+        background=background
+    )
+
+
+def _shared_artifact(key: str) -> Optional[Artifact]:
+    """Result handed to coalesced followers once the leader's archive is cached"""
+    return artifact_cache.get(key, count=False, handle=False)
+
+
+@router.post("/api/v1/generate/batch")
+async def generate_batch(request: BatchGenerateRequest, http_request: Request, compression: Optional[str] = None):
+    """Generate several projects into one zip file, each under its own directory"""
+    if not request.items:
+        raise HTTPException(status_code=400, detail="Batch must contain at least one item")
+    if len(request.items) > settings.batch_max_items:
+        raise HTTPException(status_code=400, detail=f"Batch is limited to {settings.batch_max_items} items")
+    try:
+        slot = await generation_pool.acquire()
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+    timings = http_request.state.timings = GenerationTimings()
+    try:
+        plans = await generation_pool.run(
+            prepare_batch,
+            [(item.template_name, item.project_name, item.parameters) for item in request.items],
+            compression,
+            timings
+        )
+    except FileNotFoundError as e:
+        slot.release()
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        slot.release()
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        slot.release()
+        raise HTTPException(status_code=500, detail=f"Error generating projects: {str(e)}")
+
+    chunks = stream_batch_zip(
+        plans,
+        generation_pool.render_executor,
+        window=generation_pool.render_workers,
+        timings=timings
+    )
+    return StreamingResponse(
+        generation_pool.stream(slot, chunks),
+        media_type="application/zip",
+        headers={"Content-Disposition": f"attachment; filename={request.archive_name}.zip"}
+    )
+
+
+@router.post("/api/v1/jobs", status_code=202, response_model=JobInfo)
+async def create_job(request: GenerateRequest, http_request: Request, compression: Optional[str] = None,
+                     archive_format: Optional[str] = Query(None, alias="format")):
+    """Queue a project generation and return a job id to poll"""
+    # Validation counts against the same worker and queue limits as /generate
+    try:
+        slot = await generation_pool.acquire()
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+    try:
+        plan = await generation_pool.run(
+            prepare_generation,
             request.template_name,
             request.project_name,
-            request.parameters
-        )
-        
-        # Return the zip file as a streaming response
-        return StreamingResponse(
-            iter([zip_buffer.getvalue()]),
-            media_type="application/zip",
-            headers={
-                "Content-Disposition": f"attachment; filename={request.project_name}.zip"
-            }
+            request.parameters,
+            compression,
+            archive_format
         )
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating project: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"Error creating job: {str(e)}")
+    finally:
+        slot.release()
+    try:
+        job = job_manager.submit(plan)
+    except PoolSaturatedError as e:
+        raise HTTPException(status_code=503, detail="Job queue is full, retry later", headers={"Retry-After": str(e.retry_after)})
+    return job.to_info()
+
+
+@router.get("/api/v1/jobs/{job_id}", response_model=JobInfo)
+async def get_job(job_id: str, request: Request):
+    """Report the status and progress of a generation job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    return job.to_info()
+
+
+@router.get("/api/v1/jobs/{job_id}/artifact")
+async def get_job_artifact(job_id: str, request: Request):
+    """Download the archive produced by a completed job"""
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Job '{job_id}' not found")
+    if job.status != COMPLETED:
+        raise HTTPException(status_code=409, detail=f"Job '{job_id}' is {job.status}")
+    media_type, extension = ARCHIVE_FORMATS.get(job.format, ARCHIVE_FORMATS["zip"])
+    # Open before answering: the expiry sweeper may remove the file at any time
+    try:
+        f = open(job_manager.artifact_path(job_id), "rb")
+    except FileNotFoundError:
+        raise HTTPException(status_code=410, detail=f"Job '{job_id}' artifact has expired")
+    artifact = Artifact(key=job_id, size=os.fstat(f.fileno()).st_size, file=f)
+    return StreamingResponse(
+        artifact_cache.iter_artifact(artifact),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="{job.project_name}{extension}"',
+            "Content-Length": str(artifact.size)
+        },
+        # Also runs when the client leaves before the body starts
+        background=BackgroundTask(f.close)
+    )
+
+
+def _profiling_window(request: Request, seconds: float):
+    require_admin(request)
+    if not settings.profiling_enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    if seconds > settings.profiling_max_seconds:
+        raise HTTPException(status_code=400, detail=f"Profiling is limited to {settings.profiling_max_seconds:g} seconds")
+
+
+async def _run_profiler(func, *args):
+    # Off the generation pool: a profile must not take a worker slot from the traffic it observes
+    try:
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+    except ProfilerBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+
+
+@router.post("/api/v1/admin/profile/sample")
+async def profile_sample(request: Request, seconds: float = Query(5.0, gt=0),
+                         interval: float = Query(0.005, ge=0.001, le=1.0), idle: bool = False):
+    """Sample every thread's stack for ``seconds``; returns collapsed stacks for flame graphs"""
+    _profiling_window(request, seconds)
+    text, sweeps = await _run_profiler(profiler.sample, seconds, interval, idle)
+    return Response(text, media_type="text/plain; charset=utf-8", headers={"X-Profile-Sweeps": str(sweeps)})
+
+
+@router.post("/api/v1/admin/profile/requests")
+async def profile_requests(request: Request, requests: int = Query(10, ge=1, le=1000),
+                           timeout: float = Query(30.0, gt=0), format: str = Query("pstats", pattern="^(pstats|text)$"),
+                           limit: int = Query(50, ge=1)):
+    """cProfile the next ``requests`` generate calls; a pstats file or its text report"""
+    _profiling_window(request, timeout)
+    stats, completed = await _run_profiler(profiler.profile_requests, requests, timeout)
+    if stats is None:
+        raise HTTPException(status_code=404, detail=f"No generate requests were profiled within {timeout:g} seconds")
+    headers = {"X-Profiled-Requests": str(completed)}
+    if format == "text":
+        return Response(pstats_text(stats, limit), media_type="text/plain; charset=utf-8", headers=headers)
+    headers["Content-Disposition"] = "attachment; filename=generate.pstats"
+    return Response(pstats_dump(stats), media_type="application/octet-stream", headers=headers)
+
+
+@router.post("/api/v1/admin/profile/memory")
+async def profile_memory(request: Request, seconds: float = Query(10.0, gt=0), requests: Optional[int] = Query(None, ge=1),
+                         limit: int = Query(25, ge=1), frames: int = Query(1, ge=1, le=50),
+                         group: str = Query("lineno", pattern="^(lineno|filename|traceback)$")):
+    """
+    tracemalloc diff around ``seconds``, or around the next ``requests``
+    generate calls (``seconds`` is then the timeout); growth per location
+    """
+    _profiling_window(request, seconds)
+    text, completed = await _run_profiler(profiler.memory_diff, seconds, requests, limit, frames, group)
+    return Response(text, media_type="text/plain; charset=utf-8", headers={"X-Profiled-Requests": str(completed)})
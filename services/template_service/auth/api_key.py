@@ -1,17 +1,37 @@
 """
 Authentication module for API key management
 """
+import argparse
+import hashlib
+import hmac
 import os
 import secrets
 import json
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Dict, Mapping, Optional, Tuple
+from urllib.parse import parse_qs
+from ..config.settings import settings
 
 
 class APIKeyManager:
-    def __init__(self, config_file: str = "api_config.json"):
-        self.config_file = Path(config_file)
-        self.api_key = self._load_or_create_api_key()
+    """The legacy single key in api_config.json, read (or created) on first use"""
+
+    def __init__(self, config_file: Optional[str] = None):
+        self.config_file = Path(config_file or settings.api_config_file)
+        self._api_key: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @property
+    def api_key(self) -> str:
+        if self._api_key is None:
+            with self._lock:
+                if self._api_key is None:
+                    self._api_key = self._load_or_create_api_key()
+        return self._api_key
     
     def _load_or_create_api_key(self) -> str:
         """Load existing API key or create a new one"""
@@ -48,5 +68,187 @@ class APIKeyManager:
         return secrets.compare_digest(provided_key, self.api_key)
 
 
-# Global instance
-api_key_manager = APIKeyManager()
\ No newline at end of file
+def extract_api_key(headers: Mapping[str, str], query_string: str = "") -> Optional[str]:
+    """Read the key from X-API-Key or Authorization (Bearer optional), then ?api_key="""
+    api_key = headers.get('x-api-key') or headers.get('authorization')
+    if not api_key and query_string:
+        values = parse_qs(query_string).get('api_key')
+        api_key = values[0] if values else None
+    if api_key and api_key.startswith('Bearer '):
+        api_key = api_key[7:]
+    return api_key or None
+
+
+@dataclass(frozen=True)
+class APIKeyRecord:
+    """One issued key; quota fields of None fall back to the settings defaults"""
+    id: str
+    admin: bool = False
+    requests_per_minute: Optional[float] = None
+    burst: Optional[int] = None
+    max_concurrent: Optional[int] = None
+    # The bootstrap key from api_config.json is not rate limited
+    unlimited: bool = False
+
+
+def hash_api_key(salt: str, api_key: str) -> str:
+    return hmac.new(bytes.fromhex(salt), api_key.encode(), hashlib.sha256).hexdigest()
+
+
+class APIKeyStore:
+    """
+    Many API keys, stored as salted hashes.
+
+    The key file holds one store-wide salt and a record per key id::
+
+        {"salt": "<hex>", "keys": {"ci": {"hash": "<hex>", "admin": false,
+                                          "requests_per_minute": 120, "burst": 20,
+                                          "max_concurrent": 4}}}
+
+    Lookups hash the presented key once and probe a dict, so checking a key
+    costs the same with one key or thousands. The file is read once and
+    re-read when its mtime or size changes (checked at most once per
+    ``API_KEYS_CHECK_INTERVAL``), so keys can be issued and revoked without a
+    restart. The legacy single key in ``api_config.json`` keeps working as the
+    ``default`` admin key.
+    """
+
+    def __init__(self, path: str, legacy: Optional[APIKeyManager] = None):
+        self.path = Path(path)
+        self.legacy = legacy
+        self._lock = threading.Lock()
+        self._table: Tuple[str, Dict[str, APIKeyRecord]] = ("", {})
+        self._signature: Optional[Tuple[int, int]] = None
+        self._checked_at = 0.0
+        self.reloads = 0
+
+    def _file_signature(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = self.path.stat()
+        except FileNotFoundError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _read(self) -> Dict:
+        try:
+            data = json.loads(self.path.read_text())
+        except FileNotFoundError:
+            return {}
+        return data if isinstance(data, dict) else {}
+
+    def _refresh(self):
+        now = time.monotonic()
+        if self._checked_at and now - self._checked_at < settings.api_keys_check_interval:
+            return
+        with self._lock:
+            if self._checked_at and now - self._checked_at < settings.api_keys_check_interval:
+                return
+            self._checked_at = now
+            signature = self._file_signature()
+            if signature == self._signature and self.reloads:
+                return
+            try:
+                data = self._read()
+            except (OSError, ValueError) as e:
+                # Keep serving the last good table rather than locking everyone out
+                print(f"⚠️  Could not reload API keys from {self.path}: {e}")
+                return
+            salt = data.get("salt") or secrets.token_hex(16)
+            by_hash = {}
+            for key_id, entry in (data.get("keys") or {}).items():
+                by_hash[entry["hash"]] = APIKeyRecord(
+                    id=key_id,
+                    admin=bool(entry.get("admin", False)),
+                    requests_per_minute=entry.get("requests_per_minute"),
+                    burst=entry.get("burst"),
+                    max_concurrent=entry.get("max_concurrent")
+                )
+            if self.legacy is not None:
+                by_hash[hash_api_key(salt, self.legacy.get_api_key())] = APIKeyRecord(
+                    id="default", admin=True, unlimited=True
+                )
+            self._table = (salt, by_hash)
+            self._signature = signature
+            self.reloads += 1
+
+    def lookup(self, api_key: Optional[str]) -> Optional[APIKeyRecord]:
+        """The record for a presented key, or None if it is not valid"""
+        if not api_key:
+            return None
+        self._refresh()
+        salt, by_hash = self._table
+        return by_hash.get(hash_api_key(salt, api_key))
+
+    def create_key(self, key_id: str, admin: bool = False, requests_per_minute: Optional[float] = None,
+                   burst: Optional[int] = None, max_concurrent: Optional[int] = None) -> str:
+        """Issue a new key and persist its hash; the plain key is returned once"""
+        api_key = f"ftk_{secrets.token_urlsafe(32)}"
+        with self._lock:
+            data = self._read()
+            data.setdefault("salt", secrets.token_hex(16))
+            keys = data.setdefault("keys", {})
+            if key_id in keys:
+                raise ValueError(f"API key '{key_id}' already exists")
+            entry = {"hash": hash_api_key(data["salt"], api_key), "admin": admin,
+                     "created_at": datetime.now().isoformat()}
+            for name, value in (("requests_per_minute", requests_per_minute), ("burst", burst),
+                                ("max_concurrent", max_concurrent)):
+                if value is not None:
+                    entry[name] = value
+            keys[key_id] = entry
+            self._write(data)
+        return api_key
+
+    def revoke_key(self, key_id: str) -> bool:
+        with self._lock:
+            data = self._read()
+            if key_id not in data.get("keys", {}):
+                return False
+            del data["keys"][key_id]
+            self._write(data)
+        return True
+
+    def _write(self, data: Dict):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f".{self.path.name}.tmp")
+        tmp_path.write_text(json.dumps(data, indent=2))
+        os.chmod(tmp_path, 0o600)
+        os.replace(tmp_path, self.path)
+        self._checked_at = 0.0
+
+    def stats(self) -> Dict[str, int]:
+        self._refresh()
+        return {"keys": len(self._table[1]), "reloads": self.reloads}
+
+
+# Global instances; nothing touches api_config.json until a key is looked up
+api_key_manager = APIKeyManager()
+api_key_store = APIKeyStore(settings.api_keys_file, legacy=api_key_manager)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Manage BoilerFab API keys")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    create_parser = subparsers.add_parser("create", help="Issue a new key")
+    create_parser.add_argument("key_id", help="Name of the team or system the key is for")
+    create_parser.add_argument("--admin", action="store_true", help="Allow admin-only endpoints")
+    create_parser.add_argument("--rpm", type=float, help="Requests per minute")
+    create_parser.add_argument("--burst", type=int, help="Requests allowed at once before throttling")
+    create_parser.add_argument("--concurrency", type=int, help="Requests in flight at once")
+    revoke_parser = subparsers.add_parser("revoke", help="Revoke a key")
+    revoke_parser.add_argument("key_id")
+    args = parser.parse_args()
+
+    if args.command == "create":
+        try:
+            api_key = api_key_store.create_key(args.key_id, args.admin, args.rpm, args.burst, args.concurrency)
+        except ValueError as e:
+            parser.exit(1, f"❌ {e}\n")
+        print(f"🚀 New API Key for '{args.key_id}': {api_key}")
+        print("⚠️  Save this key - it will not be shown again!")
+    elif not api_key_store.revoke_key(args.key_id):
+        parser.exit(1, f"❌ No API key named '{args.key_id}'\n")
+
+
+if __name__ == "__main__":
+    main()
\ No newline at end of file
@@ -0,0 +1,63 @@
+"""
+API key enforcement for every request
+"""
+import json
+from typing import Iterable, Optional
+from ..config.settings import settings
+from .api_key import APIKeyStore, api_key_store, extract_api_key
+from .quota import QuotaExceededError, QuotaManager, quota_manager
+
+
+# Reachable without a key: liveness and readiness probes and the OpenAPI docs
+PUBLIC_PATHS = frozenset(("/healthz", "/readyz", "/ping", "/docs", "/docs/oauth2-redirect", "/redoc", "/openapi.json"))
+if settings.metrics_public:
+    PUBLIC_PATHS |= {"/metrics"}
+
+
+class APIKeyMiddleware:
+    """
+    ASGI middleware that checks the API key once per request and applies the
+    key's quotas. The matching APIKeyRecord is left in ``request.state.api_key``.
+
+    The concurrency slot is held until the response body has been sent, so a
+    key's streaming downloads count against its quota for their whole length.
+    """
+
+    def __init__(self, app, store: Optional[APIKeyStore] = None, quotas: Optional[QuotaManager] = None,
+                 public_paths: Iterable[str] = PUBLIC_PATHS):
+        self.app = app
+        self.store = store or api_key_store
+        self.quotas = quotas or quota_manager
+        self.public_paths = frozenset(public_paths)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] == "OPTIONS" or scope["path"] in self.public_paths:
+            await self.app(scope, receive, send)
+            return
+
+        headers = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+        record = self.store.lookup(extract_api_key(headers, scope.get("query_string", b"").decode("latin-1")))
+        if record is None:
+            await _error(send, 401, "Invalid API Key")
+            return
+        try:
+            quota = self.quotas.acquire(record)
+        except QuotaExceededError as e:
+            await _error(send, 429, str(e), [(b"retry-after", str(e.retry_after).encode())])
+            return
+
+        scope.setdefault("state", {})["api_key"] = record
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.quotas.release(quota)
+
+
+async def _error(send, status: int, detail: str, headers=()):
+    body = json.dumps({"detail": detail}).encode()
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode()), *headers],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,107 @@
+"""
+Per-key rate limits and concurrency quotas
+"""
+import math
+import threading
+import time
+from typing import Dict, Optional
+from ..config.settings import settings
+from .api_key import APIKeyRecord
+
+
+class TokenBucket:
+    """Refills ``rate`` tokens per second up to ``capacity``"""
+
+    def __init__(self, rate: float, capacity: int):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; returns 0 on success or the seconds until one is available"""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        if self.rate <= 0:
+            return 60.0
+        return (1 - self.tokens) / self.rate
+
+
+class QuotaExceededError(Exception):
+    """Raised when a key is over its rate or concurrency quota"""
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class KeyQuota:
+    def __init__(self, record: APIKeyRecord):
+        self.record = record
+        rate = record.requests_per_minute if record.requests_per_minute is not None else settings.rate_limit_requests_per_minute
+        burst = record.burst if record.burst is not None else settings.rate_limit_burst
+        self.bucket = TokenBucket(rate / 60.0, max(1, burst))
+        self.max_concurrent = record.max_concurrent if record.max_concurrent is not None else settings.rate_limit_max_concurrent
+        self.in_flight = 0
+
+
+class QuotaManager:
+    """
+    Token bucket and in-flight counter per key id.
+
+    A key's quota is rebuilt when its record changes in the key file; keys
+    marked unlimited (the bootstrap key) and everything when rate limiting is
+    disabled pass straight through.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._quotas: Dict[str, KeyQuota] = {}
+        self.throttled = 0
+        self.rejected_concurrency = 0
+
+    def _quota(self, record: APIKeyRecord) -> KeyQuota:
+        quota = self._quotas.get(record.id)
+        if quota is None or quota.record != record:
+            quota = self._quotas[record.id] = KeyQuota(record)
+        return quota
+
+    def acquire(self, record: APIKeyRecord) -> Optional[KeyQuota]:
+        """Admit one request or raise QuotaExceededError; pass the result to release()"""
+        if record.unlimited or not settings.rate_limit_enabled:
+            return None
+        with self._lock:
+            quota = self._quota(record)
+            if quota.max_concurrent and quota.in_flight >= quota.max_concurrent:
+                self.rejected_concurrency += 1
+                raise QuotaExceededError(
+                    f"API key '{record.id}' already has {quota.in_flight} requests in flight", 1)
+            wait = quota.bucket.take()
+            if wait:
+                self.throttled += 1
+                raise QuotaExceededError(f"Rate limit exceeded for API key '{record.id}'", math.ceil(wait))
+            quota.in_flight += 1
+            return quota
+
+    def release(self, quota: Optional[KeyQuota]):
+        if quota is None:
+            return
+        with self._lock:
+            quota.in_flight -= 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "keys": len(self._quotas),
+                "in_flight": sum(quota.in_flight for quota in self._quotas.values()),
+                "throttled": self.throttled,
+                "rejected_concurrency": self.rejected_concurrency,
+            }
+
+
+# Global instance
+quota_manager = QuotaManager()
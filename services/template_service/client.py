@@ -6,33 +6,94 @@ A CLI tool to interact with the FastAPI Template Service
 
 import argparse
 import requests
+import hashlib
+from urllib.parse import urlencode
+import os
 import zipfile
-import io
+import tarfile
+import tempfile
+import shutil
 import json
 from pathlib import Path
 import sys
 
 
+ARCHIVE_FORMATS = ["zip", "tar", "tar.gz", "tar.zst"]
+
+
 def get_api_key_from_config():
     """Get the API key from the config file"""
-    config_path = Path("api_config.json")
+    config_path = Path(os.environ.get("API_CONFIG_FILE", "api_config.json"))
     if config_path.exists():
         with open(config_path, 'r') as f:
             config = json.load(f)
             return config.get('api_key')
     return None
 
+def cache_dir():
+    """Directory for cached API responses (BOILERFAB_CACHE_DIR overrides)"""
+    return Path(os.environ.get('BOILERFAB_CACHE_DIR', Path.home() / ".cache" / "boilerfab" / "http"))
+
+
+def cached_get(url, headers):
+    """
+    GET a JSON resource, revalidating a local copy with If-None-Match.
+
+    An unchanged resource costs a 304 round trip and is served from disk.
+    """
+    cache_file = cache_dir() / (hashlib.sha256(url.encode("utf-8")).hexdigest() + ".json")
+    cached = None
+    try:
+        cached = json.loads(cache_file.read_text())
+    except (OSError, ValueError):
+        pass
+
+    request_headers = dict(headers)
+    if cached and cached.get('etag'):
+        request_headers["If-None-Match"] = cached['etag']
+    response = requests.get(url, headers=request_headers)
+    if response.status_code == 304 and cached:
+        return cached['body']
+    response.raise_for_status()
 
-def get_templates(server_url):
+    body = response.json()
+    etag = response.headers.get('ETag')
+    if etag:
+        try:
+            cache_file.parent.mkdir(parents=True, exist_ok=True)
+            temp_file = cache_file.with_suffix(f".{os.getpid()}.tmp")
+            temp_file.write_text(json.dumps({"etag": etag, "body": body}))
+            os.replace(temp_file, cache_file)
+        except OSError:
+            pass
+    return body
+
+
+def get_templates(server_url, tags=None, author=None):
     """Get list of available templates from the server"""
     try:
         api_key = get_api_key_from_config()
         headers = {"X-API-Key": api_key} if api_key else {}
-        response = requests.get(f"{server_url}/api/v1/templates", headers=headers)
+        # Filtering happens server-side so only matching templates are downloaded
+        query = urlencode({"tag": tags or [], **({"author": author} if author else {})}, doseq=True)
+        url = f"{server_url}/api/v1/templates" + (f"?{query}" if query else "")
+        return cached_get(url, headers)
+    except requests.exceptions.RequestException as e:
+        print(f"Error connecting to server: {e}")
+        return None
+
+
+def search_templates(server_url, query, limit=10):
+    """Search templates by name, tags, description and README"""
+    try:
+        api_key = get_api_key_from_config()
+        headers = {"X-API-Key": api_key} if api_key else {}
+        response = requests.get(f"{server_url}/api/v1/templates/search",
+                                params={"q": query, "limit": limit}, headers=headers)
         response.raise_for_status()
         return response.json()
     except requests.exceptions.RequestException as e:
-        print(f"Error connecting to server: {e}")
+        print(f"Error searching templates: {e}")
         return None
 
 
@@ -41,9 +102,7 @@ def get_template_detail(server_url, template_name):
     try:
         api_key = get_api_key_from_config()
         headers = {"X-API-Key": api_key} if api_key else {}
-        response = requests.get(f"{server_url}/api/v1/templates/{template_name}", headers=headers)
-        response.raise_for_status()
-        return response.json()
+        return cached_get(f"{server_url}/api/v1/templates/{template_name}", headers)
     except requests.exceptions.RequestException as e:
         print(f"Error getting template details: {e}")
         return None
@@ -62,7 +121,36 @@ def create_template(server_url, template_data):
         return None
 
 
-def generate_project(server_url, template_name, project_name, output_dir, parameters=None):
+def extract_archive(response, archive_format, output_path):
+    """Extract a streamed archive response into output_path"""
+    output_path.mkdir(parents=True, exist_ok=True)
+    response.raw.decode_content = True
+    if archive_format == "zip":
+        # The zip index sits at the end of the archive, so spool to disk rather than memory
+        with tempfile.TemporaryFile() as spool:
+            shutil.copyfileobj(response.raw, spool)
+            spool.seek(0)
+            with zipfile.ZipFile(spool, 'r') as zip_file:
+                zip_file.extractall(output_path)
+        return
+
+    # Tar formats are unpacked as they arrive, with nothing written but the project files
+    stream = response.raw
+    mode = "r|gz" if archive_format == "tar.gz" else "r|"
+    if archive_format == "tar.zst":
+        try:
+            import zstandard
+        except ImportError:
+            raise RuntimeError("The tar.zst format needs the 'zstandard' package (pip install zstandard)")
+        stream = zstandard.ZstdDecompressor().stream_reader(response.raw)
+    with tarfile.open(fileobj=stream, mode=mode) as tar_file:
+        if hasattr(tarfile, "data_filter"):
+            tar_file.extractall(output_path, filter="data")
+        else:
+            tar_file.extractall(output_path)
+
+
+def generate_project(server_url, template_name, project_name, output_dir, parameters=None, archive_format="zip"):
     """Request project generation from the server and download the result"""
     if parameters is None:
         parameters = {}
@@ -77,16 +165,14 @@ def generate_project(server_url, template_name, project_name, output_dir, parame
         api_key = get_api_key_from_config()
         headers = {"X-API-Key": api_key} if api_key else {}
         
-        response = requests.post(f"{server_url}/api/v1/generate", json=payload, headers=headers)
+        response = requests.post(f"{server_url}/api/v1/generate", params={"format": archive_format},
+                                 json=payload, headers=headers, stream=True)
         response.raise_for_status()
         
-        # The server returns a zip file, so always try to handle it as such
-        # Download and extract the zip file
-        zip_buffer = io.BytesIO(response.content)
+        # Extract the archive while it downloads
         output_path = Path(output_dir) / project_name
-        
-        with zipfile.ZipFile(zip_buffer, 'r') as zip_file:
-            zip_file.extractall(output_path)
+        with response:
+            extract_archive(response, archive_format, output_path)
         
         print(f"✅ Project '{project_name}' generated and downloaded to {output_path}")
         return True
@@ -96,6 +182,9 @@ def generate_project(server_url, template_name, project_name, output_dir, parame
     except zipfile.BadZipFile:
         print("Error: Server did not return a valid zip file")
         return False
+    except tarfile.TarError as e:
+        print(f"Error: Server did not return a valid {archive_format} archive: {e}")
+        return False
     except Exception as e:
         print(f"Unexpected error: {e}")
         return False
@@ -110,6 +199,13 @@ def main():
     
     # List command
     list_parser = subparsers.add_parser("list", help="List available templates")
+    list_parser.add_argument("--tag", action="append", help="Only templates with this tag (repeatable)")
+    list_parser.add_argument("--author", help="Only templates by this author")
+    
+    # Search templates
+    search_parser = subparsers.add_parser("search", help="Search templates")
+    search_parser.add_argument("query", help="Words to search for")
+    search_parser.add_argument("--limit", "-n", type=int, default=10, help="Maximum number of results")
     
     # Get template details
     detail_parser = subparsers.add_parser("detail", help="Get detailed information about a template")
@@ -131,11 +227,13 @@ def main():
                                  help="Template to use (default: fastapi-minimal)")
     generate_parser.add_argument("--output", "-o", default=".", 
                                  help="Output directory (default: current directory)")
+    generate_parser.add_argument("--format", "-f", default="zip", choices=ARCHIVE_FORMATS,
+                                 help="Archive format to download (default: zip)")
     
     args = parser.parse_args()
     
     if args.command == "list":
-        templates = get_templates(args.server)
+        templates = get_templates(args.server, tags=args.tag, author=args.author)
         if templates is not None:
             print("Available templates:")
             for template in templates:
@@ -143,6 +241,14 @@ def main():
                 params_str = f" ({template.get('parameter_count', 0)} params)" if template.get('parameter_count', 0) > 0 else ""
                 print(f"  - {template['name']}: {template['description']} (v{template['version']}){tags_str}{params_str}")
     
+    elif args.command == "search":
+        results = search_templates(args.server, args.query, args.limit)
+        if results is not None:
+            if not results:
+                print("No matching templates")
+            for template in results:
+                print(f"  - {template['name']}: {template['description']} (v{template['version']})")
+    
     elif args.command == "detail":
         template = get_template_detail(args.server, args.template_name)
         if template is not None:
@@ -178,7 +284,8 @@ def main():
             server_url=args.server,
             template_name=args.template,
             project_name=args.project_name,
-            output_dir=args.output
+            output_dir=args.output,
+            archive_format=args.format
         )
         if success:
             print(f"Project '{args.project_name}' generated successfully!")
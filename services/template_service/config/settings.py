@@ -3,7 +3,43 @@ Configuration settings for the FastAPI Template Service
 """
 import os
 import json
-from typing import List
+from pathlib import Path
+from typing import Any, Dict, List
+
+try:
+    import yaml
+except ImportError:  # PyYAML is optional; environment variables still work
+    yaml = None
+
+
+SETTINGS_FILES = ["settings.yaml", "config/settings.yaml"]
+
+
+def load_yaml_settings() -> Dict[str, Any]:
+    """Load the first non-empty settings.yaml (SETTINGS_FILE overrides the search)"""
+    if yaml is None:
+        return {}
+    candidates = [os.environ["SETTINGS_FILE"]] if os.getenv("SETTINGS_FILE") else SETTINGS_FILES
+    for candidate in candidates:
+        path = Path(candidate)
+        if path.is_file():
+            data = yaml.safe_load(path.read_text())
+            if isinstance(data, dict):
+                return data
+    return {}
+
+
+_yaml_settings = load_yaml_settings()
+
+
+def from_yaml(dotted_key: str, default: Any) -> Any:
+    """Look up a dotted key such as 'performance.max_concurrent_generations'"""
+    value: Any = _yaml_settings
+    for part in dotted_key.split("."):
+        if not isinstance(value, dict) or part not in value:
+            return default
+        value = value[part]
+    return default if value is None else value
 
 
 class Settings:
@@ -13,7 +49,67 @@ class Settings:
     debug_mode = os.getenv("DEBUG_MODE", "false").lower() == "true"
     log_level = os.getenv("LOG_LEVEL", "INFO")
     cors_origins = json.loads(os.getenv("CORS_ORIGINS", '["*"]'))
+    api_config_file = os.getenv("API_CONFIG_FILE", "api_config.json")
+    api_keys_file = os.getenv("API_KEYS_FILE", from_yaml("security.api_key.store", "./runtime/api_keys.json"))
+    api_keys_check_interval = float(os.getenv("API_KEYS_CHECK_INTERVAL", "1.0"))
+    rate_limit_enabled = str(os.getenv(
+        "RATE_LIMIT_ENABLED", from_yaml("performance.rate_limiting.enabled", True))).lower() == "true"
+    rate_limit_requests_per_minute = float(os.getenv(
+        "RATE_LIMIT_REQUESTS_PER_MINUTE", from_yaml("performance.rate_limiting.requests_per_minute", 60)))
+    rate_limit_burst = int(os.getenv("RATE_LIMIT_BURST", from_yaml("performance.rate_limiting.burst_size", 10)))
+    rate_limit_max_concurrent = int(os.getenv(
+        "RATE_LIMIT_MAX_CONCURRENT", from_yaml("performance.rate_limiting.max_concurrent", 4)))
     templates_dir = os.getenv("TEMPLATES_DIR", "./templates")
+    catalog_backend = os.getenv("CATALOG_BACKEND", from_yaml("performance.catalog.backend", "sqlite"))
+    catalog_path = os.getenv("CATALOG_PATH", from_yaml("performance.catalog.path", "./runtime/catalog.sqlite3"))
+    template_check_interval = float(os.getenv("TEMPLATE_CHECK_INTERVAL", "1.0"))
+    templates_page_max = int(os.getenv("TEMPLATES_PAGE_MAX", "500"))
+    search_include_readme = os.getenv("SEARCH_INCLUDE_README", "true").lower() == "true"
+    search_readme_max_bytes = int(os.getenv("SEARCH_README_MAX_BYTES", str(16 * 1024)))
+    templates_cache_max_age = int(os.getenv("TEMPLATES_CACHE_MAX_AGE", "0"))
+    parameters_unknown_policy = os.getenv(
+        "PARAMETERS_UNKNOWN_POLICY", from_yaml("templates.validation.unknown_parameters", "allow"))
+    metrics_public = str(os.getenv("METRICS_PUBLIC", from_yaml("monitoring.metrics.public", False))).lower() == "true"
+    server_timing_enabled = str(os.getenv(
+        "SERVER_TIMING_ENABLED", from_yaml("monitoring.server_timing.enabled", True))).lower() == "true"
+    access_log_enabled = str(os.getenv(
+        "ACCESS_LOG_ENABLED", from_yaml("monitoring.access_log.enabled", True))).lower() == "true"
+    profiling_enabled = str(os.getenv(
+        "PROFILING_ENABLED", from_yaml("monitoring.profiling.enabled", True))).lower() == "true"
+    profiling_max_seconds = float(os.getenv("PROFILING_MAX_SECONDS", from_yaml("monitoring.profiling.max_seconds", 60)))
+    stream_chunk_size = int(os.getenv("STREAM_CHUNK_SIZE", str(64 * 1024)))
+    compression_default = os.getenv("COMPRESSION_DEFAULT", from_yaml("performance.compression.default", "default"))
+    compression_min_size = int(os.getenv(
+        "COMPRESSION_MIN_SIZE", from_yaml("performance.compression.min_size_bytes", 256)))
+    artifact_cache_enabled = str(os.getenv(
+        "ARTIFACT_CACHE_ENABLED", from_yaml("performance.cache.enabled", True))).lower() == "true"
+    artifact_cache_dir = os.getenv(
+        "ARTIFACT_CACHE_DIR", from_yaml("performance.cache.directory", "./runtime/cache/artifacts"))
+    artifact_cache_max_mb = int(os.getenv("ARTIFACT_CACHE_MAX_MB", from_yaml("performance.cache.max_size_mb", 100)))
+    artifact_cache_memory_mb = int(os.getenv(
+        "ARTIFACT_CACHE_MEMORY_MB", from_yaml("performance.cache.memory_mb", 16)))
+    generation_workers = int(os.getenv(
+        "GENERATION_WORKERS", from_yaml("performance.max_concurrent_generations", 10)))
+    generation_queue_limit = int(os.getenv(
+        "GENERATION_QUEUE_LIMIT", from_yaml("performance.generation_queue.max_depth", 50)))
+    generation_retry_after = int(os.getenv(
+        "GENERATION_RETRY_AFTER", from_yaml("performance.generation_queue.retry_after_seconds", 2)))
+    render_workers = int(os.getenv("RENDER_WORKERS", str(os.cpu_count() or 2)))
+    warmup_enabled = str(os.getenv("WARMUP_ENABLED", from_yaml("performance.warmup.enabled", True))).lower() == "true"
+    warmup_workers = int(os.getenv("WARMUP_WORKERS", from_yaml("performance.warmup.workers", os.cpu_count() or 2)))
+    warmup_attempts = int(os.getenv("WARMUP_ATTEMPTS", from_yaml("performance.warmup.attempts", 3)))
+    warmup_backoff = float(os.getenv("WARMUP_BACKOFF", from_yaml("performance.warmup.backoff_seconds", 2.0)))
+    batch_max_items = int(os.getenv("BATCH_MAX_ITEMS", from_yaml("performance.batch.max_items", 50)))
+    validate_batch_max_items = int(os.getenv(
+        "VALIDATE_BATCH_MAX_ITEMS", from_yaml("performance.batch.max_validate_items", 200)))
+    singleflight_enabled = os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() == "true"
+    singleflight_timeout = float(os.getenv("SINGLEFLIGHT_TIMEOUT", "120"))
+    jobs_backend = os.getenv("JOBS_BACKEND", from_yaml("performance.jobs.backend", "memory"))
+    jobs_dir = os.getenv("JOBS_DIR", "./runtime/jobs")
+    jobs_workers = int(os.getenv("JOBS_WORKERS", from_yaml("performance.jobs.workers", 2)))
+    jobs_max_pending = int(os.getenv("JOBS_MAX_PENDING", from_yaml("performance.jobs.max_pending", 100)))
+    jobs_ttl_seconds = float(os.getenv("JOBS_TTL_SECONDS", from_yaml("performance.jobs.ttl_seconds", 3600)))
+    jobs_sweep_interval = float(os.getenv("JOBS_SWEEP_INTERVAL", "60"))
 
 
-settings = Settings()
\ No newline at end of file
+settings = Settings()
@@ -2,36 +2,28 @@
 Main application factory for the FastAPI Template Service
 """
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException, Request
+from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .api.routes import router
 from .config.settings import settings
 from .auth.api_key import api_key_manager
+from .auth.middleware import APIKeyMiddleware
+from .utils.metrics import MetricsMiddleware
+from .utils.jobs import job_manager
+from .utils.warmup import warmup
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
+    # Creates api_config.json with the bootstrap key on first run
+    api_key_manager.get_api_key()
+    job_manager.start()
+    # In the background: /readyz reports 503 until every template is compiled
+    warmup.start()
     yield
     # Shutdown
-
-
-def verify_api_key(request: Request) -> bool:
-    """Verify API key from header or query parameter"""
-    # Check header first
-    api_key = request.headers.get('X-API-Key') or request.headers.get('Authorization')
-    
-    # If not in header, check query parameter
-    if not api_key:
-        api_key = request.query_params.get('api_key')
-    
-    # Handle Bearer token format
-    if api_key and api_key.startswith('Bearer '):
-        api_key = api_key[7:]
-    
-    if not api_key or not api_key_manager.validate_api_key(api_key):
-        return False
-    return True
+    await job_manager.stop()
 
 
 def create_app() -> FastAPI:
@@ -42,6 +34,10 @@ def create_app() -> FastAPI:
         lifespan=lifespan
     )
 
+    # Every non-public route needs an API key; added before CORS so that
+    # preflights and error responses still get CORS headers
+    app.add_middleware(APIKeyMiddleware)
+
     # Add CORS middleware
     app.add_middleware(
         CORSMiddleware,
@@ -50,6 +46,9 @@ def create_app() -> FastAPI:
         allow_methods=["*"],
         allow_headers=["*"],
     )
+
+    # Outermost, so rejected and throttled requests are timed too
+    app.add_middleware(MetricsMiddleware)
     
     # Include API routes
     app.include_router(router)
@@ -1,7 +1,8 @@
 """
 Data models for the FastAPI Template Service
 """
-from pydantic import BaseModel
+import re
+from pydantic import BaseModel, field_validator
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 
@@ -12,6 +13,20 @@ class TemplateParameter(BaseModel):
     description: str
     default: Optional[Any] = None
     required: bool = True
+    enum: Optional[List[Any]] = None
+    minimum: Optional[float] = None
+    maximum: Optional[float] = None
+    pattern: Optional[str] = None
+
+    @field_validator("pattern")
+    @classmethod
+    def pattern_compiles(cls, pattern: Optional[str]) -> Optional[str]:
+        if pattern is not None:
+            try:
+                re.compile(pattern)
+            except re.error as e:
+                raise ValueError(f"Invalid pattern {pattern!r}: {e}")
+        return pattern
 
 
 class TemplateMetadata(BaseModel):
@@ -22,6 +37,7 @@ class TemplateMetadata(BaseModel):
     license: Optional[str] = None
     tags: List[str] = []
     parameters: List[TemplateParameter] = []
+    unknown_parameters: Optional[str] = None
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
@@ -35,6 +51,10 @@ class TemplateInfo(BaseModel):
     parameter_count: int = 0
 
 
+class TemplateSearchResult(TemplateInfo):
+    score: float
+
+
 class TemplateRegistrationRequest(BaseModel):
     name: str
     description: str
@@ -48,4 +68,54 @@ class TemplateRegistrationRequest(BaseModel):
 class GenerateRequest(BaseModel):
     template_name: str
     project_name: str
-    parameters: Dict[str, Any] = {}
\ No newline at end of file
+    parameters: Dict[str, Any] = {}
+
+
+class BatchGenerateRequest(BaseModel):
+    items: List[GenerateRequest]
+    archive_name: str = "projects"
+
+
+class ParameterValidationItem(BaseModel):
+    template_name: str
+    parameters: Dict[str, Any] = {}
+
+
+class BatchValidateRequest(BaseModel):
+    items: List[ParameterValidationItem]
+
+
+class ParameterError(BaseModel):
+    parameter: Optional[str] = None
+    message: str
+
+
+class ParameterValidationResult(BaseModel):
+    template_name: str
+    valid: bool
+    parameters: Optional[Dict[str, Any]] = None
+    unresolved_placeholders: List[str] = []
+    errors: List[ParameterError] = []
+
+
+class BatchValidateResponse(BaseModel):
+    results: List[ParameterValidationResult]
+    valid: int
+    invalid: int
+
+
+class JobInfo(BaseModel):
+    id: str
+    status: str
+    template_name: str
+    project_name: str
+    format: str = "zip"
+    progress: float = 0.0
+    files_done: int = 0
+    files_total: int = 0
+    size: Optional[int] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    expires_at: Optional[datetime] = None
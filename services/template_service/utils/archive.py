@@ -0,0 +1,231 @@
+"""
+Streaming archive writers
+"""
+import struct
+import tarfile
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:  # zstd output is optional
+    zstandard = None
+
+
+ZIP_STORED = 0
+ZIP_DEFLATED = 8
+
+_LOCAL_HEADER = struct.Struct("<IHHHHHIIIHH")
+_CENTRAL_HEADER = struct.Struct("<IHHHHHHIIIHHHHHII")
+_END_OF_CENTRAL_DIR = struct.Struct("<IHHHHIIH")
+_ZIP64_END_OF_CENTRAL_DIR = struct.Struct("<IQHHIIQQQQ")
+_ZIP64_LOCATOR = struct.Struct("<IIQI")
+
+# Values at or above these limits are moved into zip64 records and replaced
+# by the 0xFFFF... sentinels in the classic headers
+_ZIP64_LIMIT = 0xFFFFFFFF
+_ZIP64_COUNT_LIMIT = 0xFFFF
+_SENTINEL32 = 0xFFFFFFFF
+_SENTINEL16 = 0xFFFF
+_UTF8_FLAG = 0x800
+_VERSION_DEFAULT = 20
+_VERSION_ZIP64 = 45
+_MADE_BY_UNIX = 3 << 8
+
+# format name -> (media type, file extension)
+ARCHIVE_FORMATS: Dict[str, Tuple[str, str]] = {
+    "zip": ("application/zip", ".zip"),
+    "tar": ("application/x-tar", ".tar"),
+    "tar.gz": ("application/gzip", ".tar.gz"),
+    "tar.zst": ("application/zstd", ".tar.zst"),
+}
+
+
+def archive_format(name: str) -> Tuple[str, str]:
+    """Resolve a format name to (media type, extension); raises ValueError if unavailable"""
+    if name not in ARCHIVE_FORMATS:
+        raise ValueError(f"Unknown format '{name}', expected one of: {', '.join(ARCHIVE_FORMATS)}")
+    if name == "tar.zst" and zstandard is None:
+        raise ValueError("Format 'tar.zst' requires the optional 'zstandard' package")
+    return ARCHIVE_FORMATS[name]
+
+
+def _dos_date_time(date_time: Tuple[int, int, int, int, int, int]) -> Tuple[int, int]:
+    year, month, day, hour, minute, second = date_time
+    dos_date = ((year - 1980) << 9) | (month << 5) | day
+    dos_time = (hour << 11) | (minute << 5) | (second // 2)
+    return dos_date, dos_time
+
+
+def deflate(data: bytes, level: int = zlib.Z_DEFAULT_COMPRESSION) -> bytes:
+    """Raw DEFLATE stream, as stored inside zip entries"""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def compress_entry(data: bytes, level: Optional[int] = zlib.Z_DEFAULT_COMPRESSION) -> Tuple[int, bytes, int]:
+    """
+    Prepare a zip entry payload: returns (method, payload, crc32).
+
+    ``level=None`` stores the data uncompressed. This is the CPU-heavy part of
+    writing an entry and is safe to run on any thread.
+    """
+    crc = zlib.crc32(data)
+    if level is None:
+        return ZIP_STORED, data, crc
+    return ZIP_DEFLATED, deflate(data, level), crc
+
+
+class ZipStreamWriter:
+    """
+    Builds a zip archive incrementally without a seekable output.
+
+    Every ``add_file()`` call returns the bytes for that entry (local header
+    plus compressed data) so they can be sent immediately; ``finish()`` returns
+    the central directory. Sizes and CRCs are known before the header is
+    written, so no data descriptors are needed and any standard zip reader can
+    extract the result. Zip64 records are emitted only when limits are hit.
+    """
+
+    def __init__(self, compresslevel: int = zlib.Z_DEFAULT_COMPRESSION):
+        self.compresslevel = compresslevel
+        self._offset = 0
+        self._central: List[bytes] = []
+
+    @property
+    def bytes_written(self) -> int:
+        return self._offset
+
+    def add_file(self, path: str, data: bytes, mode: int = 0o100644,
+                 date_time: Tuple[int, int, int, int, int, int] = (1980, 1, 1, 0, 0, 0),
+                 compress: bool = True) -> bytes:
+        """Append one file and return the bytes to emit for it"""
+        method, payload, crc = compress_entry(data, self.compresslevel if compress else None)
+        return self.add_raw(path, payload, crc, len(data), method, mode, date_time)
+
+    def add_raw(self, path: str, payload: bytes, crc: int, size: int, method: int,
+                mode: int = 0o100644,
+                date_time: Tuple[int, int, int, int, int, int] = (1980, 1, 1, 0, 0, 0)) -> bytes:
+        """Append an entry whose payload is already compressed with ``method``"""
+        name = path.encode("utf-8")
+        flags = _UTF8_FLAG if not name.isascii() else 0
+        dos_date, dos_time = _dos_date_time(date_time)
+        compressed_size = len(payload)
+        offset = self._offset
+
+        local_extra = b""
+        local_sizes = (compressed_size, size)
+        if size >= _ZIP64_LIMIT or compressed_size >= _ZIP64_LIMIT:
+            local_extra = struct.pack("<HHQQ", 1, 16, size, compressed_size)
+            local_sizes = (_SENTINEL32, _SENTINEL32)
+        version = _VERSION_ZIP64 if local_extra or offset >= _ZIP64_LIMIT else _VERSION_DEFAULT
+
+        header = _LOCAL_HEADER.pack(
+            0x04034B50, version, flags, method, dos_time, dos_date,
+            crc, local_sizes[0], local_sizes[1], len(name), len(local_extra)
+        )
+
+        central_fields = []
+        central_size, central_compressed, central_offset = size, compressed_size, offset
+        if size >= _ZIP64_LIMIT:
+            central_fields.append(size)
+            central_size = _SENTINEL32
+        if compressed_size >= _ZIP64_LIMIT:
+            central_fields.append(compressed_size)
+            central_compressed = _SENTINEL32
+        if offset >= _ZIP64_LIMIT:
+            central_fields.append(offset)
+            central_offset = _SENTINEL32
+        central_extra = b""
+        if central_fields:
+            central_extra = struct.pack(f"<HH{len(central_fields)}Q", 1, 8 * len(central_fields), *central_fields)
+
+        self._central.append(_CENTRAL_HEADER.pack(
+            0x02014B50, _MADE_BY_UNIX | version, version, flags, method, dos_time, dos_date,
+            crc, central_compressed, central_size, len(name), len(central_extra), 0,
+            0, 0, (mode & 0xFFFF) << 16, central_offset
+        ) + name + central_extra)
+
+        chunk = header + name + local_extra + payload
+        self._offset += len(chunk)
+        return chunk
+
+    def finish(self) -> bytes:
+        """Return the central directory and end-of-archive records"""
+        directory = b"".join(self._central)
+        directory_offset = self._offset
+        count = len(self._central)
+        trailer = b""
+        if count >= _ZIP64_COUNT_LIMIT or directory_offset >= _ZIP64_LIMIT or len(directory) >= _ZIP64_LIMIT:
+            zip64_offset = directory_offset + len(directory)
+            trailer += _ZIP64_END_OF_CENTRAL_DIR.pack(
+                0x06064B50, _ZIP64_END_OF_CENTRAL_DIR.size - 12, _MADE_BY_UNIX | _VERSION_ZIP64,
+                _VERSION_ZIP64, 0, 0, count, count, len(directory), directory_offset
+            )
+            trailer += _ZIP64_LOCATOR.pack(0x07064B50, 0, zip64_offset, 1)
+            count, directory_size, directory_offset = _SENTINEL16, _SENTINEL32, _SENTINEL32
+        else:
+            directory_size = len(directory)
+        trailer += _END_OF_CENTRAL_DIR.pack(
+            0x06054B50, 0, 0, count, count, directory_size, directory_offset, 0
+        )
+        self._offset += len(directory) + len(trailer)
+        self._central = []
+        return directory + trailer
+
+
+class TarStreamWriter:
+    """
+    Builds a tar archive incrementally, optionally gzip or zstd compressed.
+
+    Same contract as ZipStreamWriter: ``add_file()`` returns the bytes for
+    that entry (which may be empty while the compressor buffers) and
+    ``finish()`` returns the end-of-archive blocks plus any buffered output.
+    Headers use the POSIX pax format, so long and non-ASCII paths survive.
+    """
+
+    def __init__(self, compression: Optional[str] = None, level: Optional[int] = None):
+        self._compressor = None
+        if compression == "gz":
+            level = zlib.Z_DEFAULT_COMPRESSION if level is None else level
+            self._compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+        elif compression == "zst":
+            if zstandard is None:
+                raise ValueError("zstd compression requires the optional 'zstandard' package")
+            self._compressor = zstandard.ZstdCompressor(level=level or 3).compressobj()
+        elif compression is not None:
+            raise ValueError(f"Unknown tar compression '{compression}'")
+        self._offset = 0
+        self._emitted = 0
+
+    @property
+    def bytes_written(self) -> int:
+        return self._emitted
+
+    def _emit(self, data: bytes) -> bytes:
+        self._offset += len(data)
+        if self._compressor is not None:
+            data = self._compressor.compress(data)
+        self._emitted += len(data)
+        return data
+
+    def add_file(self, path: str, data: bytes, mode: int = 0o100644, mtime: float = 0.0) -> bytes:
+        """Append one file and return the bytes to emit for it"""
+        info = tarfile.TarInfo(path)
+        info.size = len(data)
+        info.mode = mode & 0o7777
+        info.mtime = int(mtime)
+        header = info.tobuf(tarfile.PAX_FORMAT, "utf-8", "surrogateescape")
+        padding = -len(data) % tarfile.BLOCKSIZE
+        return self._emit(header + data + tarfile.NUL * padding)
+
+    def finish(self) -> bytes:
+        """Return the end-of-archive blocks, padded to a full record"""
+        end = tarfile.NUL * (2 * tarfile.BLOCKSIZE)
+        end += tarfile.NUL * (-(self._offset + len(end)) % tarfile.RECORDSIZE)
+        data = self._emit(end)
+        if self._compressor is not None:
+            tail = self._compressor.flush()
+            self._emitted += len(tail)
+            data += tail
+        return data
@@ -0,0 +1,286 @@
+"""
+Content-addressed cache of generated archives
+"""
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Iterator, Optional
+from ..config.settings import settings
+
+
+def artifact_key(content_hash: str, project_name: str, parameters: Dict[str, Any], variant: str = "zip") -> str:
+    """Cache key for a generated archive: template content + request inputs"""
+    canonical = json.dumps(
+        [content_hash, project_name, parameters, variant],
+        sort_keys=True, separators=(",", ":"), default=str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class Artifact:
+    """
+    A stored archive, either held in memory or on disk.
+
+    Disk hits from ``get()`` carry the file already open: eviction unlinks the
+    path, but a stream that reads through ``file`` is unaffected.
+    """
+    key: str
+    size: int
+    path: Optional[Path] = None
+    data: Optional[bytes] = None
+    file: Optional[BinaryIO] = None
+
+
+class ArtifactWriter:
+    """Spools an archive to a temporary file and publishes it on commit"""
+
+    def __init__(self, cache: "ArtifactCache", key: str):
+        self.cache = cache
+        self.key = key
+        self.size = 0
+        self._temp_path = cache.directory / f".{key}.{uuid.uuid4().hex}.tmp"
+        self._file = open(self._temp_path, "wb")
+        self._memory = [] if cache.memory_max_bytes else None
+
+    def write(self, chunk: bytes):
+        self._file.write(chunk)
+        self.size += len(chunk)
+        if self._memory is not None:
+            if self.size <= self.cache.memory_item_max_bytes:
+                self._memory.append(chunk)
+            else:
+                self._memory = None
+
+    def commit(self) -> Artifact:
+        self._file.close()
+        data = b"".join(self._memory) if self._memory is not None else None
+        return self.cache._publish(self.key, self._temp_path, self.size, data)
+
+    def abort(self):
+        self._file.close()
+        try:
+            self._temp_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class ArtifactCache:
+    """
+    Size-bounded LRU of generated archives.
+
+    Archives live on disk under ``directory``; small ones are also kept in an
+    optional in-memory hot tier. Entries are addressed by ``artifact_key()``,
+    so a change to the template content or the request produces a new key and
+    stale entries simply age out.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_bytes: Optional[int] = None,
+                 memory_max_bytes: Optional[int] = None, enabled: Optional[bool] = None):
+        self.enabled = settings.artifact_cache_enabled if enabled is None else enabled
+        self.directory = Path(directory or settings.artifact_cache_dir)
+        self.max_bytes = settings.artifact_cache_max_mb * 1024 * 1024 if max_bytes is None else max_bytes
+        self.memory_max_bytes = (
+            settings.artifact_cache_memory_mb * 1024 * 1024 if memory_max_bytes is None else memory_max_bytes
+        )
+        self.memory_item_max_bytes = self.memory_max_bytes // 4
+        self._lock = threading.Lock()
+        self._disk: "OrderedDict[str, int]" = OrderedDict()
+        self._disk_bytes = 0
+        self._memory: "OrderedDict[str, bytes]" = OrderedDict()
+        self._memory_bytes = 0
+        self._loaded = False
+        self.hits = 0
+        self.memory_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.bin"
+
+    def _load_index(self):
+        """Adopt archives left on disk by earlier runs, oldest first"""
+        if self._loaded:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        found = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".bin") and entry.is_file():
+                entry_stat = entry.stat()
+                found.append((entry_stat.st_mtime, entry.name[:-4], entry_stat.st_size))
+        for _, key, size in sorted(found):
+            self._disk[key] = size
+            self._disk_bytes += size
+        self._loaded = True
+        self._evict()
+
+    def get(self, key: str, count: bool = True, handle: bool = True) -> Optional[Artifact]:
+        """
+        Look up an archive, refreshing its LRU position on a hit.
+
+        Disk hits are opened before the lock is released, so the caller can
+        stream them even if the entry is evicted meanwhile; ``handle=False``
+        only checks for the entry. ``count=False`` skips the hit/miss
+        counters, for internal lookups that do not correspond to a client
+        request.
+        """
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._load_index()
+            artifact = self._lookup(key)
+            if artifact is not None and artifact.data is None and handle:
+                try:
+                    artifact.file = open(artifact.path, "rb")
+                except FileNotFoundError:
+                    # Evicted by another worker process
+                    self._forget(key)
+                    artifact = None
+                else:
+                    artifact.size = os.fstat(artifact.file.fileno()).st_size
+            if count:
+                if artifact is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    if artifact.data is not None:
+                        self.memory_hits += 1
+        if artifact is not None and artifact.path is not None:
+            try:
+                os.utime(artifact.path)
+            except FileNotFoundError:
+                pass
+        return artifact
+
+    def _lookup(self, key: str) -> Optional[Artifact]:
+        data = self._memory.get(key)
+        if data is not None:
+            self._memory.move_to_end(key)
+            if key in self._disk:
+                self._disk.move_to_end(key)
+            return Artifact(key=key, size=len(data), data=data)
+
+        path = self._path(key)
+        size = self._disk.get(key)
+        if size is None:
+            # Another worker process may have stored it
+            try:
+                size = path.stat().st_size
+            except FileNotFoundError:
+                return None
+            self._disk[key] = size
+            self._disk_bytes += size
+        elif not path.exists():
+            self._forget(key)
+            return None
+        self._disk.move_to_end(key)
+        return Artifact(key=key, size=size, path=path)
+
+    def writer(self, key: str) -> ArtifactWriter:
+        with self._lock:
+            self._load_index()
+        return ArtifactWriter(self, key)
+
+    def tee(self, key: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        """Pass chunks through while storing them; only complete archives are kept"""
+        writer = self.writer(key)
+        try:
+            for chunk in chunks:
+                writer.write(chunk)
+                yield chunk
+        except BaseException:
+            writer.abort()
+            raise
+        writer.commit()
+
+    def iter_artifact(self, artifact: Artifact, chunk_size: Optional[int] = None) -> Iterator[bytes]:
+        """Read a stored archive back in chunks; consumes the artifact's open file"""
+        chunk_size = chunk_size or settings.stream_chunk_size
+        if artifact.data is not None:
+            for offset in range(0, len(artifact.data), chunk_size):
+                yield artifact.data[offset:offset + chunk_size]
+            return
+        f, artifact.file = artifact.file or open(artifact.path, "rb"), None
+        with f:
+            while True:
+                chunk = f.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+
+    def _publish(self, key: str, temp_path: Path, size: int, data: Optional[bytes]) -> Artifact:
+        path = self._path(key)
+        os.replace(temp_path, path)
+        with self._lock:
+            if key in self._disk:
+                self._disk_bytes -= self._disk[key]
+            self._disk[key] = size
+            self._disk_bytes += size
+            if data is not None:
+                self._remember(key, data)
+            self._evict()
+        return Artifact(key=key, size=size, path=path, data=data)
+
+    def _remember(self, key: str, data: bytes):
+        if key in self._memory:
+            self._memory_bytes -= len(self._memory.pop(key))
+        self._memory[key] = data
+        self._memory_bytes += len(data)
+        while self._memory_bytes > self.memory_max_bytes and self._memory:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _forget(self, key: str):
+        self._disk_bytes -= self._disk.pop(key, 0)
+        data = self._memory.pop(key, None)
+        if data is not None:
+            self._memory_bytes -= len(data)
+
+    def _evict(self):
+        while self._disk_bytes > self.max_bytes and self._disk:
+            key, _ = next(iter(self._disk.items()))
+            self._forget(key)
+            self.evictions += 1
+            try:
+                self._path(key).unlink()
+            except FileNotFoundError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._load_index()
+            for key in list(self._disk):
+                self._forget(key)
+                try:
+                    self._path(key).unlink()
+                except FileNotFoundError:
+                    pass
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "enabled": self.enabled,
+                "hits": self.hits,
+                "memory_hits": self.memory_hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+                "evictions": self.evictions,
+                "entries": len(self._disk),
+                "bytes": self._disk_bytes,
+                "max_bytes": self.max_bytes,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_max_bytes": self.memory_max_bytes,
+            }
+
+
+# Global instance
+artifact_cache = ArtifactCache()
@@ -1,29 +1,35 @@
 """
 Authentication utilities for the FastAPI Template Service
 """
+from typing import Optional
 from fastapi import Request, HTTPException
-from ..auth.api_key import api_key_manager
+from ..auth.api_key import APIKeyRecord, api_key_store, extract_api_key
+
+
+def request_api_key(request: Request) -> Optional[APIKeyRecord]:
+    """The key record for a request; set by APIKeyMiddleware, looked up otherwise"""
+    record = getattr(request.state, "api_key", None)
+    if record is None:
+        record = api_key_store.lookup(extract_api_key(request.headers, request.url.query))
+    return record
 
 
 def verify_api_key(request: Request) -> bool:
     """Verify API key from header or query parameter"""
-    # Check header first
-    api_key = request.headers.get('X-API-Key') or request.headers.get('Authorization')
-    
-    # If not in header, check query parameter
-    if not api_key:
-        api_key = request.query_params.get('api_key')
-    
-    # Handle Bearer token format
-    if api_key and api_key.startswith('Bearer '):
-        api_key = api_key[7:]
-    
-    if not api_key or not api_key_manager.validate_api_key(api_key):
-        return False
-    return True
+    return request_api_key(request) is not None
 
 
 def require_api_key(request: Request):
     """Decorator-like function to require API key"""
     if not verify_api_key(request):
-        raise HTTPException(status_code=401, detail="Invalid API Key")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Invalid API Key")
+
+
+def require_admin(request: Request) -> APIKeyRecord:
+    """Require a key marked admin in the key store"""
+    record = request_api_key(request)
+    if record is None:
+        raise HTTPException(status_code=401, detail="Invalid API Key")
+    if not record.admin:
+        raise HTTPException(status_code=403, detail="Admin API key required")
+    return record
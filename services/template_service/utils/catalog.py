@@ -0,0 +1,307 @@
+"""
+SQLite-backed template catalog shared by every worker process
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from ..models.schemas import TemplateInfo, TemplateMetadata
+
+
+# (directory mtime, metadata.json mtime, metadata.json size); metadata parts are
+# None when the template has no metadata.json
+Signature = Tuple[int, Optional[int], Optional[int]]
+
+# Bumped whenever SCHEMA changes; older catalogs are dropped and re-indexed
+SCHEMA_VERSION = 2
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS templates (
+    name TEXT PRIMARY KEY,
+    version TEXT NOT NULL,
+    description TEXT NOT NULL,
+    author TEXT,
+    license TEXT,
+    tags TEXT NOT NULL,
+    parameters TEXT NOT NULL,
+    info TEXT NOT NULL,
+    metadata TEXT,
+    error TEXT,
+    dir_mtime_ns INTEGER,
+    meta_mtime_ns INTEGER,
+    meta_size INTEGER,
+    revision INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS templates_author ON templates (author);
+CREATE INDEX IF NOT EXISTS templates_revision ON templates (revision);
+CREATE TABLE IF NOT EXISTS template_tags (
+    tag TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (tag, name)
+);
+CREATE INDEX IF NOT EXISTS template_tags_name ON template_tags (name);
+CREATE TABLE IF NOT EXISTS catalog_state (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def template_signature(path: Path) -> Optional[Signature]:
+    """Cheap change detector for one template directory"""
+    try:
+        dir_mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        return None
+    try:
+        meta_stat = (path / "metadata.json").stat()
+    except FileNotFoundError:
+        return (dir_mtime, None, None)
+    return (dir_mtime, meta_stat.st_mtime_ns, meta_stat.st_size)
+
+
+def parse_metadata(name: str, path: Path) -> Tuple[TemplateInfo, Optional[TemplateMetadata], Optional[Exception]]:
+    """Parse a template's metadata.json into summary info, full metadata and any error"""
+    metadata_file = path / "metadata.json"
+    if not metadata_file.exists():
+        info = TemplateInfo(
+            name=name,
+            description="No description",
+            version="1.0.0",
+            parameter_count=0
+        )
+        metadata = TemplateMetadata(
+            name=name,
+            description="No description",
+            version="1.0.0",
+            created_at=datetime.now()
+        )
+        return info, metadata, None
+
+    try:
+        raw = json.loads(metadata_file.read_text())
+    except json.JSONDecodeError:
+        info = TemplateInfo(
+            name=name,
+            description="Invalid metadata.json",
+            version="1.0.0",
+            parameter_count=0
+        )
+        return info, None, ValueError(f"Invalid metadata.json for template '{name}'")
+
+    info = TemplateInfo(
+        name=name,
+        description=raw.get("description", "No description"),
+        version=raw.get("version", "1.0.0"),
+        author=raw.get("author"),
+        tags=raw.get("tags", []),
+        parameter_count=len(raw.get("parameters", []))
+    )
+    try:
+        return info, TemplateMetadata(**raw), None
+    except ValueError as e:
+        return info, None, e
+
+
+@dataclass
+class CatalogRow:
+    """One indexed template as stored in the catalog"""
+    name: str
+    info: TemplateInfo
+    metadata: Optional[TemplateMetadata]
+    error: Optional[str]
+    signature: Optional[Signature]
+    revision: int
+
+
+class TemplateCatalog:
+    """
+    Template metadata indexed in a SQLite database.
+
+    ``reconcile()`` compares the templates directory with the stored rows and
+    re-parses only templates whose signature changed. Every change bumps a
+    catalog-wide generation and stamps the touched rows with it, so readers in
+    any worker process can pick up exactly the rows that changed since they
+    last looked. Writers use WAL mode, so reads never block.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._local = threading.local()
+        self.reconciles = 0
+        self.reindexed = 0
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            if str(self.path) != ":memory:":
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+            connection = sqlite3.connect(str(self.path), timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            # Every connection checks: each ":memory:" connection is a database of its own
+            self._ensure_schema(connection)
+            self._local.connection = connection
+        return connection
+
+    @staticmethod
+    def _ensure_schema(connection: sqlite3.Connection):
+        if connection.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION:
+            return
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if connection.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                tables = {row[0] for row in connection.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+                # Keep the generation moving forward so readers in other workers see the re-index
+                generation = None
+                if "catalog_state" in tables:
+                    row = connection.execute("SELECT value FROM catalog_state WHERE key = 'generation'").fetchone()
+                    generation = row[0] if row else None
+                for table in ("templates", "template_tags", "catalog_state"):
+                    connection.execute(f"DROP TABLE IF EXISTS {table}")
+                for statement in filter(str.strip, SCHEMA.split(";")):
+                    connection.execute(statement)
+                if generation is not None:
+                    connection.execute("INSERT INTO catalog_state VALUES ('generation', ?)", (generation,))
+                connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+    def _state(self, connection: sqlite3.Connection, key: str) -> Optional[str]:
+        row = connection.execute("SELECT value FROM catalog_state WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def generation(self) -> int:
+        return int(self._state(self._connect(), "generation") or 0)
+
+    def reconcile(self, root: Path, force: Iterable[str] = ()) -> int:
+        """Bring the catalog in line with ``root``; returns the number of rows changed"""
+        connection = self._connect()
+        root_key = str(root.resolve())
+        force = set(force)
+        self.reconciles += 1
+
+        same_root = self._state(connection, "root") == root_key
+        known: Dict[str, Signature] = {}
+        if same_root:
+            for name, dir_mtime, meta_mtime, meta_size in connection.execute(
+                "SELECT name, dir_mtime_ns, meta_mtime_ns, meta_size FROM templates"
+            ):
+                known[name] = (dir_mtime, meta_mtime, meta_size)
+
+        found: Dict[str, Path] = {}
+        if root.exists():
+            with os.scandir(root) as it:
+                for item in it:
+                    if item.is_dir():
+                        found[item.name] = Path(item.path)
+        removed = [name for name in known if name not in found]
+        changed = []
+        for name, path in found.items():
+            signature = template_signature(path)
+            if signature is None:
+                continue
+            if name in force or known.get(name) != signature:
+                changed.append((name, path, signature))
+        if same_root and not removed and not changed:
+            return 0
+
+        # Parse outside the write transaction so other workers are not held up
+        rows = []
+        for name, path, signature in changed:
+            info, metadata, error = parse_metadata(name, path)
+            rows.append((name, info, metadata, error, signature))
+
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            generation = int(self._state(connection, "generation") or 0) + 1
+            if not same_root:
+                connection.execute("DELETE FROM templates")
+                connection.execute("DELETE FROM template_tags")
+                connection.execute("INSERT OR REPLACE INTO catalog_state VALUES ('root', ?)", (root_key,))
+            for name in removed:
+                connection.execute("DELETE FROM templates WHERE name = ?", (name,))
+                connection.execute("DELETE FROM template_tags WHERE name = ?", (name,))
+            for name, info, metadata, error, signature in rows:
+                self._store(connection, name, info, metadata, error, signature, generation)
+            connection.execute("INSERT OR REPLACE INTO catalog_state VALUES ('generation', ?)", (str(generation),))
+            connection.execute("COMMIT")
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        self.reindexed += len(rows)
+        return len(rows) + len(removed)
+
+    @staticmethod
+    def _store(connection: sqlite3.Connection, name: str, info: TemplateInfo,
+               metadata: Optional[TemplateMetadata], error: Optional[Exception],
+               signature: Signature, generation: int):
+        parameters = [p.model_dump() for p in metadata.parameters] if metadata is not None else []
+        connection.execute(
+            "INSERT OR REPLACE INTO templates VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            (
+                name, info.version, info.description, info.author,
+                metadata.license if metadata is not None else None,
+                json.dumps(info.tags or []), json.dumps(parameters),
+                info.model_dump_json(),
+                metadata.model_dump_json() if metadata is not None else None,
+                str(error) if error is not None else None,
+                signature[0], signature[1], signature[2],
+                generation, time.time()
+            )
+        )
+        connection.execute("DELETE FROM template_tags WHERE name = ?", (name,))
+        connection.executemany(
+            "INSERT OR IGNORE INTO template_tags VALUES (?, ?)",
+            [(tag.lower(), name) for tag in info.tags or []]
+        )
+
+    def rows(self, since: int = 0) -> List[CatalogRow]:
+        """Rows changed after generation ``since`` (all rows for 0)"""
+        result = []
+        for name, info, metadata, error, dir_mtime, meta_mtime, meta_size, revision in self._connect().execute(
+            "SELECT name, info, metadata, error, dir_mtime_ns, meta_mtime_ns, meta_size, revision "
+            "FROM templates WHERE revision > ? ORDER BY name",
+            (since,)
+        ):
+            result.append(CatalogRow(
+                name=name,
+                info=TemplateInfo.model_validate_json(info),
+                metadata=TemplateMetadata.model_validate_json(metadata) if metadata is not None else None,
+                error=error,
+                signature=(dir_mtime, meta_mtime, meta_size),
+                revision=revision
+            ))
+        return result
+
+    def names(self) -> Set[str]:
+        return {row[0] for row in self._connect().execute("SELECT name FROM templates")}
+
+    def stats(self) -> Dict[str, object]:
+        connection = self._connect()
+        return {
+            "backend": "sqlite",
+            "path": str(self.path),
+            "templates": connection.execute("SELECT COUNT(*) FROM templates").fetchone()[0],
+            "tags": connection.execute("SELECT COUNT(DISTINCT tag) FROM template_tags").fetchone()[0],
+            "generation": self.generation(),
+            "reconciles": self.reconciles,
+            "reindexed": self.reindexed,
+        }
+
+
+def create_catalog(backend: str, path: str) -> Optional[TemplateCatalog]:
+    """The configured catalog, or None to scan the templates directory directly"""
+    if backend == "sqlite":
+        return TemplateCatalog(path)
+    if backend == "scan":
+        return None
+    raise ValueError(f"Unknown catalog backend '{backend}'")
@@ -0,0 +1,59 @@
+"""
+Per-file compression policy for generated archives
+"""
+import zlib
+from typing import Optional
+from ..config.settings import settings
+
+
+# Request-level presets (?compression=...); None means store without compressing
+COMPRESSION_LEVELS = {
+    "fast": 1,
+    "default": zlib.Z_DEFAULT_COMPRESSION,
+    "max": 9,
+    "none": None,
+}
+
+# The same presets for zstd-compressed tar streams; zstd has no store mode, so
+# there is no "none" (use the plain tar format for an uncompressed archive)
+ZSTD_LEVELS = {
+    "fast": 1,
+    "default": 3,
+    "max": 19,
+}
+
+# Formats that are already compressed; deflating them again only burns CPU
+STORED_SUFFIXES = frozenset([
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.ico', '.avif',
+    '.zip', '.gz', '.tgz', '.bz2', '.xz', '.zst', '.7z', '.rar',
+    '.jar', '.war', '.whl', '.egg',
+    '.woff', '.woff2', '.pdf', '.mp3', '.mp4', '.webm', '.ogg'
+])
+
+
+def compression_level(name: str) -> Optional[int]:
+    """Resolve a preset name; raises ValueError for unknown presets"""
+    try:
+        return COMPRESSION_LEVELS[name]
+    except KeyError:
+        raise ValueError(
+            f"Unknown compression '{name}', expected one of: {', '.join(COMPRESSION_LEVELS)}"
+        )
+
+
+def zstd_level(name: str) -> int:
+    """Resolve a preset for tar.zst; raises ValueError for 'none' and unknown presets"""
+    compression_level(name)
+    if name not in ZSTD_LEVELS:
+        raise ValueError("tar.zst is always compressed; use format=tar for an uncompressed archive")
+    return ZSTD_LEVELS[name]
+
+
+def entry_level(path: str, size: int, level: Optional[int]) -> Optional[int]:
+    """Level to use for one archive entry, or None to store it as-is"""
+    if level is None or size < settings.compression_min_size:
+        return None
+    dot = path.rfind('.')
+    if dot > path.rfind('/') and path[dot:].lower() in STORED_SUFFIXES:
+        return None
+    return level
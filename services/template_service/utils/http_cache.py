@@ -0,0 +1,58 @@
+"""
+Conditional GET support: strong ETags, If-None-Match and Cache-Control
+"""
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any
+from fastapi import Request
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import Response
+from ..config.settings import settings
+
+
+@dataclass
+class CachedJSON:
+    """A response body serialized once, with its strong ETag"""
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_payload(cls, payload: Any) -> "CachedJSON":
+        # Serialized the same way FastAPI's JSONResponse does
+        body = json.dumps(
+            jsonable_encoder(payload),
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":")
+        ).encode("utf-8")
+        return cls(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match uses the weak comparison, so W/ prefixes are ignored"""
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cache_control() -> str:
+    # Responses depend on the API key, so shared caches must not store them
+    if settings.templates_cache_max_age > 0:
+        return f"private, max-age={settings.templates_cache_max_age}"
+    return "private, no-cache"
+
+
+def conditional_response(request: Request, cached: CachedJSON) -> Response:
+    """Answer 304 when the client already has this representation, else the cached body"""
+    headers = {"ETag": cached.etag, "Cache-Control": cache_control()}
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag_matches(if_none_match, cached.etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
@@ -0,0 +1,367 @@
+"""
+Asynchronous generation jobs with pluggable record storage
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from ..config.settings import settings
+from ..models.schemas import JobInfo
+from .artifact_cache import artifact_cache
+from .template_service import GenerationPlan, stream_project_archive
+from .workers import generation_pool, PoolSaturatedError
+
+
+QUEUED = "queued"
+RUNNING = "running"
+COMPLETED = "completed"
+FAILED = "failed"
+
+
+@dataclass
+class Job:
+    id: str
+    template_name: str
+    project_name: str
+    format: str = "zip"
+    status: str = QUEUED
+    files_done: int = 0
+    files_total: int = 0
+    size: int = 0
+    error: Optional[str] = None
+    created_at: float = field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    expires_at: Optional[float] = None
+    # Process rendering the job; records of dead owners are failed by the sweeper
+    owner: Optional[int] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status == COMPLETED:
+            return 1.0
+        if not self.files_total:
+            return 0.0
+        return round(self.files_done / self.files_total, 4)
+
+    def to_info(self) -> JobInfo:
+        def timestamp(value: Optional[float]) -> Optional[datetime]:
+            return datetime.fromtimestamp(value) if value is not None else None
+
+        return JobInfo(
+            id=self.id,
+            status=self.status,
+            template_name=self.template_name,
+            project_name=self.project_name,
+            format=self.format,
+            progress=self.progress,
+            files_done=self.files_done,
+            files_total=self.files_total,
+            size=self.size if self.status == COMPLETED else None,
+            error=self.error,
+            created_at=timestamp(self.created_at),
+            started_at=timestamp(self.started_at),
+            finished_at=timestamp(self.finished_at),
+            expires_at=timestamp(self.expires_at)
+        )
+
+
+class JobStore(ABC):
+    """Storage backend for job records; artifacts always live on local disk"""
+
+    @abstractmethod
+    def save(self, job: Job):
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        ...
+
+    @abstractmethod
+    def delete(self, job_id: str):
+        ...
+
+    @abstractmethod
+    def all(self) -> List[Job]:
+        ...
+
+
+class MemoryJobStore(JobStore):
+    """Records kept in this process only"""
+
+    def __init__(self):
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+
+    def save(self, job: Job):
+        with self._lock:
+            self._jobs[job.id] = job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def delete(self, job_id: str):
+        with self._lock:
+            self._jobs.pop(job_id, None)
+
+    def all(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+
+class FileJobStore(JobStore):
+    """Records stored as JSON files, so every worker process on the machine sees them"""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def _path(self, job_id: str) -> Path:
+        return self.directory / f"{job_id}.json"
+
+    def save(self, job: Job):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        temp_path = self.directory / f".{job.id}.{uuid.uuid4().hex}.tmp"
+        temp_path.write_text(json.dumps(asdict(job)))
+        os.replace(temp_path, self._path(job.id))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        try:
+            return Job(**json.loads(self._path(job_id).read_text()))
+        except (FileNotFoundError, json.JSONDecodeError, TypeError):
+            return None
+
+    def delete(self, job_id: str):
+        try:
+            self._path(job_id).unlink()
+        except FileNotFoundError:
+            pass
+
+    def all(self) -> List[Job]:
+        if not self.directory.exists():
+            return []
+        jobs = []
+        for path in self.directory.glob("*.json"):
+            job = self.get(path.stem)
+            if job is not None:
+                jobs.append(job)
+        return jobs
+
+
+def create_job_store(backend: str, directory: Path) -> JobStore:
+    if backend == "memory":
+        return MemoryJobStore()
+    if backend == "file":
+        return FileJobStore(directory / "records")
+    raise ValueError(f"Unknown job backend '{backend}'")
+
+
+class JobManager:
+    """
+    In-process job queue.
+
+    Jobs are validated when submitted, queued in memory, rendered on the shared
+    generation pool by a fixed number of job workers, and written to disk. A
+    sweeper removes records and artifacts once they expire.
+    """
+
+    def __init__(self, store: Optional[JobStore] = None, directory: Optional[str] = None,
+                 ttl: Optional[float] = None, workers: Optional[int] = None,
+                 max_pending: Optional[int] = None):
+        self.directory = Path(directory or settings.jobs_dir)
+        self.store = store or create_job_store(settings.jobs_backend, self.directory)
+        self.ttl = settings.jobs_ttl_seconds if ttl is None else ttl
+        self.workers = workers or settings.jobs_workers
+        self.max_pending = settings.jobs_max_pending if max_pending is None else max_pending
+        self._queue: Optional[asyncio.Queue] = None
+        self._tasks: List[asyncio.Task] = []
+        self.submitted = 0
+        self.evicted = 0
+
+    def artifact_path(self, job_id: str) -> Path:
+        return self.directory / "artifacts" / f"{job_id}.bin"
+
+    def start(self):
+        """Start job workers and the expiry sweeper on the running loop"""
+        if self._tasks:
+            return
+        self.fail_orphans()
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._sweeper()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def submit(self, plan: GenerationPlan) -> Job:
+        """Queue a validated generation; raises PoolSaturatedError when the queue is full"""
+        self.start()
+        if self._queue.qsize() >= self.max_pending:
+            raise PoolSaturatedError(generation_pool.retry_after)
+        job = Job(
+            id=uuid.uuid4().hex,
+            template_name=plan.template_name,
+            project_name=plan.project_name,
+            format=plan.format,
+            files_total=len(plan.snapshot.files),
+            owner=os.getpid()
+        )
+        self.store.save(job)
+        self._queue.put_nowait((job, plan))
+        self.submitted += 1
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        job = self.store.get(job_id)
+        if job is not None and job.expires_at is not None and job.expires_at <= time.time():
+            self._evict(job)
+            return None
+        return job
+
+    async def _worker(self):
+        while True:
+            job, plan = await self._queue.get()
+            try:
+                await self._run(job, plan)
+            finally:
+                self._queue.task_done()
+
+    async def _acquire_slot(self):
+        """A generation pool slot, so jobs count against the same cap as /generate"""
+        while True:
+            try:
+                return await generation_pool.acquire()
+            except PoolSaturatedError as e:
+                # Jobs have no client to answer 503 to: wait for capacity instead
+                await asyncio.sleep(e.retry_after)
+
+    async def _run(self, job: Job, plan: GenerationPlan):
+        try:
+            slot = await self._acquire_slot()
+            try:
+                job.status = RUNNING
+                job.started_at = time.time()
+                self.store.save(job)
+                job.size = await generation_pool.run(self._render, job, plan)
+                job.status = COMPLETED
+            finally:
+                slot.release()
+        except Exception as e:
+            job.status = FAILED
+            job.error = str(e)
+        except BaseException:
+            # Cancelled at shutdown: never leave the record queued or running
+            job.status = FAILED
+            job.error = "Interrupted by service shutdown"
+            raise
+        finally:
+            job.finished_at = time.time()
+            job.expires_at = job.finished_at + self.ttl
+            self.store.save(job)
+
+    def _render(self, job: Job, plan: GenerationPlan) -> int:
+        """Write the job's archive to disk; runs on a pool thread"""
+        path = self.artifact_path(job.id)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = path.with_suffix(".tmp")
+
+        artifact = artifact_cache.get(plan.cache_key)
+        if artifact is not None:
+            with open(temp_path, "wb") as f:
+                for chunk in artifact_cache.iter_artifact(artifact):
+                    f.write(chunk)
+            job.files_done = job.files_total
+        else:
+            last_saved = [time.monotonic()]
+
+            def progress(done: int, total: int):
+                job.files_done, job.files_total = done, total
+                now = time.monotonic()
+                if now - last_saved[0] >= 0.5:
+                    last_saved[0] = now
+                    self.store.save(job)
+
+            chunks = stream_project_archive(plan, progress=progress)
+            if artifact_cache.enabled:
+                chunks = artifact_cache.tee(plan.cache_key, chunks)
+            with open(temp_path, "wb") as f:
+                for chunk in chunks:
+                    f.write(chunk)
+        os.replace(temp_path, path)
+        return path.stat().st_size
+
+    def _evict(self, job: Job):
+        self.store.delete(job.id)
+        try:
+            self.artifact_path(job.id).unlink()
+        except FileNotFoundError:
+            pass
+        self.evicted += 1
+
+    @staticmethod
+    def _orphaned(job: Job) -> bool:
+        """A queued or running record whose owning process is gone (crash, kill -9)"""
+        if job.status not in (QUEUED, RUNNING) or job.owner == os.getpid():
+            return False
+        if job.owner is None:
+            return True
+        try:
+            os.kill(job.owner, 0)
+        except ProcessLookupError:
+            return True
+        except PermissionError:
+            return False
+        return False
+
+    def fail_orphans(self) -> int:
+        """Fail jobs left queued or running by a dead process; returns how many"""
+        now = time.time()
+        orphans = [job for job in self.store.all() if self._orphaned(job)]
+        for job in orphans:
+            job.status = FAILED
+            job.error = "Worker process exited before the job finished"
+            job.finished_at = now
+            job.expires_at = now + self.ttl
+            self.store.save(job)
+        return len(orphans)
+
+    def sweep(self) -> int:
+        """Remove expired jobs and their artifacts; returns how many were evicted"""
+        self.fail_orphans()
+        now = time.time()
+        expired = [job for job in self.store.all() if job.expires_at is not None and job.expires_at <= now]
+        for job in expired:
+            self._evict(job)
+        return len(expired)
+
+    async def _sweeper(self):
+        while True:
+            await asyncio.sleep(settings.jobs_sweep_interval)
+            await asyncio.get_running_loop().run_in_executor(None, self.sweep)
+
+    def stats(self) -> Dict[str, Any]:
+        jobs = self.store.all()
+        counts = {status: 0 for status in (QUEUED, RUNNING, COMPLETED, FAILED)}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {
+            "pending": self._queue.qsize() if self._queue is not None else 0,
+            "submitted": self.submitted,
+            "evicted": self.evicted,
+            **counts,
+        }
+
+
+# Global instance
+job_manager = JobManager()
@@ -0,0 +1,399 @@
+"""
+Prometheus-compatible metrics without external dependencies, plus
+per-request Server-Timing headers and access log lines
+"""
+import bisect
+import json
+import logging
+import sys
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+from ..config.settings import settings
+
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; generation phases are mostly sub-millisecond, whole requests can take seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+GENERATION_PHASES = ("validate", "load", "render", "compress", "send")
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _number(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class _CounterChild:
+    __slots__ = ("value", "_lock")
+
+    def __init__(self):
+        self.value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ("buckets", "counts", "sum", "_lock")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """The child for one label combination, created on first use"""
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self.labels().inc(amount)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            yield f"{self.name}{_labels(self.labelnames, values)} {_number(child.value)}"
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float):
+        self.labels().observe(value)
+
+    def _samples(self):
+        for values, child in list(self._children.items()):
+            with child._lock:
+                counts = list(child.counts)
+                total = child.sum
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_number(bound)}"'
+                yield f"{self.name}_bucket{_labels(self.labelnames, values, le)} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, values)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labelnames, values)} {cumulative}"
+
+
+class Gauge(_Metric):
+    """A gauge whose samples are read from ``callback`` at scrape time"""
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: Sequence[str] = (),
+                 callback: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None):
+        super().__init__(name, help, labelnames)
+        self.callback = callback
+
+    def _samples(self):
+        for values, value in (self.callback() if self.callback else {}).items():
+            yield f"{self.name}{_labels(self.labelnames, values)} {_number(value)}"
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            try:
+                lines.extend(metric.render())
+            except Exception as e:
+                # One broken collector must not take the whole scrape down
+                lines.append(f"# {metric.name} unavailable: {_escape(str(e))}")
+        return "\n".join(lines) + "\n"
+
+
+class GenerationTimings:
+    """
+    Seconds spent in each phase of one generation, summed over its files.
+
+    Routes leave the request's instance in ``request.state.timings`` so the
+    middleware can report it in Server-Timing and the access log.
+    """
+    __slots__ = GENERATION_PHASES
+
+    def __init__(self):
+        for phase in GENERATION_PHASES:
+            setattr(self, phase, 0.0)
+
+    def as_dict(self) -> Dict[str, float]:
+        return {phase: getattr(self, phase) for phase in GENERATION_PHASES}
+
+
+def server_timing(timings: Optional[GenerationTimings], app_seconds: float) -> bytes:
+    """
+    Server-Timing value for the phases finished so far (in milliseconds) plus
+    ``app``, the time until the response started. A streamed archive is
+    rendered after its headers are sent, so render, compress and send only
+    reach the access log.
+    """
+    parts = []
+    if timings is not None:
+        parts.extend(f"{phase};dur={seconds * 1000:.3f}" for phase, seconds in timings.as_dict().items() if seconds)
+    parts.append(f"app;dur={app_seconds * 1000:.3f}")
+    return ", ".join(parts).encode("latin-1")
+
+
+access_logger = logging.getLogger("boilerfab.access")
+
+
+def _configure_access_log():
+    # Servers configure their own loggers only; give this one a plain stdout
+    # handler unless the deployment already attached one
+    if not access_logger.handlers:
+        handler = logging.StreamHandler(sys.stdout)
+        handler.setFormatter(logging.Formatter("%(message)s"))
+        access_logger.addHandler(handler)
+        access_logger.setLevel(logging.INFO)
+        access_logger.propagate = False
+
+
+registry = MetricsRegistry()
+
+http_request_duration = registry.register(Histogram(
+    "boilerfab_http_request_duration_seconds",
+    "Time from request start until the response body was fully sent",
+    ("route", "method", "status")
+))
+generation_phase_duration = registry.register(Histogram(
+    "boilerfab_generation_phase_seconds",
+    "Time spent in each generation phase per request",
+    ("phase",)
+))
+generated_bytes = registry.register(Counter(
+    "boilerfab_generated_bytes_total",
+    "Archive bytes rendered (cache hits excluded)",
+    ("format",)
+))
+template_requests = registry.register(Counter(
+    "boilerfab_template_requests_total",
+    "Generation requests per template",
+    ("template",)
+))
+
+# Children for the fixed phases are created up front so recording a phase skips the label lookup
+_phase_children = {phase: generation_phase_duration.labels(phase) for phase in GENERATION_PHASES}
+
+
+def observe_phase(phase: str, seconds: float):
+    _phase_children[phase].observe(seconds)
+
+
+def observe_generation(timings: GenerationTimings, format: str, size: int):
+    """Record a finished render: its render and compress time and the bytes produced"""
+    _phase_children["render"].observe(timings.render)
+    _phase_children["compress"].observe(timings.compress)
+    generated_bytes.labels(format).inc(size)
+
+
+def _service_gauges() -> Dict[str, Dict[Tuple[str, ...], float]]:
+    # Imported here: these modules import this one for their own instrumentation
+    from .artifact_cache import artifact_cache
+    from .snapshot import snapshot_store
+    from .validators import validator_cache
+    from .workers import generation_pool
+    from .jobs import job_manager
+
+    artifacts = artifact_cache.stats()
+    snapshots = snapshot_store.stats()
+    validators = validator_cache.stats()
+    pool = generation_pool.stats()
+    jobs = job_manager.stats()
+
+    def ratio(hits: int, misses: int) -> float:
+        return hits / (hits + misses) if hits + misses else 0.0
+
+    return {
+        "hit_ratio": {
+            ("artifacts",): ratio(artifacts["hits"], artifacts["misses"]),
+            ("snapshots",): ratio(snapshots["hits"], snapshots["builds"]),
+            ("validators",): ratio(validators["hits"], validators["compiles"]),
+        },
+        "cache_bytes": {
+            ("artifacts",): artifacts["bytes"],
+            ("artifacts_memory",): artifacts["memory_bytes"],
+            ("snapshots",): snapshots["bytes"],
+        },
+        "queue_depth": {(): pool["waiting"]},
+        "in_flight": {(): pool["active"]},
+        "jobs": {(status,): jobs[status] for status in ("queued", "running", "completed", "failed")},
+    }
+
+
+class _StatsSnapshot:
+    """Service stats read at most once per scrape and shared by the gauges below"""
+
+    def __init__(self, max_age: float = 0.5):
+        self.max_age = max_age
+        self._taken = 0.0
+        self._value: Dict[str, Dict[Tuple[str, ...], float]] = {}
+
+    def __call__(self, key: str) -> Dict[Tuple[str, ...], float]:
+        now = time.monotonic()
+        if now - self._taken > self.max_age:
+            self._value = _service_gauges()
+            self._taken = now
+        return self._value[key]
+
+
+_stats = _StatsSnapshot()
+for _name, _help, _labelnames, _key in (
+    ("boilerfab_cache_hit_ratio", "Hits over lookups since start", ("cache",), "hit_ratio"),
+    ("boilerfab_cache_bytes", "Bytes held by each cache", ("cache",), "cache_bytes"),
+    ("boilerfab_generation_queue_depth", "Generations waiting for a worker", (), "queue_depth"),
+    ("boilerfab_generations_in_flight", "Generations holding a worker slot", (), "in_flight"),
+    ("boilerfab_jobs", "Asynchronous jobs by status", ("status",), "jobs"),
+):
+    registry.register(Gauge(_name, _help, _labelnames, lambda key=_key: _stats(key)))
+
+
+class MetricsMiddleware:
+    """
+    Times every request until its response body has been sent and, for
+    generation routes, the time spent handing archive bytes to the server.
+    Adds a ``Server-Timing`` header to every response and writes one JSON
+    access log line per request to the ``boilerfab.access`` logger.
+    Adds two perf_counter reads per request plus one per body chunk.
+    """
+
+    generation_routes = frozenset(("/api/v1/generate", "/api/v1/generate/batch", "/api/v1/jobs/{job_id}/artifact"))
+
+    def __init__(self, app, server_timing: Optional[bool] = None, access_log: Optional[bool] = None):
+        self.app = app
+        self.server_timing = settings.server_timing_enabled if server_timing is None else server_timing
+        self.access_log = settings.access_log_enabled if access_log is None else access_log
+        if self.access_log:
+            _configure_access_log()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        send_time = 0.0
+        bytes_in = bytes_out = 0
+        perf_counter = time.perf_counter
+        state = scope.setdefault("state", {})
+
+        async def counted_receive():
+            nonlocal bytes_in
+            message = await receive()
+            bytes_in += len(message.get("body", b""))
+            return message
+
+        async def timed_send(message):
+            nonlocal status, send_time, bytes_out
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    value = server_timing(state.get("timings"), perf_counter() - started)
+                    message = {**message, "headers": [*message.get("headers", ()), (b"server-timing", value)]}
+                await send(message)
+                return
+            bytes_out += len(message.get("body", b""))
+            sent = perf_counter()
+            await send(message)
+            send_time += perf_counter() - sent
+
+        started = perf_counter()
+        try:
+            await self.app(scope, counted_receive if self.access_log else receive, timed_send)
+        finally:
+            elapsed = perf_counter() - started
+            route = scope.get("route")
+            path = getattr(route, "path", None) or "unmatched"
+            http_request_duration.labels(path, scope["method"], str(status)).observe(elapsed)
+            timings = state.get("timings")
+            if path in self.generation_routes and status == 200:
+                observe_phase("send", send_time)
+                if timings is not None:
+                    timings.send = send_time
+            if self.access_log and access_logger.isEnabledFor(logging.INFO):
+                record = {
+                    "method": scope["method"],
+                    "path": scope["path"],
+                    "route": path,
+                    "status": status,
+                    "duration_ms": round(elapsed * 1000, 3),
+                    "bytes_in": bytes_in,
+                    "bytes_out": bytes_out,
+                }
+                key = state.get("api_key")
+                if key is not None:
+                    record["key"] = key.id
+                if timings is not None:
+                    record["phases_ms"] = {phase: round(seconds * 1000, 3)
+                                           for phase, seconds in timings.as_dict().items()}
+                access_logger.info(json.dumps(record, separators=(",", ":")))
@@ -0,0 +1,150 @@
+"""
+Single-pass placeholder substitution engine
+
+Templates mark substitution points with ``{{NAME}}`` where NAME starts with a
+letter or underscore and may contain letters, digits, ``_``, ``-`` and ``.``
+(``{{PROJECT_NAME}}``, ``{{db-host}}``, ``{{app.port}}``). A marker preceded by
+a backslash (``\\{{NAME}}``) is an escape and renders as the literal text
+``{{NAME}}``. Anything else between double braces (JSX ``style={{...}}``, Go
+templates, Handlebars blocks) is left untouched.
+"""
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, FrozenSet, Iterable, Optional, Set, Tuple
+
+
+NAME_PATTERN = r"[A-Za-z_][A-Za-z0-9_.-]*"
+
+MARKER_PATTERN = re.compile(rb"(\\)?\{\{(" + NAME_PATTERN.encode("ascii") + rb")\}\}")
+
+# Bytes of compiled segments kept for ad-hoc content; snapshot files keep their own
+CACHE_MAX_BYTES = 32 * 1024 * 1024
+
+
+class CompiledTemplate:
+    """
+    A file split into literal segments and placeholder names.
+
+    ``literals`` always has exactly one more item than ``names``; rendering
+    interleaves them and joins the result in a single allocation.
+    """
+
+    __slots__ = ("literals", "names")
+
+    def __init__(self, literals: Tuple[bytes, ...], names: Tuple[str, ...]):
+        self.literals = literals
+        self.names = names
+
+    @property
+    def placeholder_names(self) -> FrozenSet[str]:
+        return frozenset(self.names)
+
+    def render(self, values: Dict[str, bytes], unknown: Optional[Set[str]] = None) -> bytes:
+        """
+        Substitute placeholders with pre-encoded values.
+
+        Placeholders without a value are kept verbatim and, when ``unknown`` is
+        given, their names are added to it.
+        """
+        literals = self.literals
+        if not self.names:
+            return literals[0]
+        parts = [literals[0]]
+        for index, name in enumerate(self.names, 1):
+            value = values.get(name)
+            if value is None:
+                value = b"{{" + name.encode("ascii") + b"}}"
+                if unknown is not None:
+                    unknown.add(name)
+            parts.append(value)
+            parts.append(literals[index])
+        return b"".join(parts)
+
+
+class _CompileCache:
+    """LRU of compiled templates keyed by content digest and bounded by their size"""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[bytes, Tuple[CompiledTemplate, int]]" = OrderedDict()
+
+    def get(self, key: bytes) -> Optional[CompiledTemplate]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: bytes, compiled: CompiledTemplate, size: int):
+        # One file may not take more than a quarter of the budget
+        if size > self.max_bytes // 4:
+            return
+        with self._lock:
+            if key in self._entries:
+                return
+            self._entries[key] = (compiled, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self.size -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+_compile_cache = _CompileCache(CACHE_MAX_BYTES)
+
+
+def compile_template(data: bytes) -> CompiledTemplate:
+    """Split ``data`` into segments, reusing the result for content seen recently"""
+    key = hashlib.blake2b(data, digest_size=16).digest()
+    compiled = _compile_cache.get(key)
+    if compiled is None:
+        compiled = _compile(data)
+        _compile_cache.put(key, compiled, len(data))
+    return compiled
+
+
+def _compile(data: bytes) -> CompiledTemplate:
+    """Scan ``data`` once for markers and split it into segments"""
+    literals = []
+    names = []
+    pending = []
+    position = 0
+    for match in MARKER_PATTERN.finditer(data):
+        if match.group(1):
+            # Escaped marker: drop the backslash and keep the braces as text
+            pending.append(data[position:match.start()])
+            pending.append(data[match.start() + 1:match.end()])
+        else:
+            pending.append(data[position:match.start()])
+            literals.append(b"".join(pending))
+            names.append(match.group(2).decode("ascii"))
+            pending = []
+        position = match.end()
+    pending.append(data[position:])
+    literals.append(b"".join(pending))
+    return CompiledTemplate(tuple(literals), tuple(names))
+
+
+def encode_values(values: Dict[str, str]) -> Dict[str, bytes]:
+    """Encode substitution values once per request"""
+    return {name: value.encode("utf-8") for name, value in values.items()}
+
+
+def unknown_placeholders(names: Iterable[str], values: Dict[str, object]) -> Set[str]:
+    """Return the placeholder names that have no value"""
+    return {name for name in names if name not in values}
+
+
+def render_text(content: str, values: Dict[str, str], unknown: Optional[Set[str]] = None) -> str:
+    """Convenience wrapper for rendering a str with str values"""
+    compiled = compile_template(content.encode("utf-8"))
+    return compiled.render(encode_values(values), unknown).decode("utf-8")
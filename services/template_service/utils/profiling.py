@@ -0,0 +1,267 @@
+"""
+On-demand profiling of the running service: stack sampling, cProfile of
+live generate requests and tracemalloc snapshot diffs
+"""
+import cProfile
+import io
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+
+# Leaf frames of threads that are only waiting for work
+_IDLE_LEAVES = frozenset((
+    ("threading.py", "wait"),
+    ("selectors.py", "select"),
+    ("queue.py", "get"),
+    ("thread.py", "_worker"),
+))
+
+
+class ProfilerBusyError(Exception):
+    """Raised when another profiling session is already running"""
+
+
+def _frame_label(code) -> str:
+    return f"{getattr(code, 'co_qualname', code.co_name)} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def sample_stacks(seconds: float, interval: float = 0.005, include_idle: bool = False) -> Tuple[Counter, int]:
+    """
+    Sample every thread's Python stack for ``seconds``; returns collapsed
+    stacks ("thread;outer;...;inner" -> samples) and the number of sweeps.
+    Threads blocked waiting for work are skipped unless ``include_idle``.
+    """
+    own = threading.get_ident()
+    stacks: Counter = Counter()
+    names: Dict[int, str] = {}
+    sweeps = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        for ident, frame in sys._current_frames().items():
+            if ident == own:
+                continue
+            code = frame.f_code
+            if not include_idle and (os.path.basename(code.co_filename), code.co_name) in _IDLE_LEAVES:
+                continue
+            labels = []
+            while frame is not None:
+                labels.append(_frame_label(frame.f_code))
+                frame = frame.f_back
+            if ident not in names:
+                names.update((thread.ident, thread.name) for thread in threading.enumerate())
+            labels.append(names.get(ident, f"thread-{ident}"))
+            stacks[";".join(reversed(labels))] += 1
+        sweeps += 1
+        time.sleep(interval)
+    return stacks, sweeps
+
+
+def collapsed(stacks: Counter) -> str:
+    """Brendan Gregg's collapsed format, as read by flamegraph.pl and speedscope"""
+    return "".join(f"{stack} {count}\n" for stack, count in stacks.most_common())
+
+
+class RequestCapture:
+    """
+    The next ``count`` generate requests, optionally under cProfile.
+
+    cProfile only sees the thread that enabled it, so each piece of a
+    request's work on the pool is profiled separately, one at a time.
+    """
+
+    def __init__(self, count: int, profile: bool):
+        self.count = count
+        self.claimed = 0
+        self.completed = 0
+        self.profile = cProfile.Profile() if profile else None
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+        self._profile_lock = threading.Lock()
+
+    def claim(self) -> bool:
+        with self._lock:
+            if self.claimed >= self.count:
+                return False
+            self.claimed += 1
+            return True
+
+    def finish_one(self):
+        with self._lock:
+            self.completed += 1
+            if self.completed >= self.count:
+                self.done.set()
+
+    def call(self, func: Callable[..., Any], *args: Any) -> Any:
+        if self.profile is None:
+            return func(*args)
+        with self._profile_lock:
+            self.profile.enable()
+            try:
+                return func(*args)
+            finally:
+                self.profile.disable()
+
+    def stats(self) -> Optional[pstats.Stats]:
+        """Profile of the requests so far; None if none of them reached the profiler"""
+        with self._profile_lock:
+            if self.profile is None:
+                return None
+            self.profile.create_stats()
+            if not self.profile.stats:
+                return None
+            return pstats.Stats(self.profile)
+
+
+class ProfileTicket:
+    """One claimed request: route its blocking work through ``wrap``/``iterate``, then close"""
+
+    def __init__(self, capture: RequestCapture):
+        self.capture = capture
+        self._closed = False
+
+    def wrap(self, func: Callable[..., Any]) -> Callable[..., Any]:
+        def call(*args: Any) -> Any:
+            try:
+                return self.capture.call(func, *args)
+            except BaseException:
+                # The request ends here
+                self.close()
+                raise
+        return call
+
+    def iterate(self, chunks: Iterator[bytes]) -> Iterator[bytes]:
+        sentinel = object()
+        try:
+            while True:
+                chunk = self.capture.call(next, chunks, sentinel)
+                if chunk is sentinel:
+                    break
+                yield chunk
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+            self.close()
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            self.capture.finish_one()
+
+    def __del__(self):
+        # Safety net for requests that ended on a path that did not close
+        self.close()
+
+
+class Profiler:
+    """One profiling session at a time for the whole process"""
+
+    def __init__(self):
+        self._busy = threading.Lock()
+        self._capture: Optional[RequestCapture] = None
+        self.sessions = 0
+
+    def _start(self):
+        if not self._busy.acquire(blocking=False):
+            raise ProfilerBusyError("A profiling session is already running")
+        self.sessions += 1
+
+    def claim(self) -> Optional[ProfileTicket]:
+        """A ticket if a session wants this generate request; a single attribute read otherwise"""
+        capture = self._capture
+        if capture is None or not capture.claim():
+            return None
+        return ProfileTicket(capture)
+
+    def _wait_for_requests(self, count: int, timeout: float, profile: bool) -> RequestCapture:
+        capture = RequestCapture(count, profile)
+        self._capture = capture
+        try:
+            capture.done.wait(timeout)
+        finally:
+            self._capture = None
+        return capture
+
+    def sample(self, seconds: float, interval: float, include_idle: bool) -> Tuple[str, int]:
+        """Collapsed stacks over ``seconds`` and the number of sweeps taken; blocks"""
+        self._start()
+        try:
+            stacks, sweeps = sample_stacks(seconds, interval, include_idle)
+        finally:
+            self._busy.release()
+        return collapsed(stacks), sweeps
+
+    def profile_requests(self, count: int, timeout: float) -> Tuple[Optional[pstats.Stats], int]:
+        """cProfile of the next ``count`` generate requests (fewer if ``timeout`` passes first); blocks"""
+        self._start()
+        try:
+            capture = self._wait_for_requests(count, timeout, profile=True)
+        finally:
+            self._busy.release()
+        return capture.stats(), capture.completed
+
+    def memory_diff(self, seconds: float, requests: Optional[int], limit: int, frames: int = 1,
+                    key_type: str = "lineno") -> Tuple[str, int]:
+        """
+        Allocations that grew between two tracemalloc snapshots taken around
+        ``seconds`` or the next ``requests`` generate requests; blocks.
+        """
+        self._start()
+        started_tracing = not tracemalloc.is_tracing()
+        try:
+            if started_tracing:
+                tracemalloc.start(frames)
+            before = _snapshot()
+            if requests:
+                completed = self._wait_for_requests(requests, seconds, profile=False).completed
+            else:
+                time.sleep(seconds)
+                completed = 0
+            after = _snapshot()
+        finally:
+            if started_tracing:
+                tracemalloc.stop()
+            self._busy.release()
+        return _format_diff(after.compare_to(before, key_type), limit), completed
+
+    def stats(self) -> Dict[str, Any]:
+        return {"busy": self._busy.locked(), "sessions": self.sessions, "tracing": tracemalloc.is_tracing()}
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces((
+        tracemalloc.Filter(False, tracemalloc.__file__),
+        tracemalloc.Filter(False, __file__),
+        tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+    ))
+
+
+def _format_diff(differences: List[tracemalloc.StatisticDiff], limit: int) -> str:
+    growth = sum(stat.size_diff for stat in differences)
+    lines = [f"# {growth / 1024:+.1f} KiB across {len(differences)} locations, largest growth first"]
+    for stat in sorted(differences, key=lambda stat: stat.size_diff, reverse=True)[:limit]:
+        lines.append(str(stat))
+    return "\n".join(lines) + "\n"
+
+
+def pstats_dump(stats: pstats.Stats) -> bytes:
+    """The bytes Stats.dump_stats() would write; load them with pstats.Stats(path)"""
+    return marshal.dumps(stats.stats)
+
+
+def pstats_text(stats: pstats.Stats, limit: int, sort: str = "cumulative") -> str:
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.sort_stats(sort).print_stats(limit)
+    return stream.getvalue()
+
+
+# Global instance
+profiler = Profiler()
@@ -0,0 +1,329 @@
+"""
+In-memory template registry with change-driven invalidation
+"""
+import base64
+import binascii
+import bisect
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Hashable, List, Optional, Set, Tuple
+from ..models.schemas import TemplateInfo, TemplateMetadata
+from ..config.settings import settings
+from .catalog import Signature, TemplateCatalog, create_catalog, parse_metadata, template_signature
+
+
+@dataclass
+class RegistryEntry:
+    """Parsed state of a single template directory"""
+    name: str
+    path: Path
+    signature: Optional[Signature] = None
+    info: Optional[TemplateInfo] = None
+    metadata: Optional[TemplateMetadata] = None
+    error: Optional[Exception] = None
+    loaded: bool = False
+
+
+@dataclass
+class RegistryIndexes:
+    """Inverted indexes over the catalog; every posting list is sorted by name"""
+    names: List[str]
+    infos: Dict[str, TemplateInfo]
+    tags: Dict[str, List[str]]
+    authors: Dict[str, List[str]]
+    version: int = 0
+
+
+def encode_cursor(name: str) -> str:
+    return base64.urlsafe_b64encode(name.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        return base64.b64decode(cursor + "=" * (-len(cursor) % 4), altchars=b"-_", validate=True).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+@dataclass
+class RegistryStats:
+    hits: int = 0
+    misses: int = 0
+    invalidations: int = 0
+    rescans: int = 0
+
+
+class TemplateRegistry:
+    """
+    Process-wide cache of template metadata.
+
+    Templates are parsed once and kept in memory. Each template is re-read only
+    when its directory mtime or its metadata.json changes, or when it is
+    invalidated explicitly (e.g. by register_template()). Filesystem checks are
+    throttled to once per ``check_interval`` seconds.
+
+    With a ``catalog``, parsing moves into the shared TemplateCatalog: each
+    check runs a reconcile pass and loads only the rows that changed since the
+    last one, so worker processes share one index instead of each re-parsing
+    every template.
+    """
+
+    def __init__(self, templates_dir: Optional[str] = None, check_interval: Optional[float] = None,
+                 catalog: Optional[TemplateCatalog] = None):
+        self.catalog = catalog
+        self._catalog_generation: Optional[int] = None
+        self._forced: Set[str] = set()
+        self._force_all = False
+        self._templates_dir = templates_dir
+        self._check_interval = check_interval
+        self._lock = threading.RLock()
+        self._entries: Dict[str, RegistryEntry] = {}
+        self._root: Optional[Path] = None
+        self._root_mtime: Optional[int] = None
+        self._checked_at = 0.0
+        self._stats = RegistryStats()
+        self._memo: Dict[Hashable, Tuple[int, Any]] = {}
+        self.version = 0
+
+    @property
+    def root(self) -> Path:
+        return Path(self._templates_dir or settings.templates_dir)
+
+    @property
+    def check_interval(self) -> float:
+        if self._check_interval is not None:
+            return self._check_interval
+        return settings.template_check_interval
+
+    def list_templates(self) -> List[TemplateInfo]:
+        """Return summary info for every template, sorted by name"""
+        with self._lock:
+            self._refresh()
+            return [self._load(entry).info for _, entry in sorted(self._entries.items())]
+
+    def indexes(self) -> RegistryIndexes:
+        """Tag and author indexes, rebuilt only when the registry changes"""
+        return self.memoize("indexes", self._build_indexes)
+
+    def query(self, tags: Optional[List[str]] = None, author: Optional[str] = None,
+              limit: Optional[int] = None, cursor: Optional[str] = None) -> Tuple[List[TemplateInfo], Optional[str]]:
+        """
+        Return one page of templates matching every given tag and the author.
+
+        Tags and author match case-insensitively. ``cursor`` is the opaque value
+        returned with the previous page; the second item of the result is the
+        cursor for the next page, or None on the last one.
+        """
+        indexes = self.indexes()
+        candidates = indexes.names
+        if tags:
+            for tag in tags:
+                posting = indexes.tags.get(tag.lower(), [])
+                candidates = posting if candidates is indexes.names else _intersect(candidates, posting)
+        if author:
+            posting = indexes.authors.get(author.lower(), [])
+            candidates = posting if candidates is indexes.names else _intersect(candidates, posting)
+
+        start = bisect.bisect_right(candidates, decode_cursor(cursor)) if cursor else 0
+        end = len(candidates) if limit is None else start + limit
+        page = candidates[start:end]
+        next_cursor = encode_cursor(page[-1]) if page and end < len(candidates) else None
+        return [indexes.infos[name] for name in page], next_cursor
+
+    def get_metadata(self, template_name: str) -> TemplateMetadata:
+        """Return the parsed metadata for a template"""
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(template_name)
+            if entry is None:
+                raise FileNotFoundError(f"Template '{template_name}' not found")
+            self._load(entry)
+            if entry.error is not None:
+                raise entry.error
+            return entry.metadata
+
+    def get_path(self, template_name: str) -> Path:
+        """Return the directory of a registered template"""
+        with self._lock:
+            self._refresh()
+            entry = self._entries.get(template_name)
+            if entry is None:
+                raise FileNotFoundError(f"Template '{template_name}' not found")
+            return entry.path
+
+    def names(self) -> List[str]:
+        with self._lock:
+            self._refresh()
+            return sorted(self._entries)
+
+    def memoize(self, key: Hashable, build: Callable[[], Any]) -> Any:
+        """
+        Cache a value derived from registry contents (e.g. a serialized
+        response) until the registry version changes.
+        """
+        with self._lock:
+            self._refresh()
+            cached = self._memo.get(key)
+            if cached is not None and cached[0] == self.version:
+                return cached[1]
+            value = build()
+            self._memo[key] = (self.version, value)
+            return value
+
+    def invalidate(self, template_name: Optional[str] = None):
+        """Drop cached state for one template, or for all of them"""
+        with self._lock:
+            self._stats.invalidations += 1
+            # Force a rescan on the next access: a new template changes the root
+            # mtime too, but mtime granularity is too coarse to rely on
+            self._checked_at = 0.0
+            self._root_mtime = None
+            self.version += 1
+            if self.catalog is not None:
+                # Re-index on the next access even if the signature looks unchanged
+                if template_name is None:
+                    self._force_all = True
+                else:
+                    self._forced.add(template_name)
+                return
+            if template_name is None:
+                targets = list(self._entries.values())
+            else:
+                targets = [self._entries[template_name]] if template_name in self._entries else []
+            for entry in targets:
+                entry.loaded = False
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                "templates": len(self._entries),
+                "loaded": sum(1 for entry in self._entries.values() if entry.loaded),
+                "hits": self._stats.hits,
+                "misses": self._stats.misses,
+                "invalidations": self._stats.invalidations,
+                "rescans": self._stats.rescans,
+                "version": self.version,
+            }
+            if self.catalog is not None:
+                stats["catalog"] = self.catalog.stats()
+            return stats
+
+    def _build_indexes(self) -> RegistryIndexes:
+        infos = {info.name: info for info in self.list_templates()}
+        tags: Dict[str, List[str]] = {}
+        authors: Dict[str, List[str]] = {}
+        for name in sorted(infos):
+            info = infos[name]
+            for tag in {tag.lower() for tag in info.tags or []}:
+                tags.setdefault(tag, []).append(name)
+            if info.author:
+                authors.setdefault(info.author.lower(), []).append(name)
+        return RegistryIndexes(names=sorted(infos), infos=infos, tags=tags, authors=authors, version=self.version)
+
+    def _refresh(self):
+        """Re-stat the templates directory if the check interval has elapsed"""
+        now = time.monotonic()
+        root = self.root
+        if root != self._root:
+            self._root = root
+            self._root_mtime = None
+            self._entries = {}
+            self._memo = {}
+            self._catalog_generation = None
+            self.version += 1
+        elif self._checked_at and now - self._checked_at < self.check_interval:
+            return
+        self._checked_at = now
+
+        if not root.exists():
+            root.mkdir(parents=True, exist_ok=True)
+
+        if self.catalog is not None:
+            self._sync_catalog(root)
+            return
+
+        root_mtime = root.stat().st_mtime_ns
+        if root_mtime != self._root_mtime:
+            self._rescan(root)
+            self._root_mtime = root_mtime
+
+        for entry in self._entries.values():
+            if entry.loaded and template_signature(entry.path) != entry.signature:
+                entry.loaded = False
+                self.version += 1
+
+    def _rescan(self, root: Path):
+        """Pick up added and removed template directories"""
+        self._stats.rescans += 1
+        found = set()
+        with os.scandir(root) as it:
+            for item in it:
+                if item.is_dir():
+                    found.add(item.name)
+        for name in list(self._entries):
+            if name not in found:
+                del self._entries[name]
+                self.version += 1
+        for name in found:
+            if name not in self._entries:
+                self._entries[name] = RegistryEntry(name=name, path=root / name)
+                self.version += 1
+
+    def _sync_catalog(self, root: Path):
+        """Reconcile the catalog, then load the rows that changed since the last sync"""
+        forced = set(self._forced)
+        if self._force_all:
+            forced.update(self._entries)
+        self.catalog.reconcile(root, forced)
+        self._forced.clear()
+        self._force_all = False
+
+        generation = self.catalog.generation()
+        if generation == self._catalog_generation:
+            return
+        self._stats.rescans += 1
+        rows = self.catalog.rows(since=self._catalog_generation or 0)
+        names = self.catalog.names()
+        for name in list(self._entries):
+            if name not in names:
+                del self._entries[name]
+        for row in rows:
+            self._stats.misses += 1
+            self._entries[row.name] = RegistryEntry(
+                name=row.name,
+                path=root / row.name,
+                signature=row.signature,
+                info=row.info,
+                metadata=row.metadata,
+                error=ValueError(row.error) if row.error is not None else None,
+                loaded=True
+            )
+        self._catalog_generation = generation
+        self.version += 1
+
+    def _load(self, entry: RegistryEntry) -> RegistryEntry:
+        """Parse a template's metadata unless the cached copy is still valid"""
+        if entry.loaded:
+            self._stats.hits += 1
+            return entry
+        self._stats.misses += 1
+
+        entry.signature = template_signature(entry.path)
+        entry.info, entry.metadata, entry.error = parse_metadata(entry.name, entry.path)
+        entry.loaded = True
+        return entry
+
+
+def _intersect(left: List[str], right: List[str]) -> List[str]:
+    """Intersect two sorted posting lists"""
+    if len(left) > len(right):
+        left, right = right, left
+    members = set(right)
+    return [name for name in left if name in members]
+
+
+# Global instance
+template_registry = TemplateRegistry(catalog=create_catalog(settings.catalog_backend, settings.catalog_path))
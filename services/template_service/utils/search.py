@@ -0,0 +1,211 @@
+"""
+Full-text search over the template catalog
+"""
+import bisect
+import heapq
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+from ..config.settings import settings
+from ..models.schemas import TemplateInfo
+from .registry import TemplateRegistry, template_registry
+
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+# Relative weight of a term occurrence in each field
+FIELD_WEIGHTS = {
+    "name": 4.0,
+    "tags": 3.0,
+    "description": 1.5,
+    "author": 1.0,
+    "parameters": 1.0,
+    "readme": 0.3,
+}
+
+# BM25 parameters
+_K1 = 1.2
+_B = 0.75
+# Matches on a prefix of a term count for less than whole-word matches
+_PREFIX_WEIGHT = 0.5
+_PREFIX_MIN_LENGTH = 2
+_PREFIX_MAX_EXPANSIONS = 50
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens; 'fastapi-minimal' -> ['fastapi', 'minimal']"""
+    return TOKEN_PATTERN.findall(text.lower())
+
+
+class SearchIndex:
+    """
+    In-memory inverted index with BM25 ranking.
+
+    Documents are built from each template's metadata and, optionally, its
+    README. The index follows the registry: whenever the registry version
+    changes, only templates whose metadata was re-parsed (or that were added or
+    removed) are re-indexed. README edits do not touch the registry, so their
+    mtimes are re-checked at most once per registry ``check_interval`` and a
+    changed README re-indexes just its template.
+    """
+
+    def __init__(self, registry: Optional[TemplateRegistry] = None, include_readme: Optional[bool] = None):
+        self.registry = registry or template_registry
+        self.include_readme = settings.search_include_readme if include_readme is None else include_readme
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, float]] = defaultdict(dict)
+        self._doc_terms: Dict[str, List[str]] = {}
+        self._doc_lengths: Dict[str, float] = {}
+        self._total_length = 0.0
+        self._norms: Optional[Dict[str, float]] = None
+        self._infos: Dict[str, TemplateInfo] = {}
+        self._vocabulary: Optional[List[str]] = None
+        self._version: Optional[int] = None
+        self._readmes: Dict[str, Optional[Tuple[int, int]]] = {}
+        self._readmes_checked_at = 0.0
+        self.reindexed = 0
+
+    def search(self, query: str, limit: int = 20) -> List[Tuple[TemplateInfo, float]]:
+        """Rank templates for a free-text query; returns (info, score) pairs, best first"""
+        terms = tokenize(query)
+        with self._lock:
+            self._sync()
+            if not terms or not self._doc_lengths:
+                return []
+            scores: Dict[str, float] = defaultdict(float)
+            for term in set(terms):
+                for match, weight in self._expand(term):
+                    self._score_term(match, weight, scores)
+            ranked = heapq.nsmallest(limit, scores.items(), key=lambda item: (-item[1], item[0]))
+            return [(self._infos[name], round(score, 4)) for name, score in ranked]
+
+    def _expand(self, term: str) -> List[Tuple[str, float]]:
+        """The term itself plus vocabulary terms it is a prefix of"""
+        if self._vocabulary is None:
+            self._vocabulary = sorted(self._postings)
+        if len(term) < _PREFIX_MIN_LENGTH:
+            return [(term, 1.0)]
+        matches = []
+        start = bisect.bisect_left(self._vocabulary, term)
+        for candidate in self._vocabulary[start:start + _PREFIX_MAX_EXPANSIONS]:
+            if not candidate.startswith(term):
+                break
+            matches.append((candidate, 1.0 if candidate == term else _PREFIX_WEIGHT))
+        return matches
+
+    def _score_term(self, term: str, weight: float, scores: Dict[str, float]):
+        posting = self._postings.get(term)
+        if not posting:
+            return
+        documents = len(self._doc_lengths)
+        if self._norms is None:
+            average_length = self._total_length / documents
+            self._norms = {
+                name: _K1 * (1 - _B + _B * length / average_length)
+                for name, length in self._doc_lengths.items()
+            }
+        norms = self._norms
+        factor = weight * (_K1 + 1) * math.log(1 + (documents - len(posting) + 0.5) / (len(posting) + 0.5))
+        for name, frequency in posting.items():
+            scores[name] += factor * frequency / (frequency + norms[name])
+
+    def _sync(self):
+        """Bring the index up to date with the registry"""
+        indexes = self.registry.indexes()
+        now = time.monotonic()
+        readmes_due = self.include_readme and now - self._readmes_checked_at >= self.registry.check_interval
+        if indexes.version == self._version and not readmes_due:
+            return
+        infos = indexes.infos
+        for name in list(self._infos):
+            if name not in infos:
+                self._remove(name)
+        for name, info in infos.items():
+            readme = self._readme_stamp(name)
+            if self._infos.get(name) is not info or self._readmes.get(name) != readme:
+                self._remove(name)
+                self._add(name, info)
+                self._readmes[name] = readme
+        self._version = indexes.version
+        if self.include_readme:
+            self._readmes_checked_at = now
+
+    def _readme_stamp(self, name: str) -> Optional[Tuple[int, int]]:
+        """(mtime, size) of a template's README, None when there is none or it is not indexed"""
+        if not self.include_readme:
+            return None
+        try:
+            stat = (self.registry.get_path(name) / "README.md").stat()
+        except (FileNotFoundError, OSError):
+            return None
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def _document(self, name: str, info: TemplateInfo) -> Dict[str, float]:
+        fields = {
+            "name": f"{name} {info.name}",
+            "tags": " ".join(info.tags or []),
+            "description": info.description,
+            "author": info.author or "",
+            "parameters": "",
+            "readme": "",
+        }
+        try:
+            metadata = self.registry.get_metadata(name)
+            fields["parameters"] = " ".join(f"{p.name} {p.description}" for p in metadata.parameters)
+        except (FileNotFoundError, ValueError):
+            pass
+        if self.include_readme:
+            try:
+                readme = self.registry.get_path(name) / "README.md"
+                fields["readme"] = readme.read_text(errors="replace")[:settings.search_readme_max_bytes]
+            except (FileNotFoundError, OSError):
+                pass
+
+        frequencies: Dict[str, float] = defaultdict(float)
+        for field_name, text in fields.items():
+            for token in tokenize(text):
+                frequencies[token] += FIELD_WEIGHTS[field_name]
+        return frequencies
+
+    def _add(self, name: str, info: TemplateInfo):
+        frequencies = self._document(name, info)
+        for term, frequency in frequencies.items():
+            if term not in self._postings:
+                self._vocabulary = None
+            self._postings[term][name] = frequency
+        self._doc_terms[name] = list(frequencies)
+        self._doc_lengths[name] = sum(frequencies.values())
+        self._total_length += self._doc_lengths[name]
+        self._infos[name] = info
+        self._norms = None
+        self.reindexed += 1
+
+    def _remove(self, name: str):
+        if name not in self._infos:
+            return
+        for term in self._doc_terms.pop(name, []):
+            posting = self._postings.get(term)
+            if posting is not None:
+                posting.pop(name, None)
+                if not posting:
+                    del self._postings[term]
+                    self._vocabulary = None
+        self._total_length -= self._doc_lengths.pop(name, 0.0)
+        self._readmes.pop(name, None)
+        del self._infos[name]
+        self._norms = None
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "documents": len(self._infos),
+                "terms": len(self._postings),
+                "reindexed": self.reindexed,
+            }
+
+
+# Global instance
+search_index = SearchIndex()
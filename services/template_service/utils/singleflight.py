@@ -0,0 +1,162 @@
+"""
+Single-flight coalescing for identical concurrent generations
+"""
+import asyncio
+import time
+import weakref
+from dataclasses import dataclass
+from typing import AsyncIterator, Callable, Dict, Optional, Set, Tuple
+from ..config.settings import settings
+from .artifact_cache import Artifact
+
+
+@dataclass
+class Flight:
+    key: str
+    future: asyncio.Future
+    started_at: float
+    followers: int = 0
+
+
+class SingleFlight:
+    """
+    Lets the first request for a key do the work while concurrent duplicates
+    wait for its result.
+
+    Once the leader's plan is ready its archive is produced by a task of its
+    own, so the flight completes even if the leader's response never starts
+    or its client goes away. The task hands chunks to the leader's response
+    through a queue of ``buffer_chunks`` and waits while it is full, so a slow
+    client slows generation down instead of buffering the archive; once the
+    leader's response is gone the chunks only reach the artifact cache. The
+    cached Artifact is handed to every follower. A failed or timed-out flight
+    resolves to None and followers fall back to generating themselves.
+    """
+
+    def __init__(self, timeout: Optional[float] = None, buffer_chunks: int = 4):
+        self.timeout = settings.singleflight_timeout if timeout is None else timeout
+        self.buffer_chunks = buffer_chunks
+        self._flights: Dict[str, Flight] = {}
+        self._producers: Set[asyncio.Task] = set()
+        self.leaders = 0
+        self.coalesced = 0
+        self.failed = 0
+
+    def join(self, key: str) -> Tuple[Flight, bool]:
+        """Join the running flight for ``key``; returns (flight, is_leader)"""
+        flight = self._flights.get(key)
+        now = time.monotonic()
+        if flight is not None and not flight.future.done() and now - flight.started_at < self.timeout:
+            flight.followers += 1
+            self.coalesced += 1
+            return flight, False
+        flight = Flight(key=key, future=asyncio.get_running_loop().create_future(), started_at=now)
+        self._flights[key] = flight
+        self.leaders += 1
+        return flight, True
+
+    async def wait(self, flight: Flight) -> Optional[Artifact]:
+        """Wait for the leader's artifact; None means the caller must generate"""
+        remaining = self.timeout - (time.monotonic() - flight.started_at)
+        try:
+            return await asyncio.wait_for(asyncio.shield(flight.future), max(remaining, 0))
+        except asyncio.TimeoutError:
+            return None
+
+    def finish(self, flight: Flight, artifact: Optional[Artifact]):
+        if self._flights.get(flight.key) is flight:
+            del self._flights[flight.key]
+        if not flight.future.done():
+            flight.future.set_result(artifact)
+        if artifact is None:
+            self.failed += 1
+
+    def lead(self, flight: Flight, chunks: AsyncIterator[bytes],
+             result: Callable[[], Optional[Artifact]]) -> AsyncIterator[bytes]:
+        """
+        Start producing the leader's archive now and return its response body.
+
+        ``result`` looks up the shared Artifact once the archive is complete;
+        ``chunks`` must store the archive (artifact cache tee) for it to exist.
+        """
+        loop = asyncio.get_running_loop()
+        channel = _Channel(self.buffer_chunks)
+        producer = loop.create_task(self._produce(flight, chunks, result, channel))
+        # The loop only keeps weak references to tasks
+        self._producers.add(producer)
+        producer.add_done_callback(self._producers.discard)
+        body = channel.drain()
+        # A body that is dropped without ever being started never runs its finally
+        finalizer = weakref.finalize(body, _abandon_soon, loop, channel)
+        finalizer.atexit = False
+        return body
+
+    async def _produce(self, flight: Flight, chunks: AsyncIterator[bytes],
+                       result: Callable[[], Optional[Artifact]], channel: "_Channel"):
+        artifact = None
+        try:
+            async for chunk in chunks:
+                await channel.put(chunk)
+            artifact = result()
+            await channel.put(None)
+        except Exception as e:
+            await channel.put(e)
+        except BaseException as e:
+            channel.abandon()
+            raise
+        finally:
+            aclose = getattr(chunks, "aclose", None)
+            if aclose is not None:
+                await aclose()
+            self.finish(flight, artifact)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._flights),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+            "failed": self.failed,
+        }
+
+
+class _Channel:
+    """Bounded hand-off from a leader's producer task to its response body"""
+
+    def __init__(self, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.abandoned = False
+
+    async def put(self, item):
+        if not self.abandoned:
+            await self.queue.put(item)
+
+    def abandon(self):
+        """The response is gone: drop what is queued and stop queueing"""
+        self.abandoned = True
+        while not self.queue.empty():
+            # Also wakes a producer waiting for room
+            self.queue.get_nowait()
+
+    async def drain(self) -> AsyncIterator[bytes]:
+        try:
+            while True:
+                item = await self.queue.get()
+                if item is None:
+                    return
+                if isinstance(item, BaseException):
+                    raise item
+                yield item
+        finally:
+            self.abandon()
+
+
+def _abandon_soon(loop: asyncio.AbstractEventLoop, channel: _Channel):
+    try:
+        loop.call_soon_threadsafe(channel.abandon)
+    except RuntimeError:
+        # The loop is already closed, and the producer with it
+        pass
+
+
+# Global instance
+single_flight = SingleFlight()
@@ -0,0 +1,254 @@
+"""
+Precompiled in-memory template snapshots
+"""
+import hashlib
+import os
+import stat
+import threading
+import time
+import zlib
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, FrozenSet, List, Optional, Set, Tuple
+from ..config.settings import settings
+from .archive import ZIP_DEFLATED, ZIP_STORED, compress_entry, deflate
+from .compression import compression_level, entry_level
+from .metrics import GenerationTimings
+from .placeholders import CompiledTemplate, compile_template
+from .registry import template_registry
+
+
+# Only files with these suffixes get placeholder substitution
+TEMPLATED_SUFFIXES = frozenset([
+    '.py', '.md', '.txt', '.yml', '.yaml', '.json', '.toml',
+    '.Dockerfile', '.dockerfile', '.cfg', '.conf', '.ini'
+])
+
+
+@dataclass
+class SnapshotFile:
+    """A single template file, read once and kept in memory"""
+    path: str
+    mode: int
+    mtime: float
+    data: bytes
+    is_text: bool
+    template: Optional[CompiledTemplate] = None
+    crc: Optional[int] = None
+    # (method, payload, crc32) per compression level, for files without placeholders
+    compressed: Dict[Optional[int], Tuple[int, bytes, int]] = field(default_factory=dict, repr=False)
+
+    @property
+    def date_time(self) -> Tuple[int, int, int, int, int, int]:
+        # Zip timestamps cannot represent anything before 1980
+        return max(time.localtime(self.mtime)[:6], (1980, 1, 1, 0, 0, 0))
+
+
+@dataclass
+class TemplateSnapshot:
+    """All files of a template plus the fingerprint they were built from"""
+    name: str
+    path: Path
+    files: List[SnapshotFile]
+    fingerprint: str
+    content_hash: str
+    placeholder_names: FrozenSet[str] = frozenset()
+    checked_at: float = 0.0
+
+    @property
+    def total_bytes(self) -> int:
+        return sum(len(f.data) for f in self.files)
+
+
+def render_file(snapshot_file: SnapshotFile, values: Dict[str, bytes], unknown: Optional[Set[str]] = None) -> bytes:
+    """Render a snapshot file with pre-encoded placeholder values"""
+    if snapshot_file.template is None:
+        return snapshot_file.data
+    return snapshot_file.template.render(values, unknown)
+
+
+def file_entry(snapshot_file: SnapshotFile, values: Dict[str, bytes], level: Optional[int],
+               unknown: Optional[Set[str]] = None,
+               timings: Optional[GenerationTimings] = None) -> Tuple[int, bytes, int, int]:
+    """
+    Render and compress one file: returns (method, payload, crc32, size).
+
+    Files without placeholders render the same for every request: their CRC
+    and default-level payload are computed when the snapshot is built, and
+    payloads for other levels are computed once and kept. Render and
+    compress time are added to ``timings`` when given.
+    """
+    if snapshot_file.template is not None:
+        if timings is None:
+            data = snapshot_file.template.render(values, unknown)
+            return compress_entry(data, level) + (len(data),)
+        started = time.perf_counter()
+        data = snapshot_file.template.render(values, unknown)
+        rendered = time.perf_counter()
+        entry = compress_entry(data, level)
+        timings.render += rendered - started
+        timings.compress += time.perf_counter() - rendered
+        return entry + (len(data),)
+    entry = snapshot_file.compressed.get(level)
+    if entry is None:
+        entry = _compress_static(snapshot_file, level)
+    return entry + (len(snapshot_file.data),)
+
+
+def _compress_static(snapshot_file: SnapshotFile, level: Optional[int]) -> Tuple[int, bytes, int]:
+    if snapshot_file.crc is None:
+        snapshot_file.crc = zlib.crc32(snapshot_file.data)
+    if level is None:
+        entry = (ZIP_STORED, snapshot_file.data, snapshot_file.crc)
+    else:
+        entry = (ZIP_DEFLATED, deflate(snapshot_file.data, level), snapshot_file.crc)
+    snapshot_file.compressed[level] = entry
+    return entry
+
+
+def _walk(template_path: Path) -> List[Tuple[str, Path, os.stat_result]]:
+    """List every regular file below template_path with its stat result"""
+    found = []
+    for dirpath, dirnames, filenames in os.walk(template_path):
+        dirnames.sort()
+        for filename in sorted(filenames):
+            file_path = Path(dirpath) / filename
+            try:
+                file_stat = file_path.stat()
+            except FileNotFoundError:
+                continue
+            if stat.S_ISREG(file_stat.st_mode):
+                found.append((file_path.relative_to(template_path).as_posix(), file_path, file_stat))
+    return found
+
+
+def _fingerprint(entries: List[Tuple[str, Path, os.stat_result]]) -> str:
+    digest = hashlib.sha1()
+    for rel_path, _, file_stat in entries:
+        digest.update(f"{rel_path}\0{file_stat.st_size}\0{file_stat.st_mtime_ns}\0{file_stat.st_mode}\n".encode())
+    return digest.hexdigest()
+
+
+def template_fingerprint(template_path: Path) -> str:
+    """Cheap change detector: hashes paths, sizes, mtimes and modes only"""
+    return _fingerprint(_walk(template_path))
+
+
+def compile_snapshot(template_name: str, template_path: Path) -> TemplateSnapshot:
+    """Read a template directory once into an in-memory snapshot"""
+    entries = _walk(template_path)
+    default_level = compression_level(settings.compression_default)
+    content = hashlib.sha256()
+    files = []
+    placeholder_names = set()
+    for rel_path, file_path, file_stat in entries:
+        data = file_path.read_bytes()
+        try:
+            data.decode("utf-8")
+            is_text = True
+        except UnicodeDecodeError:
+            is_text = False
+        template = None
+        if is_text and file_path.suffix in TEMPLATED_SUFFIXES:
+            template = compile_template(data)
+            if len(template.literals) == 1 and template.literals[0] == data:
+                # Nothing to substitute or unescape
+                template = None
+            else:
+                placeholder_names.update(template.names)
+        snapshot_file = SnapshotFile(
+            path=rel_path,
+            mode=stat.S_IMODE(file_stat.st_mode) | stat.S_IFREG,
+            mtime=file_stat.st_mtime,
+            data=data,
+            is_text=is_text,
+            template=template
+        )
+        if template is None:
+            # Static file: compress it now so requests only splice the bytes in
+            _compress_static(snapshot_file, entry_level(rel_path, len(data), default_level))
+        files.append(snapshot_file)
+        content.update(f"{rel_path}\0{file_stat.st_mode}\0{len(data)}\0".encode())
+        content.update(data)
+
+    return TemplateSnapshot(
+        name=template_name,
+        path=template_path,
+        files=files,
+        fingerprint=_fingerprint(entries),
+        content_hash=content.hexdigest(),
+        placeholder_names=frozenset(placeholder_names),
+        checked_at=time.monotonic()
+    )
+
+
+class SnapshotStore:
+    """
+    Process-wide cache of compiled template snapshots.
+
+    A snapshot is rebuilt only when the template's fingerprint changes; the
+    fingerprint itself is re-checked at most once per check interval.
+    """
+
+    def __init__(self, check_interval: Optional[float] = None):
+        self._check_interval = check_interval
+        self._lock = threading.Lock()
+        self._build_locks: Dict[str, threading.Lock] = {}
+        self._snapshots: Dict[str, TemplateSnapshot] = {}
+        self.hits = 0
+        self.builds = 0
+
+    @property
+    def check_interval(self) -> float:
+        if self._check_interval is not None:
+            return self._check_interval
+        return settings.template_check_interval
+
+    def get(self, template_name: str) -> TemplateSnapshot:
+        """Return a current snapshot of the template, compiling it if needed"""
+        template_path = template_registry.get_path(template_name)
+        with self._lock:
+            build_lock = self._build_locks.setdefault(template_name, threading.Lock())
+
+        with build_lock:
+            snapshot = self._snapshots.get(template_name)
+            now = time.monotonic()
+            if snapshot is not None and snapshot.path == template_path:
+                if now - snapshot.checked_at < self.check_interval:
+                    self.hits += 1
+                    return snapshot
+                if template_fingerprint(template_path) == snapshot.fingerprint:
+                    snapshot.checked_at = now
+                    self.hits += 1
+                    return snapshot
+
+            snapshot = compile_snapshot(template_name, template_path)
+            self.builds += 1
+            with self._lock:
+                self._snapshots[template_name] = snapshot
+            return snapshot
+
+    def invalidate(self, template_name: Optional[str] = None):
+        with self._lock:
+            if template_name is None:
+                self._snapshots.clear()
+            else:
+                self._snapshots.pop(template_name, None)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            snapshots = list(self._snapshots.values())
+        return {
+            "snapshots": len(snapshots),
+            "files": sum(len(s.files) for s in snapshots),
+            "bytes": sum(s.total_bytes for s in snapshots),
+            "precompressed_bytes": sum(
+                len(entry[1]) for s in snapshots for f in s.files for entry in tuple(f.compressed.values())
+            ),
+            "hits": self.hits,
+            "builds": self.builds,
+        }
+
+
+# Global instance
+snapshot_store = SnapshotStore()
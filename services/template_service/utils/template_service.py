@@ -2,134 +2,46 @@
 Template service utilities and business logic
 """
 from pathlib import Path
-import shutil
-import tempfile
-import zipfile
 import io
 import json
-from typing import List, Dict, Any
+import time
+from collections import deque
+from concurrent.futures import Executor
+from dataclasses import dataclass, field
+from typing import List, Dict, Any, Callable, Iterator, Optional, Set, Tuple
 from datetime import datetime
-from ..models.schemas import TemplateInfo, TemplateMetadata, TemplateRegistrationRequest
+from ..models.schemas import (
+    ParameterError, ParameterValidationResult, TemplateInfo, TemplateMetadata, TemplateRegistrationRequest
+)
 from ..config.settings import settings
+from .registry import template_registry
+from .archive import TarStreamWriter, ZipStreamWriter, archive_format
+from .compression import compression_level, entry_level, zstd_level
+from .artifact_cache import artifact_key
+from .placeholders import compile_template, encode_values, unknown_placeholders
+from .metrics import GenerationTimings, observe_generation, observe_phase, template_requests
+from .validators import ParameterValidationError, validator_cache
+from .snapshot import snapshot_store, file_entry, render_file, TemplateSnapshot, TEMPLATED_SUFFIXES
 
 
 def get_available_templates() -> List[TemplateInfo]:
     """Get all available templates from the templates directory"""
-    templates_dir = Path(settings.templates_dir)
-    if not templates_dir.exists():
-        templates_dir.mkdir(parents=True, exist_ok=True)
-    
-    templates = []
-    for template_dir in templates_dir.iterdir():
-        if template_dir.is_dir():
-            # Look for template metadata
-            metadata_file = template_dir / "metadata.json"
-            if metadata_file.exists():
-                try:
-                    metadata = json.loads(metadata_file.read_text())
-                    # Count parameters if they exist in metadata
-                    param_count = len(metadata.get("parameters", []))
-                    templates.append(TemplateInfo(
-                        name=template_dir.name,
-                        description=metadata.get("description", "No description"),
-                        version=metadata.get("version", "1.0.0"),
-                        author=metadata.get("author"),
-                        tags=metadata.get("tags", []),
-                        parameter_count=param_count
-                    ))
-                except json.JSONDecodeError:
-                    templates.append(TemplateInfo(
-                        name=template_dir.name,
-                        description="Invalid metadata.json",
-                        version="1.0.0",
-                        parameter_count=0
-                    ))
-            else:
-                templates.append(TemplateInfo(
-                    name=template_dir.name,
-                    description="No description",
-                    version="1.0.0",
-                    parameter_count=0
-                ))
-    
-    return templates
+    return template_registry.list_templates()
 
 
 def validate_parameters(template_name: str, parameters: Dict[str, Any]) -> Dict[str, Any]:
-    """Validate parameters against template requirements"""
-    template_metadata = get_template_detail(template_name)
-    validated_params = parameters.copy()
-    
-    for param_def in template_metadata.parameters:
-        param_name = param_def.name
-        param_type = param_def.type
-        required = param_def.required
-        default = param_def.default
-        
-        # Check if required parameter is missing
-        if required and param_name not in validated_params:
-            if default is not None:
-                validated_params[param_name] = default
-            else:
-                raise ValueError(f"Required parameter '{param_name}' is missing")
-        
-        # If parameter was provided, validate its type
-        if param_name in validated_params:
-            value = validated_params[param_name]
-            if param_type == 'string':
-                if not isinstance(value, str):
-                    validated_params[param_name] = str(value)
-            elif param_type == 'integer':
-                try:
-                    validated_params[param_name] = int(value)
-                except ValueError:
-                    raise ValueError(f"Parameter '{param_name}' must be an integer")
-            elif param_type == 'boolean':
-                if isinstance(value, str):
-                    validated_params[param_name] = value.lower() in ('true', '1', 'yes', 'on')
-                else:
-                    validated_params[param_name] = bool(value)
-            elif param_type == 'float':
-                try:
-                    validated_params[param_name] = float(value)
-                except ValueError:
-                    raise ValueError(f"Parameter '{param_name}' must be a float")
-    
-    # Check for any parameters that aren't defined in the template
-    allowed_params = {param.name for param in template_metadata.parameters}
-    for param_name in validated_params:
-        if param_name not in allowed_params:
-            # For now, we'll allow extra parameters, but in a real implementation
-            # you might want to restrict to only defined parameters
-            pass
-    
-    return validated_params
+    """
+    Validate parameters against template requirements.
+
+    Uses the template's compiled validator; raises ParameterValidationError
+    (a ValueError) listing every invalid parameter.
+    """
+    return validator_cache.get(template_name).validate(parameters)
 
 
 def get_template_detail(template_name: str) -> TemplateMetadata:
     """Get detailed information about a specific template"""
-    templates_dir = Path(settings.templates_dir)
-    template_path = templates_dir / template_name
-    
-    if not template_path.exists():
-        raise FileNotFoundError(f"Template '{template_name}' not found")
-    
-    # Look for template metadata
-    metadata_file = template_path / "metadata.json"
-    if metadata_file.exists():
-        try:
-            metadata = json.loads(metadata_file.read_text())
-            return TemplateMetadata(**metadata)
-        except json.JSONDecodeError:
-            raise ValueError(f"Invalid metadata.json for template '{template_name}'")
-    else:
-        # Create basic metadata from directory
-        return TemplateMetadata(
-            name=template_name,
-            description="No description",
-            version="1.0.0",
-            created_at=datetime.now()
-        )
+    return template_registry.get_metadata(template_name)
 
 
 def register_template(request: TemplateRegistrationRequest) -> bool:
@@ -138,7 +50,7 @@ def register_template(request: TemplateRegistrationRequest) -> bool:
     template_path = templates_dir / request.name
     
     # Check if template already exists
-    if template_path.exists():
+    if template_path.exists() or request.name in template_registry.names():
         raise ValueError(f"Template '{request.name}' already exists")
     
     # Create template directory
@@ -192,59 +104,391 @@ A project generated from the {request.name} template.
     with open(template_path / "requirements.txt", 'w') as f:
         f.write("fastapi>=0.104.1\nuvicorn[standard]>=0.24.0\npydantic>=2.0.0\n")
     
+    # Index the new template now so every worker sees it on its next catalog sync
+    template_registry.invalidate(request.name)
+    template_registry.get_metadata(request.name)
     return True
 
 
-def customize_project(project_path: Path, project_name: str, parameters: Dict[str, Any]):
-    """Apply project-specific customizations"""
-    # Replace common placeholders in files
+def customize_project(project_path: Path, project_name: str, parameters: Dict[str, Any]) -> Set[str]:
+    """Apply project-specific customizations and return unresolved placeholder names"""
+    values = encode_values(placeholder_values(project_name, parameters))
+    unknown = set()
     for file_path in project_path.rglob('*'):
-        if file_path.is_file() and file_path.suffix in ['.py', '.md', '.txt', '.yml', '.yaml', '.json', '.toml', '.Dockerfile', '.dockerfile', '.cfg', '.conf', '.ini']:
+        if file_path.is_file() and file_path.suffix in TEMPLATED_SUFFIXES:
+            data = file_path.read_bytes()
             try:
-                content = file_path.read_text()
-                # Replace placeholders
-                content = content.replace('{{PROJECT_NAME}}', project_name)
-                content = content.replace('{{SERVICE_NAME}}', project_name)
-                
-                # Apply additional parameters
-                for key, value in parameters.items():
-                    content = content.replace(f'{{{{{key}}}}}', str(value))
-                
-                file_path.write_text(content)
+                data.decode('utf-8')
             except UnicodeDecodeError:
                 # Skip binary files
                 continue
+            rendered = compile_template(data).render(values, unknown)
+            if rendered != data:
+                file_path.write_bytes(rendered)
+    return unknown
 
 
-def generate_project_zip(template_name: str, project_name: str, parameters: Dict[str, Any]) -> io.BytesIO:
-    """Generate a project from a template and return as zip buffer"""
-    templates_dir = Path(settings.templates_dir)
-    template_path = templates_dir / template_name
-    
-    if not template_path.exists():
-        raise FileNotFoundError(f"Template '{template_name}' not found")
+def unresolved_placeholders(template_name: str, parameters: Dict[str, Any]) -> List[str]:
+    """List placeholders in a template that the given parameters leave unresolved"""
+    snapshot = snapshot_store.get(template_name)
+    values = placeholder_values('', parameters)
+    return sorted(unknown_placeholders(snapshot.placeholder_names, values))
+
+
+def validate_batch(items: List[Tuple[str, Dict[str, Any]]]) -> List[ParameterValidationResult]:
+    """
+    Validate many (template, parameters) pairs, one result per item.
+
+    Failures are reported per item with field-level errors instead of failing
+    the whole batch; repeated pairs are validated once.
+    """
+    results: Dict[Tuple[str, str], ParameterValidationResult] = {}
+    ordered = []
+    for template_name, parameters in items:
+        memo_key = (template_name, json.dumps(parameters, sort_keys=True, default=str))
+        if memo_key not in results:
+            try:
+                validated = validate_parameters(template_name, parameters)
+                results[memo_key] = ParameterValidationResult(
+                    template_name=template_name,
+                    valid=True,
+                    parameters=validated,
+                    unresolved_placeholders=unresolved_placeholders(template_name, validated)
+                )
+            except FileNotFoundError:
+                results[memo_key] = ParameterValidationResult(
+                    template_name=template_name,
+                    valid=False,
+                    errors=[ParameterError(message=f"Template '{template_name}' not found")]
+                )
+            except ParameterValidationError as e:
+                results[memo_key] = ParameterValidationResult(
+                    template_name=template_name,
+                    valid=False,
+                    errors=[ParameterError(**error) for error in e.errors]
+                )
+            except ValueError as e:
+                results[memo_key] = ParameterValidationResult(
+                    template_name=template_name,
+                    valid=False,
+                    errors=[ParameterError(message=str(e))]
+                )
+            except Exception as e:
+                # One broken template must not fail the rest of the batch
+                results[memo_key] = ParameterValidationResult(
+                    template_name=template_name,
+                    valid=False,
+                    errors=[ParameterError(message=f"Error validating parameters: {str(e)}")]
+                )
+        ordered.append(results[memo_key])
+    return ordered
+
+
+def placeholder_values(project_name: str, parameters: Dict[str, Any]) -> Dict[str, str]:
+    """Build the placeholder -> value mapping used to render a project"""
+    values = {key: str(value) for key, value in parameters.items()}
+    # The built-in placeholders always win over parameters of the same name
+    values['PROJECT_NAME'] = project_name
+    values['SERVICE_NAME'] = project_name
+    return values
+
+
+@dataclass
+class GenerationPlan:
+    """Everything needed to render a project, resolved before any output is sent"""
+    template_name: str
+    project_name: str
+    parameters: Dict[str, Any]
+    snapshot: TemplateSnapshot
+    values: Dict[str, bytes]
+    unresolved: List[str] = field(default_factory=list)
+    cache_key: str = ""
+    compression: str = "default"
+    format: str = "zip"
+    timings: GenerationTimings = field(default_factory=GenerationTimings, repr=False)
+
+    @property
+    def level(self) -> Optional[int]:
+        return compression_level(self.compression)
+
+    @property
+    def media_type(self) -> str:
+        return archive_format(self.format)[0]
+
+    @property
+    def filename(self) -> str:
+        return self.project_name + archive_format(self.format)[1]
+
+
+def prepare_generation(template_name: str, project_name: str, parameters: Dict[str, Any],
+                       compression: Optional[str] = None, format: Optional[str] = None) -> GenerationPlan:
+    """Validate a generation request; raises FileNotFoundError or ValueError"""
+    format = format or "zip"
+    archive_format(format)
+    if compression is None and format == "tar.zst" and settings.compression_default == "none":
+        # A configured default of "none" cannot apply to zstd; only an explicit request is rejected
+        compression = "fast"
+    compression = compression or settings.compression_default
+    compression_level(compression)
+    if format == "tar.zst":
+        zstd_level(compression)
+    timings = GenerationTimings()
+    started = time.perf_counter()
+    snapshot = snapshot_store.get(template_name)
+    loaded = time.perf_counter()
+    timings.load = loaded - started
+    observe_phase("load", timings.load)
+    template_requests.labels(template_name).inc()
     
     # Validate parameters against template requirements
     validated_parameters = validate_parameters(template_name, parameters)
-    
-    # Create a temporary directory for the project
-    with tempfile.TemporaryDirectory() as temp_dir:
-        temp_project_path = Path(temp_dir) / project_name
-        
-        # Copy template files to temp directory
-        shutil.copytree(template_path, temp_project_path, dirs_exist_ok=True)
-        
-        # Apply parameters to template files
-        customize_project(temp_project_path, project_name, validated_parameters)
-        
-        # Create a zip file of the generated project
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            for file_path in temp_project_path.rglob('*'):
-                if file_path.is_file():
-                    # Calculate relative path from project directory
-                    rel_path = file_path.relative_to(temp_project_path)
-                    zip_file.write(file_path, rel_path)
-        
-        zip_buffer.seek(0)
-        return zip_buffer
\ No newline at end of file
+    timings.validate = time.perf_counter() - loaded
+    observe_phase("validate", timings.validate)
+    values = placeholder_values(project_name, validated_parameters)
+    return GenerationPlan(
+        template_name=template_name,
+        project_name=project_name,
+        parameters=validated_parameters,
+        snapshot=snapshot,
+        values=encode_values(values),
+        unresolved=sorted(unknown_placeholders(snapshot.placeholder_names, values)),
+        cache_key=artifact_key(snapshot.content_hash, project_name, validated_parameters, f"{format}:{compression}"),
+        compression=compression,
+        format=format,
+        timings=timings
+    )
+
+
+def stream_project_archive(plan: GenerationPlan, chunk_size: Optional[int] = None,
+                           progress: Optional[Callable[[int, int], None]] = None) -> Iterator[bytes]:
+    """Render a project in the plan's archive format, yielding bytes as files are written"""
+    if plan.format == "zip":
+        return stream_project_zip(plan, chunk_size, progress)
+    return stream_project_tar(plan, chunk_size, progress)
+
+
+def stream_project_zip(plan: GenerationPlan, chunk_size: Optional[int] = None,
+                       progress: Optional[Callable[[int, int], None]] = None) -> Iterator[bytes]:
+    """
+    Render a project straight from its snapshot, yielding zip bytes as files are written.
+
+    ``progress`` is called with (files done, files total) after every file.
+    """
+    chunk_size = chunk_size or settings.stream_chunk_size
+    level = plan.level
+    writer = ZipStreamWriter()
+    pending = []
+    pending_size = 0
+    total = len(plan.snapshot.files)
+    for index, snapshot_file in enumerate(plan.snapshot.files, 1):
+        method, payload, crc, size = file_entry(
+            snapshot_file, plan.values, entry_level(snapshot_file.path, len(snapshot_file.data), level),
+            timings=plan.timings
+        )
+        chunk = writer.add_raw(
+            snapshot_file.path, payload, crc, size, method,
+            mode=snapshot_file.mode,
+            date_time=snapshot_file.date_time
+        )
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if progress is not None:
+            progress(index, total)
+        if pending_size >= chunk_size:
+            yield b"".join(pending)
+            pending = []
+            pending_size = 0
+    pending.append(writer.finish())
+    observe_generation(plan.timings, plan.format, writer.bytes_written)
+    yield b"".join(pending)
+
+
+def stream_project_tar(plan: GenerationPlan, chunk_size: Optional[int] = None,
+                       progress: Optional[Callable[[int, int], None]] = None) -> Iterator[bytes]:
+    """Render a project as a tar stream, compressed according to ``plan.format``"""
+    chunk_size = chunk_size or settings.stream_chunk_size
+    if plan.format == "tar.gz":
+        level = plan.level
+        writer = TarStreamWriter("gz", 0 if level is None else level)
+    elif plan.format == "tar.zst":
+        writer = TarStreamWriter("zst", zstd_level(plan.compression))
+    else:
+        writer = TarStreamWriter()
+    pending = []
+    pending_size = 0
+    total = len(plan.snapshot.files)
+    timings = plan.timings
+    for index, snapshot_file in enumerate(plan.snapshot.files, 1):
+        started = time.perf_counter()
+        data = render_file(snapshot_file, plan.values)
+        rendered = time.perf_counter()
+        chunk = writer.add_file(
+            snapshot_file.path,
+            data,
+            mode=snapshot_file.mode,
+            mtime=snapshot_file.mtime
+        )
+        timings.render += rendered - started
+        timings.compress += time.perf_counter() - rendered
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if progress is not None:
+            progress(index, total)
+        if pending_size >= chunk_size:
+            yield b"".join(pending)
+            pending = []
+            pending_size = 0
+    pending.append(writer.finish())
+    observe_generation(timings, plan.format, writer.bytes_written)
+    yield b"".join(pending)
+
+
+@dataclass
+class RenderedFile:
+    """A rendered and compressed archive entry, ready to be written in order"""
+    path: str
+    payload: bytes
+    crc: int
+    size: int
+    method: int
+    mode: int
+    date_time: Tuple[int, int, int, int, int, int]
+
+
+def prepare_batch(items: List[Tuple[str, str, Dict[str, Any]]],
+                  compression: Optional[str] = None,
+                  timings: Optional[GenerationTimings] = None) -> List[GenerationPlan]:
+    """
+    Validate a batch of (template, project, parameters) requests.
+
+    Snapshots come from the shared store and each distinct (template,
+    parameters) pair is validated once. Errors name the offending item.
+    Load and validate time for the whole batch go to ``timings`` when given.
+    """
+    compression = compression or settings.compression_default
+    compression_level(compression)
+    seen_projects = set()
+    validated: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    plans = []
+    load_time = validate_time = 0.0
+    for index, (template_name, project_name, parameters) in enumerate(items):
+        label = f"Item {index} ('{project_name}')"
+        if not project_name or project_name in ('.', '..') or '/' in project_name or '\\' in project_name:
+            raise ValueError(f"{label}: project name must be a single path segment")
+        if project_name in seen_projects:
+            raise ValueError(f"{label}: duplicate project name")
+        seen_projects.add(project_name)
+
+        started = time.perf_counter()
+        try:
+            snapshot = snapshot_store.get(template_name)
+        except FileNotFoundError:
+            raise FileNotFoundError(f"{label}: template '{template_name}' not found")
+        loaded = time.perf_counter()
+        load_time += loaded - started
+        template_requests.labels(template_name).inc()
+        memo_key = (template_name, json.dumps(parameters, sort_keys=True, default=str))
+        if memo_key not in validated:
+            try:
+                validated[memo_key] = validate_parameters(template_name, parameters)
+            except ValueError as e:
+                raise ValueError(f"{label}: {e}")
+        validate_time += time.perf_counter() - loaded
+        validated_parameters = validated[memo_key]
+        values = placeholder_values(project_name, validated_parameters)
+        plans.append(GenerationPlan(
+            template_name=template_name,
+            project_name=project_name,
+            parameters=validated_parameters,
+            snapshot=snapshot,
+            values=encode_values(values),
+            unresolved=sorted(unknown_placeholders(snapshot.placeholder_names, values)),
+            cache_key=artifact_key(snapshot.content_hash, project_name, validated_parameters, f"zip:{compression}"),
+            compression=compression
+        ))
+    observe_phase("load", load_time)
+    observe_phase("validate", validate_time)
+    if timings is not None:
+        timings.load = load_time
+        timings.validate = validate_time
+    return plans
+
+
+def render_project_files(plan: GenerationPlan, prefix: str = "") -> List[RenderedFile]:
+    """Render and compress every file of a project; safe to run on any thread"""
+    level = plan.level
+    rendered = []
+    for snapshot_file in plan.snapshot.files:
+        method, payload, crc, size = file_entry(
+            snapshot_file, plan.values, entry_level(snapshot_file.path, len(snapshot_file.data), level),
+            timings=plan.timings
+        )
+        rendered.append(RenderedFile(
+            path=prefix + snapshot_file.path,
+            payload=payload,
+            crc=crc,
+            size=size,
+            method=method,
+            mode=snapshot_file.mode,
+            date_time=snapshot_file.date_time
+        ))
+    return rendered
+
+
+def stream_batch_zip(plans: List[GenerationPlan], executor: Executor, window: int = 4,
+                     chunk_size: Optional[int] = None,
+                     timings: Optional[GenerationTimings] = None) -> Iterator[bytes]:
+    """
+    Render several projects into one zip, each under a ``<project_name>/`` prefix.
+
+    Projects are rendered concurrently on ``executor`` with at most ``window``
+    in flight, and written out in request order as they become ready. Render
+    and compress time summed over the projects are added to ``timings``.
+    """
+    chunk_size = chunk_size or settings.stream_chunk_size
+    writer = ZipStreamWriter()
+    remaining = iter(plans)
+    in_flight = deque()
+
+    def submit_next():
+        plan = next(remaining, None)
+        if plan is not None:
+            in_flight.append(executor.submit(render_project_files, plan, f"{plan.project_name}/"))
+
+    for _ in range(max(window, 1)):
+        submit_next()
+    pending = []
+    pending_size = 0
+    try:
+        while in_flight:
+            rendered = in_flight.popleft().result()
+            submit_next()
+            for entry in rendered:
+                chunk = writer.add_raw(
+                    entry.path, entry.payload, entry.crc, entry.size,
+                    entry.method, entry.mode, entry.date_time
+                )
+                pending.append(chunk)
+                pending_size += len(chunk)
+                if pending_size >= chunk_size:
+                    yield b"".join(pending)
+                    pending = []
+                    pending_size = 0
+    finally:
+        for future in in_flight:
+            future.cancel()
+    pending.append(writer.finish())
+    if timings is None:
+        timings = GenerationTimings()
+    for plan in plans:
+        timings.render += plan.timings.render
+        timings.compress += plan.timings.compress
+    observe_generation(timings, "zip", writer.bytes_written)
+    yield b"".join(pending)
+
+
+def generate_project_zip(template_name: str, project_name: str, parameters: Dict[str, Any],
+                         compression: Optional[str] = None) -> io.BytesIO:
+    """Generate a project from a template and return as zip buffer"""
+    plan = prepare_generation(template_name, project_name, parameters, compression)
+    return io.BytesIO(b"".join(stream_project_zip(plan)))
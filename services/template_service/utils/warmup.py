@@ -0,0 +1,138 @@
+"""
+Startup warm-up: preload the registry and compile every template before
+reporting ready
+"""
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+from ..config.settings import settings
+from .registry import template_registry
+from .search import search_index
+from .snapshot import snapshot_store
+from .validators import validator_cache
+
+
+COLD = "cold"
+WARMING = "warming"
+READY = "ready"
+# Warm-up gave up: the process serves and loads templates lazily, as without warm-up.
+# Deliberately still ready (a cold process beats no process); status() says "warm": false
+DEGRADED = "degraded"
+
+
+class Warmup:
+    """
+    Readiness of this process. ``start()`` warms in a background thread so the
+    server accepts connections (and answers /readyz) while it runs; with
+    warm-up disabled the process is ready as soon as it starts. A failed
+    attempt is retried with exponential backoff; once the attempts run out
+    the process reports ready anyway, since every cache warm-up fills is
+    also filled on first use.
+    """
+
+    def __init__(self, workers: Optional[int] = None, attempts: Optional[int] = None,
+                 backoff: Optional[float] = None):
+        self._workers = workers
+        self.attempts = settings.warmup_attempts if attempts is None else attempts
+        self.backoff = settings.warmup_backoff if backoff is None else backoff
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self.state = COLD
+        self.templates = 0
+        self.failures: Dict[str, str] = {}
+        self.error: Optional[str] = None
+        self.tries = 0
+        self.seconds: Optional[float] = None
+
+    @property
+    def workers(self) -> int:
+        return self._workers or settings.warmup_workers
+
+    @property
+    def ready(self) -> bool:
+        return self.state in (READY, DEGRADED)
+
+    def start(self):
+        """Begin warming (once); called from the application lifespan"""
+        with self._lock:
+            if self.state != COLD:
+                return
+            if not settings.warmup_enabled:
+                self.state = READY
+                return
+            self.state = WARMING
+        self._thread = threading.Thread(target=self.run, name="boilerfab-warmup", daemon=True)
+        self._thread.start()
+
+    def run(self):
+        """Warm everything in the calling thread, retrying failed attempts with backoff"""
+        self.state = WARMING
+        started = time.perf_counter()
+        delay = self.backoff
+        for attempt in range(1, max(self.attempts, 1) + 1):
+            self.tries = attempt
+            try:
+                self._warm()
+            except Exception as e:
+                self.error = f"{type(e).__name__}: {e}"
+                print(f"❌ Warm-up attempt {attempt}/{self.attempts} failed: {self.error}")
+                if attempt < self.attempts:
+                    time.sleep(delay)
+                    delay *= 2
+                continue
+            self.error = None
+            self.seconds = round(time.perf_counter() - started, 3)
+            self.state = READY
+            print(f"🔥 Warmed {self.templates} templates in {self.seconds:.2f}s"
+                  + (f" ({len(self.failures)} failed: {', '.join(sorted(self.failures))})" if self.failures else ""))
+            return
+        self.seconds = round(time.perf_counter() - started, 3)
+        self.state = DEGRADED
+        print("⚠️  Warm-up gave up; templates will be loaded on first use")
+
+    def _warm(self):
+        """One warm-up attempt; a broken template is reported, not fatal"""
+        # Scans the directory (or reconciles the catalog) and reads every metadata file
+        names = template_registry.names()
+        template_registry.list_templates()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="boilerfab-warmup") as executor:
+            failures = {
+                name: error
+                for name, error in zip(names, executor.map(self._warm_template, names))
+                if error is not None
+            }
+        # Builds the search index from the warmed registry
+        search_index.search("")
+        self.templates = len(names) - len(failures)
+        self.failures = failures
+
+    @staticmethod
+    def _warm_template(name: str) -> Optional[str]:
+        try:
+            template_registry.get_metadata(name)
+            validator_cache.get(name)
+            snapshot_store.get(name)
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+        return None
+
+    def status(self) -> Dict[str, Any]:
+        status: Dict[str, Any] = {
+            "status": self.state,
+            "warm": self.state == READY,
+            "warmup": settings.warmup_enabled,
+        }
+        if self.seconds is not None:
+            status.update(templates=self.templates, seconds=self.seconds)
+        if self.failures:
+            status["failed"] = self.failures
+        if self.tries > 1:
+            status["attempts"] = self.tries
+        if self.error:
+            status["error"] = self.error
+        return status
+
+
+# Global instance
+warmup = Warmup()
@@ -0,0 +1,163 @@
+"""
+Bounded worker pool for project generation
+"""
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, Optional
+from ..config.settings import settings
+
+
+class PoolSaturatedError(Exception):
+    """Raised when both the workers and the wait queue are full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Generation capacity exhausted, retry later")
+        self.retry_after = retry_after
+
+
+class GenerationSlot:
+    """
+    A reserved worker slot.
+
+    Released explicitly, when the stream holding it finishes, or - as a last
+    resort - when it is garbage collected, so a response that is cancelled
+    before its body starts cannot leak capacity.
+    """
+
+    def __init__(self, pool: "GenerationPool"):
+        self._pool = pool
+        self._released = False
+
+    def release(self):
+        if not self._released:
+            self._released = True
+            self._pool._release()
+
+    def __del__(self):
+        self.release()
+
+
+class GenerationPool:
+    """
+    Runs generation work off the event loop with a concurrency limit.
+
+    At most ``max_workers`` generations run at once; up to ``max_queue`` more
+    may wait for a slot. Anything beyond that is rejected immediately with
+    PoolSaturatedError so callers can answer 503 instead of piling up.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None, max_queue: Optional[int] = None,
+                 retry_after: Optional[int] = None):
+        self.max_workers = max_workers or settings.generation_workers
+        self.max_queue = settings.generation_queue_limit if max_queue is None else max_queue
+        self.retry_after = retry_after or settings.generation_retry_after
+        self.render_workers = settings.render_workers
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._render_executor: Optional[ThreadPoolExecutor] = None
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self.active = 0
+        self.waiting = 0
+        self.completed = 0
+        self.rejected = 0
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix="boilerfab-generate"
+                )
+            return self._executor
+
+    @property
+    def render_executor(self) -> ThreadPoolExecutor:
+        """
+        Separate threads for fan-out work (batch items) submitted from a
+        generation that already holds one of the pool's own threads.
+        """
+        with self._lock:
+            if self._render_executor is None:
+                self._render_executor = ThreadPoolExecutor(
+                    max_workers=self.render_workers,
+                    thread_name_prefix="boilerfab-render"
+                )
+            return self._render_executor
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._loop is not loop:
+            self._loop = loop
+            self._semaphore = asyncio.Semaphore(self.max_workers)
+            self.active = 0
+        return self._semaphore
+
+    async def acquire(self) -> GenerationSlot:
+        """Reserve a worker slot, waiting in the bounded queue if necessary"""
+        semaphore = self._get_semaphore()
+        if semaphore.locked() and self.waiting >= self.max_queue:
+            self.rejected += 1
+            raise PoolSaturatedError(self.retry_after)
+        self.waiting += 1
+        try:
+            await semaphore.acquire()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        return GenerationSlot(self)
+
+    def _release(self):
+        loop, semaphore = self._loop, self._semaphore
+        if loop is None or semaphore is None or loop.is_closed():
+            return
+
+        def release():
+            if self._semaphore is semaphore:
+                self.active -= 1
+                self.completed += 1
+                semaphore.release()
+
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is loop:
+            release()
+        else:
+            loop.call_soon_threadsafe(release)
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run a blocking function on the pool's threads"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+    async def stream(self, slot: GenerationSlot, chunks: Iterator[bytes]) -> AsyncIterator[bytes]:
+        """Drive a blocking chunk iterator on the pool, releasing the slot when done"""
+        sentinel = object()
+        try:
+            while True:
+                chunk = await self.run(next, chunks, sentinel)
+                if chunk is sentinel:
+                    break
+                yield chunk
+        finally:
+            close = getattr(chunks, "close", None)
+            if close is not None:
+                close()
+            slot.release()
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "max_workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "completed": self.completed,
+            "rejected": self.rejected,
+        }
+
+
+# Global instance
+generation_pool = GenerationPool()
@@ -0,0 +1,21 @@
+"""
+Point every on-disk path the service writes at a scratch directory, so the suite leaves the checkout clean.
+
+Settings and the global instances read these at import time, which is why they are set here, before
+any test module imports the service.
+"""
+import os
+import shutil
+import tempfile
+
+_SCRATCH = tempfile.mkdtemp(prefix="boilerfab-tests-")
+
+os.environ["API_CONFIG_FILE"] = os.path.join(_SCRATCH, "api_config.json")
+os.environ["API_KEYS_FILE"] = os.path.join(_SCRATCH, "api_keys.json")
+os.environ["ARTIFACT_CACHE_DIR"] = os.path.join(_SCRATCH, "cache", "artifacts")
+os.environ["CATALOG_PATH"] = os.path.join(_SCRATCH, "catalog.sqlite3")
+os.environ["JOBS_DIR"] = os.path.join(_SCRATCH, "jobs")
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(_SCRATCH, ignore_errors=True)
@@ -11,7 +11,7 @@ import threading
 
 def get_api_key():
     """Get API key from config file"""
-    config_path = Path("api_config.json")
+    config_path = Path(os.environ.get("API_CONFIG_FILE", "api_config.json"))
     if config_path.exists():
         with open(config_path, 'r') as f:
             config = json.load(f)
@@ -35,8 +35,19 @@ class TestFastAPITemplateService(unittest.TestCase):
             stdout=subprocess.DEVNULL,
             stderr=subprocess.DEVNULL
         )
-        # Wait for service to start (with API key generation time)
-        time.sleep(8)
+        # Wait until startup warm-up has compiled every template
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                if requests.get(f"{cls.BASE_URL}/readyz", timeout=1).status_code == 200:
+                    break
+            except requests.ConnectionError:
+                pass
+            if time.monotonic() > deadline or cls.service_process.poll() is not None:
+                cls.service_process.terminate()
+                cls.service_process.wait()
+                raise Exception("Service did not become ready")
+            time.sleep(0.1)
         
         # Get the API key for tests
         cls.api_key = get_api_key()
@@ -62,6 +73,14 @@ class TestFastAPITemplateService(unittest.TestCase):
         data = response.json()
         self.assertEqual(data["status"], "healthy")
     
+    def test_readyz_endpoint(self):
+        """Test readiness endpoint (public, ready once warm)"""
+        response = requests.get(f"{self.BASE_URL}/readyz")
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data["status"], "ready")
+        self.assertGreater(data["templates"], 0)
+
     def test_root_endpoint(self):
         """Test root endpoint"""
         response = requests.get(f"{self.BASE_URL}/", headers=self.get_headers())
@@ -84,6 +103,46 @@ class TestFastAPITemplateService(unittest.TestCase):
         self.assertIn("description", template)
         self.assertIn("version", template)
     
+    def test_templates_endpoint_supports_conditional_get(self):
+        """Test that an unchanged template listing is answered with 304"""
+        first = requests.get(f"{self.BASE_URL}/api/v1/templates", headers=self.get_headers())
+        etag = first.headers.get('etag')
+        self.assertIsNotNone(etag)
+        self.assertIn('private', first.headers.get('cache-control'))
+
+        headers = {**self.get_headers(), "If-None-Match": etag}
+        second = requests.get(f"{self.BASE_URL}/api/v1/templates", headers=headers)
+        self.assertEqual(second.status_code, 304)
+        self.assertEqual(second.headers.get('etag'), etag)
+
+        detail = requests.get(f"{self.BASE_URL}/api/v1/templates/fastapi-minimal", headers=self.get_headers())
+        self.assertEqual(detail.status_code, 200)
+        self.assertNotEqual(detail.headers.get('etag'), etag)
+    
+    def test_search_endpoint(self):
+        """Test that search is routed ahead of template detail and ranks matches"""
+        response = requests.get(f"{self.BASE_URL}/api/v1/templates/search", params={"q": "fastapi"},
+                                headers=self.get_headers())
+        self.assertEqual(response.status_code, 200)
+        results = response.json()
+        self.assertGreaterEqual(len(results), 1)
+        self.assertIn("fastapi", results[0]["name"])
+        self.assertIn("score", results[0])
+    
+    def test_validate_parameters_batch(self):
+        """Test that batch validation reports each item on its own"""
+        payload = {"items": [
+            {"template_name": "fastapi-minimal", "parameters": {}},
+            {"template_name": "nonexistent-template", "parameters": {}}
+        ]}
+        response = requests.post(f"{self.BASE_URL}/api/v1/templates/validate-parameters/batch", json=payload,
+                                 headers=self.get_headers())
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual((data["valid"], data["invalid"]), (1, 1))
+        self.assertTrue(data["results"][0]["valid"])
+        self.assertIn("not found", data["results"][1]["errors"][0]["message"])
+    
     def test_generate_endpoint_with_invalid_template(self):
         """Test generate endpoint with non-existent template (should return 404)"""
         payload = {
@@ -115,6 +174,45 @@ class TestFastAPITemplateService(unittest.TestCase):
             # Should contain files from the template
             self.assertGreater(len(file_list), 0)
 
+    def test_repeated_generate_is_served_from_cache(self):
+        """Test that an identical generate request is answered from the artifact cache"""
+        payload = {
+            "template_name": "fastapi-minimal",
+            "project_name": "cached-project",
+            "parameters": {}
+        }
+        first = requests.post(f"{self.BASE_URL}/api/v1/generate", json=payload, headers=self.get_headers())
+        second = requests.post(f"{self.BASE_URL}/api/v1/generate", json=payload, headers=self.get_headers())
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.headers.get('x-cache'), 'HIT')
+        self.assertEqual(first.content, second.content)
+
+        stats = requests.get(f"{self.BASE_URL}/api/v1/cache/stats", headers=self.get_headers()).json()
+        self.assertGreaterEqual(stats["hits"], 1)
+
+    def test_generate_endpoint_with_tar_gz_format(self):
+        """Test that format=tar.gz returns a gzip-compressed tar stream"""
+        payload = {
+            "template_name": "fastapi-minimal",
+            "project_name": "tar-project",
+            "parameters": {}
+        }
+        response = requests.post(f"{self.BASE_URL}/api/v1/generate", params={"format": "tar.gz"},
+                                 json=payload, headers=self.get_headers(), stream=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers.get('content-type'), 'application/gzip')
+        self.assertIn('tar-project.tar.gz', response.headers.get('content-disposition'))
+
+        import tarfile
+        response.raw.decode_content = True
+        with tarfile.open(fileobj=response.raw, mode='r|gz') as tar_file:
+            names = [member.name for member in tar_file]
+        self.assertIn('metadata.json', names)
+
+        invalid = requests.post(f"{self.BASE_URL}/api/v1/generate", params={"format": "rar"},
+                                json=payload, headers=self.get_headers())
+        self.assertEqual(invalid.status_code, 400)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
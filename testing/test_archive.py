@@ -0,0 +1,86 @@
+import unittest
+import io
+import tarfile
+import zipfile
+
+from services.template_service.utils.archive import TarStreamWriter, ZipStreamWriter, archive_format, zstandard
+
+
+class TestZipStreamWriter(unittest.TestCase):
+    """Test cases for the streaming zip writer"""
+
+    def build(self, writer, files):
+        chunks = [writer.add_file(path, data, **options) for path, data, options in files]
+        chunks.append(writer.finish())
+        return b"".join(chunks)
+
+    def test_archive_is_readable_by_zipfile(self):
+        files = [
+            ("app/main.py", b"print('hello')\n" * 50, {"mode": 0o100755}),
+            ("README.md", b"# demo\n", {"compress": False}),
+            ("empty.txt", b"", {}),
+        ]
+        archive = self.build(ZipStreamWriter(), files)
+        with zipfile.ZipFile(io.BytesIO(archive)) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            self.assertEqual(zip_file.namelist(), ["app/main.py", "README.md", "empty.txt"])
+            self.assertEqual(zip_file.read("app/main.py"), files[0][1])
+            self.assertEqual(zip_file.getinfo("app/main.py").external_attr >> 16, 0o100755)
+            self.assertEqual(zip_file.getinfo("README.md").compress_type, zipfile.ZIP_STORED)
+
+    def test_entries_are_emitted_incrementally(self):
+        writer = ZipStreamWriter()
+        first = writer.add_file("a.txt", b"a" * 1000)
+        self.assertTrue(first.startswith(b"PK\x03\x04"))
+        self.assertEqual(writer.bytes_written, len(first))
+
+
+class TestTarStreamWriter(unittest.TestCase):
+    """Test cases for the streaming tar writer"""
+
+    files = [
+        ("app/main.py", b"print('hello')\n" * 50, 0o100755),
+        ("docs/" + "long-directory-name/" * 8 + "caf\u00e9.md", b"# demo\n", 0o100644),
+        ("empty.txt", b"", 0o100644),
+    ]
+
+    def build(self, writer):
+        chunks = [writer.add_file(path, data, mode=mode, mtime=1700000000) for path, data, mode in self.files]
+        chunks.append(writer.finish())
+        return b"".join(chunks)
+
+    def check(self, archive, mode):
+        # Read back as a stream, the way a client piping into tar -x would
+        with tarfile.open(fileobj=io.BytesIO(archive), mode=mode) as tar_file:
+            members = []
+            for member in tar_file:
+                members.append(member)
+                data = tar_file.extractfile(member).read()
+                expected = next(f for f in self.files if f[0] == member.name)
+                self.assertEqual(data, expected[1])
+                self.assertEqual(member.mode, expected[2] & 0o7777)
+                self.assertEqual(member.mtime, 1700000000)
+        self.assertEqual([m.name for m in members], [f[0] for f in self.files])
+
+    def test_plain_tar(self):
+        archive = self.build(TarStreamWriter())
+        self.assertEqual(len(archive) % tarfile.RECORDSIZE, 0)
+        self.check(archive, "r|")
+
+    def test_gzip_tar(self):
+        self.check(self.build(TarStreamWriter("gz")), "r|gz")
+
+    @unittest.skipUnless(zstandard is not None, "zstandard is not installed")
+    def test_zstd_tar(self):
+        archive = self.build(TarStreamWriter("zst"))
+        reader = zstandard.ZstdDecompressor().stream_reader(io.BytesIO(archive))
+        self.check(reader.read(), "r|")
+
+    def test_unknown_format_is_rejected(self):
+        self.assertEqual(archive_format("tar.gz")[1], ".tar.gz")
+        with self.assertRaises(ValueError):
+            archive_format("rar")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import unittest
+import asyncio
+import tempfile
+import uuid
+from unittest import mock
+
+from benchmarks.asgi import asgi_request
+from services.template_service.api import routes
+from services.template_service.auth.api_key import api_key_manager
+from services.template_service.main import app
+from services.template_service.utils.artifact_cache import ArtifactCache, artifact_key
+
+
+class TestArtifactCache(unittest.TestCase):
+    """Test cases for the generated-archive cache"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_cache(self, **options):
+        options.setdefault("max_bytes", 1024)
+        options.setdefault("memory_max_bytes", 0)
+        return ArtifactCache(directory=self.temp_dir.name, enabled=True, **options)
+
+    def store(self, cache, key, data):
+        return b"".join(cache.tee(key, iter([data[:10], data[10:]])))
+
+    def test_key_ignores_parameter_order(self):
+        first = artifact_key("hash", "demo", {"a": 1, "b": 2})
+        second = artifact_key("hash", "demo", {"b": 2, "a": 1})
+        self.assertEqual(first, second)
+        self.assertNotEqual(first, artifact_key("other", "demo", {"a": 1, "b": 2}))
+
+    def test_stored_archive_is_returned_on_hit(self):
+        cache = self.make_cache()
+        self.assertIsNone(cache.get("k"))
+        self.assertEqual(self.store(cache, "k", b"x" * 100), b"x" * 100)
+        artifact = cache.get("k")
+        self.assertEqual(b"".join(cache.iter_artifact(artifact)), b"x" * 100)
+        self.assertEqual((cache.stats()["hits"], cache.stats()["misses"]), (1, 1))
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = self.make_cache(max_bytes=250)
+        self.store(cache, "a", b"a" * 100)
+        self.store(cache, "b", b"b" * 100)
+        cache.get("a", handle=False)
+        self.store(cache, "c", b"c" * 100)
+        self.assertIsNotNone(cache.get("a", handle=False))
+        self.assertIsNone(cache.get("b", handle=False))
+
+    def test_hit_streams_after_eviction(self):
+        cache = self.make_cache(max_bytes=150)
+        self.store(cache, "a", b"a" * 100)
+        artifact = cache.get("a")
+        # Evicts "a" and unlinks its file before the response starts reading
+        self.store(cache, "b", b"b" * 100)
+        self.assertIsNone(cache.get("a", handle=False))
+        self.assertEqual(artifact.size, 100)
+        self.assertEqual(b"".join(cache.iter_artifact(artifact)), b"a" * 100)
+        self.assertIsNone(artifact.file)
+
+    def test_memory_tier_serves_small_archives(self):
+        cache = self.make_cache(memory_max_bytes=1024)
+        self.store(cache, "k", b"x" * 100)
+        self.assertEqual(cache.get("k").data, b"x" * 100)
+        self.assertEqual(cache.stats()["memory_hits"], 1)
+
+    def test_incomplete_stream_is_not_cached(self):
+        cache = self.make_cache()
+        stream = cache.tee("k", iter([b"partial", b"rest"]))
+        next(stream)
+        stream.close()
+        self.assertIsNone(cache.get("k"))
+
+
+    def test_hit_handle_closed_when_client_leaves_early(self):
+        cache = self.make_cache(max_bytes=10 * 1024 * 1024)
+        headers = {"X-API-Key": api_key_manager.get_api_key()}
+        payload = {"template_name": "fastapi-minimal", "project_name": f"early-{uuid.uuid4().hex[:8]}",
+                   "parameters": {}}
+        hits = []
+        get = cache.get
+
+        def recording_get(*args, **kwargs):
+            artifact = get(*args, **kwargs)
+            if artifact is not None:
+                hits.append(artifact)
+            return artifact
+
+        async def disconnecting(scope, receive, send):
+            first = True
+
+            async def early_receive():
+                nonlocal first
+                if first:
+                    first = False
+                    return await receive()
+                return {"type": "http.disconnect"}
+
+            await app(scope, early_receive, send)
+
+        with mock.patch.object(routes, "artifact_cache", cache), \
+                mock.patch.object(cache, "get", side_effect=recording_get):
+            self.assertEqual(asyncio.run(asgi_request(app, "POST", "/api/v1/generate", headers, payload)).status, 200)
+            asyncio.run(asgi_request(disconnecting, "POST", "/api/v1/generate", headers, payload))
+        self.assertTrue(hits)
+        self.assertTrue(all(artifact.file is None or artifact.file.closed for artifact in hits))
+
+
+if __name__ == "__main__":
+    unittest.main()
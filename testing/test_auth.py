@@ -0,0 +1,113 @@
+import asyncio
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+from services.template_service.auth.api_key import APIKeyManager, APIKeyStore, extract_api_key
+from services.template_service.auth.middleware import APIKeyMiddleware
+from services.template_service.auth.quota import QuotaExceededError, QuotaManager
+from services.template_service.config.settings import settings
+
+
+class TestAPIKeyStore(unittest.TestCase):
+    """Test cases for the hashed multi-key store"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = APIKeyStore(str(Path(self.tmp.name) / "keys.json"))
+
+    def test_keys_are_stored_hashed_and_looked_up(self):
+        api_key = self.store.create_key("ci", admin=True, requests_per_minute=120)
+        self.assertNotIn(api_key, (Path(self.tmp.name) / "keys.json").read_text())
+        record = self.store.lookup(api_key)
+        self.assertEqual((record.id, record.admin, record.requests_per_minute), ("ci", True, 120))
+        self.assertIsNone(self.store.lookup(api_key + "x"))
+        self.assertIsNone(self.store.lookup(None))
+        with self.assertRaises(ValueError):
+            self.store.create_key("ci")
+
+    def test_legacy_key_file_is_created_on_first_use(self):
+        config_file = Path(self.tmp.name) / "api_config.json"
+        legacy = APIKeyManager(str(config_file))
+        store = APIKeyStore(self.store.path, legacy=legacy)
+        self.assertFalse(config_file.exists())
+        self.assertIsNone(store.lookup("ftk_unknown"))
+        self.assertTrue(config_file.exists())
+        self.assertEqual(store.lookup(legacy.get_api_key()).id, "default")
+        self.assertEqual(APIKeyManager(str(config_file)).get_api_key(), legacy.get_api_key())
+
+    def test_file_changes_are_picked_up(self):
+        first = self.store.create_key("team-a")
+        self.assertIsNotNone(self.store.lookup(first))
+        # A second process issuing and revoking keys in the same file
+        other = APIKeyStore(self.store.path)
+        second = other.create_key("team-b")
+        other.revoke_key("team-a")
+        with mock.patch.object(settings, "api_keys_check_interval", 0):
+            self.assertIsNone(self.store.lookup(first))
+            self.assertEqual(self.store.lookup(second).id, "team-b")
+
+    def test_extract_api_key(self):
+        self.assertEqual(extract_api_key({"authorization": "Bearer abc"}), "abc")
+        self.assertEqual(extract_api_key({"x-api-key": "abc"}, "api_key=zzz"), "abc")
+        self.assertEqual(extract_api_key({}, "api_key=zzz"), "zzz")
+        self.assertIsNone(extract_api_key({}))
+
+
+class TestQuotas(unittest.TestCase):
+    """Test cases for per-key rate and concurrency quotas"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.store = APIKeyStore(str(Path(self.tmp.name) / "keys.json"))
+
+    def test_token_bucket_and_concurrency(self):
+        quotas = QuotaManager()
+        noisy = self.store.lookup(self.store.create_key("noisy", requests_per_minute=1, burst=2, max_concurrent=5))
+        quiet = self.store.lookup(self.store.create_key("quiet", burst=1, max_concurrent=1))
+        quotas.release(quotas.acquire(noisy))
+        quotas.release(quotas.acquire(noisy))
+        with self.assertRaises(QuotaExceededError) as raised:
+            quotas.acquire(noisy)
+        self.assertGreaterEqual(raised.exception.retry_after, 1)
+
+        held = quotas.acquire(quiet)
+        with self.assertRaises(QuotaExceededError):
+            quotas.acquire(quiet)
+        quotas.release(held)
+        self.assertEqual(quotas.stats()["in_flight"], 0)
+
+    def test_middleware_rejects_and_throttles(self):
+        api_key = self.store.create_key("ci", burst=1)
+        seen = []
+
+        async def app(scope, receive, send):
+            if "state" in scope:
+                seen.append(scope["state"]["api_key"].id)
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        middleware = APIKeyMiddleware(app, store=self.store, quotas=QuotaManager())
+
+        def call(path, key=None):
+            headers = [(b"x-api-key", key.encode())] if key else []
+            scope = {"type": "http", "method": "GET", "path": path, "headers": headers, "query_string": b""}
+            messages = []
+
+            async def send(message):
+                messages.append(message)
+            asyncio.run(middleware(scope, None, send))
+            return messages[0]["status"]
+
+        self.assertEqual(call("/healthz"), 200)
+        self.assertEqual(call("/api/v1/templates"), 401)
+        self.assertEqual(call("/api/v1/templates", api_key), 200)
+        self.assertEqual(call("/api/v1/templates", api_key), 429)
+        self.assertEqual(seen, ["ci"])
+
+
+if __name__ == "__main__":
+    unittest.main()
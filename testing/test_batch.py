@@ -0,0 +1,42 @@
+import unittest
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from services.template_service.utils.template_service import (
+    generate_project_zip,
+    prepare_batch,
+    stream_batch_zip
+)
+
+
+class TestBatchGeneration(unittest.TestCase):
+    """Test cases for generating several projects into one archive"""
+
+    def test_projects_are_written_under_their_own_prefix(self):
+        plans = prepare_batch([
+            ("fastapi-minimal", "alpha", {}),
+            ("fastapi-minimal", "beta", {}),
+        ])
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            data = b"".join(stream_batch_zip(plans, executor, window=2))
+
+        single = zipfile.ZipFile(generate_project_zip("fastapi-minimal", "alpha", {}))
+        with zipfile.ZipFile(io.BytesIO(data)) as zip_file:
+            self.assertIsNone(zip_file.testzip())
+            names = zip_file.namelist()
+            for name in single.namelist():
+                self.assertIn(f"alpha/{name}", names)
+                self.assertIn(f"beta/{name}", names)
+                self.assertEqual(zip_file.read(f"alpha/{name}"), single.read(name))
+
+    def test_invalid_items_are_rejected_up_front(self):
+        with self.assertRaisesRegex(ValueError, "duplicate"):
+            prepare_batch([("fastapi-minimal", "same", {}), ("fastapi-minimal", "same", {})])
+        with self.assertRaisesRegex(ValueError, "single path segment"):
+            prepare_batch([("fastapi-minimal", "../escape", {})])
+        with self.assertRaisesRegex(FileNotFoundError, "Item 1"):
+            prepare_batch([("fastapi-minimal", "ok", {}), ("no-such-template", "missing", {})])
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,83 @@
+import asyncio
+import unittest
+
+from benchmarks.asgi import asgi_request
+from benchmarks.cli import compare
+from benchmarks.harness import measure, percentile
+from benchmarks.load import LevelResult, RequestPlanner, asgi_sender, discover_templates, parse_mix, run_level, \
+    saturation_point
+from services.template_service.auth.api_key import api_key_manager
+from services.template_service.main import app
+
+
+def report(p50_ms, throughput, peak_rss_mb=50.0):
+    return {"results": {"generate/demo": {"p50_ms": p50_ms, "throughput": throughput, "peak_rss_mb": peak_rss_mb}}}
+
+
+class TestBenchmarkHarness(unittest.TestCase):
+    """Test cases for the benchmark harness and baseline comparison"""
+
+    def test_percentiles_and_measure(self):
+        values = [float(i) for i in range(1, 101)]
+        self.assertEqual(percentile(values, 0.5), 50.0)
+        self.assertEqual(percentile(values, 0.99), 99.0)
+        self.assertEqual(percentile([], 0.5), 0.0)
+        result = measure("noop", lambda _: None, min_time=0.01, min_runs=3, warmup=0)
+        self.assertGreaterEqual(result.runs, 3)
+        self.assertLessEqual(result.p50_ms, result.p99_ms)
+
+    def test_compare_flags_regressions_beyond_tolerance(self):
+        baseline = report(1.0, 1000.0)
+        self.assertEqual(compare(report(1.2, 850.0), baseline, 0.25, 0.25), [])
+        # A slower p50 alone is treated as noise; with lower throughput it is a regression
+        self.assertEqual(compare(report(1.5, 950.0), baseline, 0.25, 0.25), [])
+        regressions = compare(report(1.5, 600.0, 80.0), baseline, 0.25, 0.25)
+        self.assertEqual(len(regressions), 2)
+        self.assertEqual(compare({"results": {}}, baseline, 0.25, 0.25), [])
+
+    def test_in_process_asgi_client(self):
+        headers = {"X-API-Key": api_key_manager.get_api_key()}
+        payload = {"template_name": "fastapi-minimal", "project_name": "bench", "parameters": {}}
+        response = asyncio.run(asgi_request(app, "POST", "/api/v1/generate", headers, payload))
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.body[:2], b"PK")
+        self.assertEqual(asyncio.run(asgi_request(app, "GET", "/api/v1/templates")).status, 401)
+
+
+def level(concurrency, throughput, error_rate=0.0):
+    return LevelResult(concurrency, 100, 1.0, throughput, 1.0, 2.0, 3.0, error_rate, 0)
+
+
+class TestLoadGenerator(unittest.TestCase):
+    """Test cases for the load generator"""
+
+    def test_parse_mix(self):
+        self.assertEqual(parse_mix("list=1, generate=3,validate"), {"list": 1.0, "generate": 3.0, "validate": 1.0})
+        with self.assertRaises(ValueError):
+            parse_mix("upload=1")
+        with self.assertRaises(ValueError):
+            parse_mix("list=0")
+
+    def test_saturation_point(self):
+        levels = [level(1, 100.0), level(2, 190.0), level(4, 390.0), level(8, 400.0), level(16, 900.0, 0.2)]
+        self.assertEqual(saturation_point(levels).concurrency, 4)
+        self.assertEqual(saturation_point(levels, max_error_rate=0.5).concurrency, 16)
+        self.assertIsNone(saturation_point([level(1, 10.0, 0.5)]))
+
+    def test_in_process_level(self):
+        send = asgi_sender(app, api_key_manager.get_api_key())
+
+        async def drive():
+            templates = await discover_templates(send, ["fastapi-minimal"])
+            planner = RequestPlanner(parse_mix("detail=1,validate=1,generate=1"), templates, unique_projects=True)
+            return await run_level(send, planner, concurrency=2, duration=0.3)
+
+        result = asyncio.run(drive())
+        self.assertGreater(result.requests, 0)
+        self.assertEqual(result.error_rate, 0.0)
+        self.assertEqual(set(result.operations), {"detail", "validate", "generate"})
+        self.assertGreater(result.bytes_received, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import unittest
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+from pathlib import Path
+
+from services.template_service.utils.catalog import TemplateCatalog, SCHEMA_VERSION
+from services.template_service.utils.registry import TemplateRegistry
+
+
+class TestTemplateCatalog(unittest.TestCase):
+    """Test cases for the SQLite template catalog"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name) / "templates"
+        self.root.mkdir()
+        self.db_path = str(Path(self.temp_dir.name) / "catalog.sqlite3")
+        self.write_template("alpha", {"description": "Alpha", "version": "1.0.0", "tags": ["API"],
+                                      "parameters": [{"name": "port", "type": "integer", "description": "Port"}]})
+        self.write_template("beta", {"description": "Beta", "version": "2.0.0"})
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_template(self, name, metadata):
+        template_dir = self.root / name
+        template_dir.mkdir(exist_ok=True)
+        metadata_file = template_dir / "metadata.json"
+        metadata_file.write_text(json.dumps({"name": name, **metadata}))
+        # Make sure rewrites are visible even on coarse mtime filesystems
+        stat = metadata_file.stat()
+        os.utime(metadata_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+    def test_reconcile_indexes_only_changes(self):
+        catalog = TemplateCatalog(self.db_path)
+        self.assertEqual(catalog.reconcile(self.root), 2)
+        self.assertEqual(catalog.reconcile(self.root), 0)
+        generation = catalog.generation()
+
+        self.write_template("beta", {"description": "Beta 2", "version": "2.1.0"})
+        self.assertEqual(catalog.reconcile(self.root), 1)
+        rows = catalog.rows(since=generation)
+        self.assertEqual([row.name for row in rows], ["beta"])
+        self.assertEqual(rows[0].info.version, "2.1.0")
+
+        alpha = next(row for row in catalog.rows() if row.name == "alpha")
+        self.assertEqual(alpha.metadata.parameters[0].name, "port")
+        self.assertEqual(catalog.stats()["tags"], 1)
+
+    def test_memory_catalog_has_tables_on_every_thread(self):
+        catalog = TemplateCatalog(":memory:")
+        self.assertEqual(catalog.reconcile(self.root), 2)
+        counts = []
+        thread = threading.Thread(target=lambda: counts.append(catalog.stats()["templates"]))
+        thread.start()
+        thread.join()
+        # Each thread's in-memory connection is a separate, empty database
+        self.assertEqual(counts, [0])
+
+    def test_outdated_schema_is_rebuilt(self):
+        connection = sqlite3.connect(self.db_path)
+        connection.executescript(
+            "CREATE TABLE templates (name TEXT PRIMARY KEY, content_hash TEXT NOT NULL);"
+            "CREATE TABLE catalog_state (key TEXT PRIMARY KEY, value TEXT NOT NULL);"
+            "INSERT INTO catalog_state VALUES ('generation', '7');"
+        )
+        connection.close()
+        catalog = TemplateCatalog(self.db_path)
+        self.assertEqual(catalog.generation(), 7)
+        self.assertEqual(catalog.reconcile(self.root), 2)
+        self.assertEqual(catalog.generation(), 8)
+        version = catalog._connect().execute("PRAGMA user_version").fetchone()[0]
+        self.assertEqual(version, SCHEMA_VERSION)
+
+    def test_registry_workers_share_the_catalog(self):
+        first = TemplateRegistry(templates_dir=str(self.root), check_interval=0,
+                                 catalog=TemplateCatalog(self.db_path))
+        second_catalog = TemplateCatalog(self.db_path)
+        second = TemplateRegistry(templates_dir=str(self.root), check_interval=0, catalog=second_catalog)
+        self.assertEqual([info.name for info in first.list_templates()], ["alpha", "beta"])
+
+        # The second worker reads the rows the first one indexed
+        self.assertEqual(second.get_metadata("alpha").tags, ["API"])
+        self.assertEqual(second_catalog.reindexed, 0)
+
+        self.write_template("gamma", {"description": "Gamma", "version": "1.0.0"})
+        first.invalidate("gamma")
+        self.assertEqual(first.get_metadata("gamma").description, "Gamma")
+        self.assertEqual(second.get_metadata("gamma").description, "Gamma")
+        self.assertEqual(second_catalog.reindexed, 0)
+
+    def test_invalid_metadata_is_reported_from_the_catalog(self):
+        (self.root / "broken").mkdir()
+        (self.root / "broken" / "metadata.json").write_text("{not json")
+        registry = TemplateRegistry(templates_dir=str(self.root), check_interval=0,
+                                    catalog=TemplateCatalog(self.db_path))
+        with self.assertRaises(ValueError):
+            registry.get_metadata("broken")
+        with self.assertRaises(FileNotFoundError):
+            registry.get_metadata("missing")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,59 @@
+import unittest
+import zipfile
+
+from services.template_service.config.settings import settings
+from services.template_service.utils.compression import compression_level, entry_level, zstd_level
+from services.template_service.utils.snapshot import snapshot_store
+from services.template_service.utils.template_service import generate_project_zip, prepare_generation
+
+
+class TestCompressionPolicy(unittest.TestCase):
+    """Test cases for per-file compression choices"""
+
+    def test_entry_level_rules(self):
+        large = settings.compression_min_size + 1
+        self.assertEqual(entry_level("app/main.py", large, 9), 9)
+        self.assertIsNone(entry_level("app/main.py", settings.compression_min_size - 1, 9))
+        self.assertIsNone(entry_level("static/logo.PNG", large, 9))
+        self.assertIsNone(entry_level("app/main.py", large, None))
+        self.assertEqual(entry_level("assets.png/readme", large, 9), 9)
+
+    def test_unknown_preset_is_rejected(self):
+        with self.assertRaises(ValueError):
+            compression_level("ultra")
+        with self.assertRaises(ValueError):
+            prepare_generation("fastapi-minimal", "demo", {}, "ultra")
+
+    def test_zstd_has_no_store_mode(self):
+        self.assertEqual(zstd_level("max"), 19)
+        with self.assertRaises(ValueError):
+            zstd_level("none")
+        with self.assertRaises(ValueError):
+            prepare_generation("fastapi-minimal", "demo", {}, "none", "tar.zst")
+        self.assertEqual(prepare_generation("fastapi-minimal", "demo", {}, "none", "tar").compression, "none")
+
+    def test_presets_produce_equivalent_archives(self):
+        archives = {
+            name: zipfile.ZipFile(generate_project_zip("fastapi-minimal", "demo", {}, name))
+            for name in ("none", "fast", "default", "max")
+        }
+        expected = {info.filename: archives["default"].read(info) for info in archives["default"].infolist()}
+        for name, archive in archives.items():
+            self.assertIsNone(archive.testzip())
+            self.assertEqual({info.filename: archive.read(info) for info in archive.infolist()}, expected)
+        for info in archives["none"].infolist():
+            self.assertEqual(info.compress_type, zipfile.ZIP_STORED)
+
+    def test_static_files_are_compressed_once(self):
+        generate_project_zip("fastapi-minimal", "first", {})
+        snapshot = snapshot_store.get("fastapi-minimal")
+        static = [f for f in snapshot.files if f.template is None]
+        self.assertTrue(static)
+        cached = {f.path: dict(f.compressed) for f in static}
+        generate_project_zip("fastapi-minimal", "second", {})
+        for snapshot_file in static:
+            for level, entry in cached[snapshot_file.path].items():
+                self.assertIs(snapshot_file.compressed[level], entry)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,45 @@
+import unittest
+import json
+import tempfile
+from pathlib import Path
+
+from services.template_service.utils.http_cache import CachedJSON, etag_matches
+from services.template_service.utils.registry import TemplateRegistry
+
+
+class TestConditionalGet(unittest.TestCase):
+    """Test cases for ETag generation and matching"""
+
+    def test_etag_is_stable_and_strong(self):
+        first = CachedJSON.from_payload([{"name": "demo", "tags": ["a"]}])
+        second = CachedJSON.from_payload([{"name": "demo", "tags": ["a"]}])
+        self.assertEqual(first.etag, second.etag)
+        self.assertFalse(first.etag.startswith("W/"))
+        self.assertEqual(json.loads(first.body), [{"name": "demo", "tags": ["a"]}])
+        self.assertNotEqual(first.etag, CachedJSON.from_payload([]).etag)
+
+    def test_if_none_match_parsing(self):
+        etag = '"abc"'
+        self.assertTrue(etag_matches('"abc"', etag))
+        self.assertTrue(etag_matches('"x", W/"abc"', etag))
+        self.assertTrue(etag_matches('*', etag))
+        self.assertFalse(etag_matches('"abcd"', etag))
+
+    def test_memoized_value_is_rebuilt_after_invalidation(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            (Path(temp_dir) / "demo").mkdir()
+            registry = TemplateRegistry(templates_dir=temp_dir, check_interval=60)
+            builds = []
+
+            def build():
+                builds.append(1)
+                return CachedJSON.from_payload(registry.list_templates())
+
+            first = registry.memoize("list", build)
+            self.assertIs(registry.memoize("list", build), first)
+            registry.invalidate("demo")
+            registry.memoize("list", build)
+            self.assertEqual(len(builds), 2)
+
+if __name__ == "__main__":
+    unittest.main()
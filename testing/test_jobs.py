@@ -0,0 +1,114 @@
+import unittest
+import asyncio
+import tempfile
+import zipfile
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.asgi import asgi_request
+from services.template_service.api import routes
+from services.template_service.auth.api_key import api_key_manager
+from services.template_service.main import app
+
+from services.template_service.utils.jobs import (
+    JobManager, MemoryJobStore, FileJobStore, Job, JobStore, COMPLETED, FAILED, RUNNING
+)
+from services.template_service.utils.template_service import prepare_generation
+
+
+class TestJobManager(unittest.TestCase):
+    """Test cases for asynchronous generation jobs"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def run_job(self, manager):
+        async def scenario():
+            manager.start()
+            try:
+                job = manager.submit(prepare_generation("fastapi-minimal", "job-project", {}))
+                for _ in range(200):
+                    if manager.get(job.id).status == COMPLETED:
+                        break
+                    await asyncio.sleep(0.01)
+                return manager.get(job.id)
+            finally:
+                await manager.stop()
+
+        return asyncio.run(scenario())
+
+    def test_job_completes_and_writes_artifact(self):
+        manager = JobManager(store=MemoryJobStore(), directory=self.temp_dir.name, ttl=60, workers=1)
+        job = self.run_job(manager)
+        self.assertEqual(job.status, COMPLETED)
+        self.assertEqual(job.progress, 1.0)
+        with zipfile.ZipFile(manager.artifact_path(job.id)) as zip_file:
+            self.assertGreater(len(zip_file.namelist()), 0)
+
+    def test_expired_jobs_are_evicted(self):
+        manager = JobManager(store=MemoryJobStore(), directory=self.temp_dir.name, ttl=60, workers=1)
+        job = self.run_job(manager)
+        job.expires_at = 0
+        manager.store.save(job)
+        self.assertEqual(manager.sweep(), 1)
+        self.assertIsNone(manager.get(job.id))
+        self.assertFalse(manager.artifact_path(job.id).exists())
+
+    def test_cancelled_job_is_marked_failed(self):
+        manager = JobManager(store=MemoryJobStore(), directory=self.temp_dir.name, ttl=60, workers=1)
+        plan = prepare_generation("fastapi-minimal", "job-project", {})
+        job = Job(id="cancelled", template_name=plan.template_name, project_name=plan.project_name,
+                  format=plan.format, files_total=len(plan.snapshot.files))
+
+        async def scenario():
+            task = asyncio.ensure_future(manager._run(job, plan))
+            await asyncio.sleep(0)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(scenario())
+        self.assertEqual(manager.get("cancelled").status, FAILED)
+        self.assertIsNotNone(manager.get("cancelled").expires_at)
+
+    def test_orphaned_running_jobs_fail_on_start(self):
+        store = FileJobStore(Path(self.temp_dir.name) / "records")
+        store.save(Job(id="orphan", template_name="fastapi-minimal", project_name="p", format="zip",
+                       status=RUNNING, owner=None))
+        manager = JobManager(store=store, directory=self.temp_dir.name, ttl=60, workers=1)
+
+        async def scenario():
+            manager.start()
+            await manager.stop()
+
+        asyncio.run(scenario())
+        job = manager.get("orphan")
+        self.assertEqual(job.status, FAILED)
+        self.assertIsNotNone(job.expires_at)
+
+    def test_job_store_is_abstract(self):
+        with self.assertRaises(TypeError):
+            JobStore()
+
+
+    def test_swept_artifact_is_gone_not_a_500(self):
+        manager = JobManager(store=MemoryJobStore(), directory=self.temp_dir.name, ttl=60, workers=1)
+        manager.store.save(Job(id="done", template_name="fastapi-minimal", project_name="p", format="zip",
+                               status=COMPLETED))
+        headers = {"X-API-Key": api_key_manager.get_api_key()}
+        with mock.patch.object(routes, "job_manager", manager):
+            response = asyncio.run(asgi_request(app, "GET", "/api/v1/jobs/done/artifact", headers))
+            self.assertEqual(response.status, 410)
+            manager.artifact_path("done").parent.mkdir(parents=True)
+            manager.artifact_path("done").write_bytes(b"archive")
+            response = asyncio.run(asgi_request(app, "GET", "/api/v1/jobs/done/artifact", headers))
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.body, b"archive")
+        self.assertEqual(response.headers["content-length"], "7")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import asyncio
+import json
+import unittest
+
+from benchmarks.asgi import asgi_request
+from services.template_service.auth.api_key import api_key_manager
+from services.template_service.main import app
+from services.template_service.utils.metrics import Counter, Gauge, GenerationTimings, Histogram, \
+    MetricsRegistry, registry, server_timing
+from services.template_service.utils.template_service import generate_project_zip
+
+
+class TestMetrics(unittest.TestCase):
+    """Test cases for the Prometheus exposition"""
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics = MetricsRegistry()
+        histogram = metrics.register(Histogram("demo_seconds", "Demo", ("route",), buckets=(0.1, 1.0)))
+        histogram.labels("/a").observe(0.05)
+        histogram.labels("/a").observe(0.5)
+        histogram.labels("/a").observe(5)
+        text = metrics.render()
+        self.assertIn('demo_seconds_bucket{route="/a",le="0.1"} 1', text)
+        self.assertIn('demo_seconds_bucket{route="/a",le="1"} 2', text)
+        self.assertIn('demo_seconds_bucket{route="/a",le="+Inf"} 3', text)
+        self.assertIn('demo_seconds_count{route="/a"} 3', text)
+        self.assertIn("# TYPE demo_seconds histogram", text)
+
+    def test_labels_are_escaped_and_gauges_read_at_scrape(self):
+        metrics = MetricsRegistry()
+        counter = metrics.register(Counter("demo_total", "Demo", ("name",)))
+        counter.labels('a"b').inc(2)
+        values = {("x",): 1}
+        metrics.register(Gauge("demo_gauge", "Demo", ("name",), lambda: values))
+        values[("x",)] = 7
+        text = metrics.render()
+        self.assertIn('demo_total{name="a\\"b"} 2', text)
+        self.assertIn('demo_gauge{name="x"} 7', text)
+
+    def test_generation_is_instrumented(self):
+        generate_project_zip("fastapi-minimal", "metrics-demo", {})
+        text = registry.render()
+        for phase in ("validate", "load", "render", "compress"):
+            self.assertIn(f'boilerfab_generation_phase_seconds_count{{phase="{phase}"}}', text)
+        self.assertIn('boilerfab_template_requests_total{template="fastapi-minimal"}', text)
+        self.assertIn('boilerfab_generated_bytes_total{format="zip"}', text)
+        self.assertIn("boilerfab_generation_queue_depth 0", text)
+
+
+class TestRequestTimings(unittest.TestCase):
+    """Test cases for Server-Timing headers and the access log"""
+
+    def request(self, path, payload):
+        headers = {"X-API-Key": api_key_manager.get_api_key()}
+        with self.assertLogs("boilerfab.access", "INFO") as logs:
+            response = asyncio.run(asgi_request(app, "POST", path + "?compression=none", headers, payload))
+        return response, json.loads(logs.records[-1].getMessage())
+
+    def test_server_timing_lists_finished_phases(self):
+        timings = GenerationTimings()
+        timings.validate = 0.0015
+        self.assertEqual(server_timing(timings, 0.002), b"validate;dur=1.500, app;dur=2.000")
+        self.assertEqual(server_timing(None, 0.0), b"app;dur=0.000")
+
+    def test_generate_reports_phases(self):
+        payload = {"template_name": "fastapi-minimal", "project_name": "timing-demo", "parameters": {"x": 1}}
+        response, line = self.request("/api/v1/generate", payload)
+        self.assertEqual(response.status, 200)
+        header = response.headers["server-timing"]
+        for phase in ("load;dur=", "validate;dur=", "app;dur="):
+            self.assertIn(phase, header)
+        self.assertEqual(line["route"], "/api/v1/generate")
+        self.assertEqual(line["status"], 200)
+        self.assertEqual(line["key"], "default")
+        self.assertEqual(line["bytes_in"], len(json.dumps(payload)))
+        self.assertEqual(line["bytes_out"], len(response.body))
+        self.assertEqual(set(line["phases_ms"]), {"validate", "load", "render", "compress", "send"})
+
+    def test_batch_reports_phases(self):
+        items = [{"template_name": "fastapi-minimal", "project_name": name, "parameters": {}} for name in ("a", "b")]
+        response, line = self.request("/api/v1/generate/batch", {"items": items})
+        self.assertEqual(response.status, 200)
+        self.assertIn("validate;dur=", response.headers["server-timing"])
+        self.assertGreater(line["phases_ms"]["render"], 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
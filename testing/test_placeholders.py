@@ -0,0 +1,49 @@
+import unittest
+
+from services.template_service.utils import placeholders
+from services.template_service.utils.placeholders import compile_template, render_text
+
+
+class TestPlaceholderEngine(unittest.TestCase):
+    """Test cases for the single-pass placeholder engine"""
+
+    def test_all_placeholders_are_substituted_in_one_pass(self):
+        rendered = render_text("{{A}}-{{B}}-{{A}}", {"A": "{{B}}", "B": "b"})
+        # Substituted values are never re-scanned for markers
+        self.assertEqual(rendered, "{{B}}-b-{{B}}")
+
+    def test_unknown_placeholders_are_kept_and_reported(self):
+        unknown = set()
+        rendered = render_text("name={{name}} port={{port}}", {"name": "api"}, unknown)
+        self.assertEqual(rendered, "name=api port={{port}}")
+        self.assertEqual(unknown, {"port"})
+
+    def test_escaped_marker_renders_literal_braces(self):
+        rendered = render_text(r"\{{PROJECT_NAME}} is {{PROJECT_NAME}}", {"PROJECT_NAME": "demo"})
+        self.assertEqual(rendered, "{{PROJECT_NAME}} is demo")
+
+    def test_non_identifier_braces_are_left_alone(self):
+        source = "<div style={{ color: 'red' }}>{{.Name}}</div>"
+        compiled = compile_template(source.encode())
+        self.assertEqual(compiled.names, ())
+        self.assertEqual(render_text(source, {}), source)
+
+    def test_hyphen_and_dot_names_are_substituted(self):
+        rendered = render_text("{{my-key}} {{app.port}}", {"my-key": "a", "app.port": "8000"})
+        self.assertEqual(rendered, "a 8000")
+
+    def test_compile_cache_is_bounded_by_bytes(self):
+        cache = placeholders._CompileCache(max_bytes=1000)
+        for index in range(10):
+            data = bytes([index]) * 200
+            cache.put(bytes([index]), compile_template(data), len(data))
+        self.assertLessEqual(cache.size, 1000)
+        self.assertIsNone(cache.get(bytes([0])))
+        self.assertIsNotNone(cache.get(bytes([9])))
+        # Entries over a quarter of the budget are never cached
+        cache.put(b"big", compile_template(b"x" * 300), 300)
+        self.assertIsNone(cache.get(b"big"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+import asyncio
+import pstats
+import tempfile
+import threading
+import time
+import unittest
+import uuid
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.asgi import asgi_request
+from services.template_service.auth.api_key import api_key_manager, api_key_store
+from services.template_service.main import app
+from services.template_service.api import routes
+from services.template_service.utils.profiling import ProfilerBusyError, RequestCapture, profiler, sample_stacks
+from services.template_service.utils.workers import PoolSaturatedError
+
+
+def spin(seconds):
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        sum(range(100))
+
+
+class TestProfiling(unittest.TestCase):
+    """Test cases for the on-demand profiler"""
+
+    def setUp(self):
+        self.headers = {"X-API-Key": api_key_manager.get_api_key()}
+
+    def post(self, path, headers=None):
+        return asyncio.run(asgi_request(app, "POST", path, self.headers if headers is None else headers))
+
+    def test_sampling_collapses_busy_threads(self):
+        worker = threading.Thread(target=spin, args=(0.5,), name="spinner")
+        worker.start()
+        stacks, sweeps = sample_stacks(0.2, interval=0.002)
+        worker.join()
+        self.assertGreater(sweeps, 10)
+        spinning = [stack for stack in stacks if stack.startswith("spinner;")]
+        self.assertTrue(spinning)
+        self.assertIn("spin (test_profiling.py:", spinning[0].split(";")[-1])
+
+    def test_admin_key_required(self):
+        self.assertEqual(self.post("/api/v1/admin/profile/sample?seconds=0.01", {}).status, 401)
+        api_key = api_key_store.create_key("profiling-test")
+        try:
+            response = self.post("/api/v1/admin/profile/sample?seconds=0.01", {"X-API-Key": api_key})
+            self.assertEqual(response.status, 403)
+        finally:
+            api_key_store.revoke_key("profiling-test")
+        response = self.post("/api/v1/admin/profile/sample?seconds=0.05")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(self.post("/api/v1/admin/profile/sample?seconds=3600").status, 400)
+
+    def test_profile_next_generate_requests(self):
+        async def scenario():
+            profile = asyncio.ensure_future(
+                asgi_request(app, "POST", "/api/v1/admin/profile/requests?requests=2&timeout=20", self.headers)
+            )
+            while profiler._capture is None:
+                await asyncio.sleep(0.01)
+            with self.assertRaises(ProfilerBusyError):
+                profiler.sample(0.01, 0.005, False)
+            for _ in range(3):
+                # Unique names so the artifact cache cannot answer instead of rendering
+                payload = {"template_name": "fastapi-minimal", "project_name": f"profiled-{uuid.uuid4().hex[:8]}",
+                           "parameters": {}}
+                response = await asgi_request(app, "POST", "/api/v1/generate", self.headers, payload)
+                self.assertEqual(response.status, 200)
+            return await profile
+
+        response = asyncio.run(scenario())
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.headers["x-profiled-requests"], "2")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "generate.pstats"
+            path.write_bytes(response.body)
+            functions = {function for _, _, function in pstats.Stats(str(path)).stats}
+        self.assertIn("prepare_generation", functions)
+        self.assertIn("stream_project_zip", functions)
+
+    def test_ticket_closed_when_follower_cannot_get_a_slot(self):
+        capture = RequestCapture(1, profile=False)
+        acquire = routes.generation_pool.acquire
+
+        async def scenario():
+            slot = await acquire()
+            payload = {"template_name": "fastapi-minimal", "project_name": f"follower-{uuid.uuid4().hex[:8]}",
+                       "parameters": {}}
+            with mock.patch.object(routes.single_flight, "join", return_value=(None, False)), \
+                    mock.patch.object(routes.single_flight, "wait", mock.AsyncMock(return_value=None)), \
+                    mock.patch.object(routes.generation_pool, "acquire",
+                                      mock.AsyncMock(side_effect=[slot, PoolSaturatedError(1)])):
+                return await asgi_request(app, "POST", "/api/v1/generate", self.headers, payload)
+
+        profiler._capture = capture
+        try:
+            response = asyncio.run(scenario())
+        finally:
+            profiler._capture = None
+        self.assertEqual(response.status, 503)
+        self.assertEqual(capture.completed, 1)
+        self.assertTrue(capture.done.is_set())
+
+    def test_memory_diff(self):
+        response = self.post("/api/v1/admin/profile/memory?seconds=0.1&limit=5")
+        self.assertEqual(response.status, 200)
+        self.assertTrue(response.body.startswith(b"# "))
+        self.assertEqual(self.post("/api/v1/admin/profile/requests?requests=1&timeout=0.1").status, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
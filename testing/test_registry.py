@@ -0,0 +1,96 @@
+import unittest
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from unittest import mock
+
+from benchmarks.asgi import asgi_request
+from services.template_service.auth.api_key import api_key_manager
+from services.template_service.main import app
+from services.template_service.utils.registry import TemplateRegistry, template_registry
+
+
+class TestTemplateRegistry(unittest.TestCase):
+    """Test cases for the in-memory template registry"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.write_template("alpha", {"description": "Alpha", "version": "1.0.0"})
+        self.registry = TemplateRegistry(templates_dir=str(self.root), check_interval=0)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_template(self, name, metadata):
+        template_dir = self.root / name
+        template_dir.mkdir(exist_ok=True)
+        (template_dir / "metadata.json").write_text(json.dumps({"name": name, **metadata}))
+        return template_dir
+
+    def test_query_filters_by_tag_and_author_and_pages(self):
+        self.write_template("alpha", {"description": "Alpha", "version": "1.0.0", "tags": ["API", "python"], "author": "Ann"})
+        self.write_template("beta", {"description": "Beta", "version": "1.0.0", "tags": ["api"], "author": "Bob"})
+        self.write_template("gamma", {"description": "Gamma", "version": "1.0.0", "tags": ["api", "python"], "author": "ann"})
+        self.registry.invalidate()
+
+        infos, cursor = self.registry.query(tags=["api"], limit=2)
+        self.assertEqual([info.name for info in infos], ["alpha", "beta"])
+        infos, cursor = self.registry.query(tags=["api"], limit=2, cursor=cursor)
+        self.assertEqual([info.name for info in infos], ["gamma"])
+        self.assertIsNone(cursor)
+
+        infos, _ = self.registry.query(tags=["python", "api"], author="ANN")
+        self.assertEqual([info.name for info in infos], ["alpha", "gamma"])
+        self.assertEqual(self.registry.query(tags=["missing"])[0], [])
+        with self.assertRaises(ValueError):
+            self.registry.query(cursor="%%%")
+
+    def test_repeated_listing_is_served_from_memory(self):
+        self.registry.list_templates()
+        self.registry.list_templates()
+        stats = self.registry.stats()
+        self.assertEqual(stats["misses"], 1)
+        self.assertEqual(stats["hits"], 1)
+
+    def test_metadata_change_invalidates_template(self):
+        self.assertEqual(self.registry.get_metadata("alpha").description, "Alpha")
+        metadata_file = self.root / "alpha" / "metadata.json"
+        metadata_file.write_text(json.dumps({"name": "alpha", "description": "Changed", "version": "1.0.1"}))
+        # Make sure the change is visible even on coarse mtime filesystems
+        stat = metadata_file.stat()
+        os.utime(metadata_file, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertEqual(self.registry.get_metadata("alpha").description, "Changed")
+
+    def test_invalidate_picks_up_new_template(self):
+        self.assertEqual([t.name for t in self.registry.list_templates()], ["alpha"])
+        self.write_template("beta", {"description": "Beta", "version": "1.0.0"})
+        self.registry.invalidate("beta")
+        self.assertEqual([t.name for t in self.registry.list_templates()], ["alpha", "beta"])
+
+    def test_missing_template_raises(self):
+        with self.assertRaises(FileNotFoundError):
+            self.registry.get_metadata("missing")
+
+
+    def test_registry_routes_run_off_the_event_loop(self):
+        threads = []
+        query = template_registry.query
+
+        def recording_query(*args):
+            threads.append(threading.current_thread())
+            return query(*args)
+
+        headers = {"X-API-Key": api_key_manager.get_api_key()}
+        with mock.patch.object(template_registry, "query", side_effect=recording_query):
+            response = asyncio.run(asgi_request(app, "GET", "/api/v1/templates?limit=1", headers))
+        self.assertEqual(response.status, 200)
+        self.assertEqual(len(threads), 1)
+        self.assertIsNot(threads[0], threading.main_thread())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from services.template_service.utils.registry import TemplateRegistry
+from services.template_service.utils.search import SearchIndex, tokenize
+
+
+class TestSearchIndex(unittest.TestCase):
+    """Test cases for full-text template search"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.write_template("fastapi-minimal", "Minimal FastAPI service", ["python", "api"])
+        self.write_template("react-app", "React frontend with a FastAPI-style mock api", ["javascript"])
+        self.write_template("go-cli", "Command line tool", ["go"], readme="Ships with a Makefile")
+        self.registry = TemplateRegistry(templates_dir=str(self.root), check_interval=0)
+        self.index = SearchIndex(self.registry, include_readme=True)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_template(self, name, description, tags, readme=None):
+        template_dir = self.root / name
+        template_dir.mkdir()
+        (template_dir / "metadata.json").write_text(json.dumps({
+            "name": name, "description": description, "version": "1.0.0", "tags": tags
+        }))
+        if readme is not None:
+            (template_dir / "README.md").write_text(readme)
+
+    def names(self, query):
+        return [info.name for info, _ in self.index.search(query)]
+
+    def test_tokenize_splits_identifiers(self):
+        self.assertEqual(tokenize("FastAPI-minimal v2"), ["fastapi", "minimal", "v2"])
+
+    def test_results_are_ranked_by_field_weight(self):
+        self.assertEqual(self.names("fastapi"), ["fastapi-minimal", "react-app"])
+        self.assertEqual(self.names("makefile"), ["go-cli"])
+        self.assertEqual(self.names("reac"), ["react-app"])
+        self.assertEqual(self.names("nothing-matches"), [])
+
+    def test_index_is_updated_incrementally(self):
+        self.index.search("api")
+        self.assertEqual(self.index.stats()["reindexed"], 3)
+
+        self.write_template("rust-api", "Axum api service", ["rust"])
+        self.registry.invalidate("rust-api")
+        self.assertIn("rust-api", self.names("axum"))
+        self.assertEqual(self.index.stats()["reindexed"], 4)
+
+        (self.root / "go-cli" / "metadata.json").unlink()
+        (self.root / "go-cli" / "README.md").unlink()
+        (self.root / "go-cli").rmdir()
+        self.registry.invalidate()
+        self.assertEqual(self.names("makefile"), [])
+        self.assertEqual(self.index.stats()["documents"], 3)
+
+    def test_readme_edits_are_picked_up(self):
+        self.assertEqual(self.names("makefile"), ["go-cli"])
+        readme = self.root / "go-cli" / "README.md"
+        readme.write_text("Ships with a justfile")
+        stat = readme.stat()
+        os.utime(readme, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        self.assertEqual(self.names("justfile"), ["go-cli"])
+        self.assertEqual(self.names("makefile"), [])
+        self.assertEqual(self.index.stats()["reindexed"], 4)
+
+if __name__ == "__main__":
+    unittest.main()
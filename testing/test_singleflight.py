@@ -0,0 +1,120 @@
+import unittest
+import asyncio
+
+from services.template_service.utils.artifact_cache import Artifact
+from services.template_service.utils.singleflight import SingleFlight
+
+
+async def chunks(*parts):
+    for part in parts:
+        await asyncio.sleep(0)
+        yield part
+
+
+class TestSingleFlight(unittest.TestCase):
+    """Test cases for single-flight request coalescing"""
+
+    def test_followers_share_the_leaders_result(self):
+        async def scenario():
+            flights = SingleFlight(timeout=5)
+            flight, leader = flights.join("key")
+            self.assertTrue(leader)
+            follower_flight, follower_leader = flights.join("key")
+            self.assertFalse(follower_leader)
+
+            waiter = asyncio.ensure_future(flights.wait(follower_flight))
+            body = flights.lead(flight, chunks(b"a", b"b"),
+                                result=lambda: Artifact(key="key", size=2, data=b"ab"))
+            self.assertEqual(b"".join([chunk async for chunk in body]), b"ab")
+            self.assertEqual((await waiter).data, b"ab")
+            self.assertEqual(flights.stats()["coalesced"], 1)
+            self.assertEqual(flights.stats()["in_flight"], 0)
+
+        asyncio.run(scenario())
+
+    def test_flight_completes_without_the_leaders_response(self):
+        async def scenario():
+            flights = SingleFlight(timeout=5)
+            flight, _ = flights.join("key")
+            follower_flight, _ = flights.join("key")
+            waiter = asyncio.ensure_future(flights.wait(follower_flight))
+            # The leader's body is never iterated, as when its client disconnects before the response starts
+            flights.lead(flight, chunks(b"a", b"b"), result=lambda: Artifact(key="key", size=2, data=b"ab"))
+            self.assertEqual((await asyncio.wait_for(waiter, 1)).data, b"ab")
+            self.assertTrue(flights.join("key")[1])
+
+        asyncio.run(scenario())
+
+    def test_failed_leader_releases_followers(self):
+        async def failing():
+            yield b"a"
+            raise RuntimeError("render failed")
+
+        async def scenario():
+            flights = SingleFlight(timeout=5)
+            flight, _ = flights.join("key")
+            follower_flight, _ = flights.join("key")
+            waiter = asyncio.ensure_future(flights.wait(follower_flight))
+            body = flights.lead(flight, failing(), result=lambda: None)
+            with self.assertRaises(RuntimeError):
+                async for _ in body:
+                    pass
+            self.assertIsNone(await waiter)
+            self.assertEqual(flights.stats()["failed"], 1)
+            self.assertTrue(flights.join("key")[1])
+
+        asyncio.run(scenario())
+    def test_producer_waits_for_a_slow_client(self):
+        produced = []
+
+        async def many():
+            for index in range(100):
+                produced.append(index)
+                yield b"x" * 10
+
+        async def scenario():
+            flights = SingleFlight(timeout=5, buffer_chunks=2)
+            flight, _ = flights.join("key")
+            body = flights.lead(flight, many(), result=lambda: None)
+            await asyncio.sleep(0.05)
+            # Nothing read yet: only the buffer (plus the chunk waiting for room) was produced
+            self.assertLessEqual(len(produced), 3)
+            self.assertEqual(len([chunk async for chunk in body]), 100)
+
+        asyncio.run(scenario())
+
+    def test_abandoned_leader_keeps_producing_without_buffering(self):
+        produced = []
+
+        async def many():
+            for index in range(100):
+                produced.append(index)
+                yield b"x" * 10
+
+        async def scenario():
+            flights = SingleFlight(timeout=5, buffer_chunks=2)
+            flight, _ = flights.join("key")
+            follower_flight, _ = flights.join("key")
+            waiter = asyncio.ensure_future(flights.wait(follower_flight))
+            body = flights.lead(flight, many(), result=lambda: Artifact(key="key", size=1000, data=b""))
+            await body.__anext__()
+            await body.aclose()
+            self.assertIsNotNone(await asyncio.wait_for(waiter, 1))
+            self.assertEqual(len(produced), 100)
+
+        asyncio.run(scenario())
+
+    def test_unstarted_body_does_not_stall_the_producer(self):
+        async def scenario():
+            flights = SingleFlight(timeout=5, buffer_chunks=1)
+            flight, _ = flights.join("key")
+            follower_flight, _ = flights.join("key")
+            waiter = asyncio.ensure_future(flights.wait(follower_flight))
+            flights.lead(flight, chunks(*[b"a"] * 10), result=lambda: Artifact(key="key", size=10, data=b"a" * 10))
+            self.assertEqual((await asyncio.wait_for(waiter, 1)).size, 10)
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,66 @@
+import unittest
+import os
+import tempfile
+from pathlib import Path
+
+import zlib
+
+from services.template_service.utils.snapshot import compile_snapshot, file_entry, render_file, template_fingerprint
+
+
+class TestTemplateSnapshot(unittest.TestCase):
+    """Test cases for precompiled template snapshots"""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.template_path = Path(self.temp_dir.name) / "demo"
+        (self.template_path / "app").mkdir(parents=True)
+        (self.template_path / "app" / "main.py").write_text('TITLE = "{{PROJECT_NAME}}"\nPORT = {{port}}\n')
+        (self.template_path / "index.js").write_text('const name = "{{PROJECT_NAME}}";\n')
+        (self.template_path / "logo.bin").write_bytes(b"\xff\xfe{{PROJECT_NAME}}")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_snapshot_records_placeholders_for_templated_files_only(self):
+        snapshot = compile_snapshot("demo", self.template_path)
+        files = {f.path: f for f in snapshot.files}
+        self.assertEqual(sorted(files), ["app/main.py", "index.js", "logo.bin"])
+        self.assertEqual(files["app/main.py"].template.names, ("PROJECT_NAME", "port"))
+        self.assertIsNone(files["index.js"].template)
+        self.assertEqual(snapshot.placeholder_names, {"PROJECT_NAME", "port"})
+        self.assertFalse(files["logo.bin"].is_text)
+
+    def test_static_files_are_precompressed_at_build(self):
+        (self.template_path / "static.py").write_text("VALUE = 1\n" * 100)
+        snapshot = compile_snapshot("demo", self.template_path)
+        files = {f.path: f for f in snapshot.files}
+        static = files["static.py"]
+        self.assertEqual(static.crc, zlib.crc32(static.data))
+        self.assertEqual(len(static.compressed), 1)
+        self.assertIsNone(files["app/main.py"].crc)
+        self.assertEqual(files["app/main.py"].compressed, {})
+
+        level, entry = next(iter(static.compressed.items()))
+        method, payload, crc, size = file_entry(static, {}, level)
+        self.assertIs(payload, entry[1])
+        self.assertEqual(zlib.decompress(payload, -zlib.MAX_WBITS), static.data)
+        self.assertEqual((crc, size), (static.crc, len(static.data)))
+
+    def test_render_substitutes_known_values(self):
+        snapshot = compile_snapshot("demo", self.template_path)
+        main = next(f for f in snapshot.files if f.path == "app/main.py")
+        rendered = render_file(main, {"PROJECT_NAME": b"acme"})
+        self.assertEqual(rendered, b'TITLE = "acme"\nPORT = {{port}}\n')
+
+    def test_fingerprint_changes_when_a_file_changes(self):
+        before = template_fingerprint(self.template_path)
+        main = self.template_path / "app" / "main.py"
+        main.write_text("changed\n")
+        stat = main.stat()
+        os.utime(main, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+        self.assertNotEqual(before, template_fingerprint(self.template_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
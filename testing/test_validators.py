@@ -0,0 +1,94 @@
+import unittest
+from unittest import mock
+
+from services.template_service.models.schemas import TemplateMetadata, TemplateParameter
+from services.template_service.utils.template_service import validate_batch, validate_parameters
+from services.template_service.utils.validators import ParameterValidationError, ParameterValidator, validator_cache
+
+
+def metadata(*parameters, **fields):
+    return TemplateMetadata(name="demo", description="Demo", version="1.0.0", parameters=list(parameters), **fields)
+
+
+class TestParameterValidator(unittest.TestCase):
+    """Test cases for compiled parameter validators"""
+
+    def test_coercion_and_defaults(self):
+        validator = ParameterValidator(metadata(
+            TemplateParameter(name="port", type="integer", description="Port", default=8000),
+            TemplateParameter(name="debug", type="boolean", description="Debug"),
+            TemplateParameter(name="ratio", type="number", description="Ratio", required=False),
+            TemplateParameter(name="title", type="string", description="Title", default="App", required=False),
+        ))
+        result = validator.validate({"debug": "yes", "ratio": "0.5"})
+        self.assertEqual(result, {"port": 8000, "debug": True, "ratio": 0.5, "title": "App"})
+        self.assertEqual(validator.validate({"debug": 0, "port": "81", "ratio": "3"})["ratio"], 3)
+
+    def test_all_errors_reported_in_one_pass(self):
+        validator = ParameterValidator(metadata(
+            TemplateParameter(name="name", type="string", description="Name", pattern="[a-z][a-z0-9-]*"),
+            TemplateParameter(name="port", type="integer", description="Port", minimum=1, maximum=65535),
+            TemplateParameter(name="db", type="string", description="Database", enum=["postgres", "sqlite"]),
+            TemplateParameter(name="owner", type="string", description="Owner"),
+        ))
+        with self.assertRaises(ParameterValidationError) as raised:
+            validator.validate({"name": "My App", "port": 70000, "db": "mysql"})
+        self.assertEqual([error["parameter"] for error in raised.exception.errors], ["name", "port", "db", "owner"])
+        self.assertIn("Required parameter 'owner' is missing", str(raised.exception))
+
+    def test_unknown_parameter_policies(self):
+        parameters = [TemplateParameter(name="port", type="integer", description="Port")]
+        self.assertEqual(ParameterValidator(metadata(*parameters)).validate({"port": 1, "extra": 2}),
+                         {"port": 1, "extra": 2})
+        self.assertEqual(ParameterValidator(metadata(*parameters), "ignore").validate({"port": 1, "extra": 2}),
+                         {"port": 1})
+        with self.assertRaises(ParameterValidationError) as raised:
+            ParameterValidator(metadata(*parameters, unknown_parameters="reject")).validate({"port": 1, "extra": 2})
+        self.assertEqual(raised.exception.errors[0]["parameter"], "extra")
+
+    def test_any_parameter_name_is_accepted(self):
+        # Names that cannot appear in a {{marker}} are passed through unused, as before
+        validator = ParameterValidator(metadata(TemplateParameter(name="my key", type="string", description="Key")))
+        self.assertEqual(validator.validate({"my key": "x", "bad key!": 1}), {"my key": "x", "bad key!": 1})
+
+    def test_invalid_pattern_is_a_value_error(self):
+        with self.assertRaises(ValueError):
+            TemplateParameter(name="name", type="string", description="Name", pattern="[a-z")
+        unchecked = TemplateParameter.model_construct(name="name", type="string", description="Name",
+                                                      pattern="[a-z", enum=None, minimum=None, maximum=None,
+                                                      required=True, default=None)
+        with self.assertRaises(ValueError):
+            ParameterValidator(metadata(unchecked))
+
+    def test_validator_is_compiled_once(self):
+        validate_parameters("fastapi-minimal", {})
+        compiles = validator_cache.stats()["compiles"]
+        validate_parameters("fastapi-minimal", {})
+        self.assertEqual(validator_cache.stats()["compiles"], compiles)
+
+    def test_batch_reports_each_item(self):
+        results = validate_batch([
+            ("python-cli", {}),
+            ("fastapi-minimal", {"extra": 1}),
+            ("no-such-template", {}),
+            ("python-cli", {}),
+        ])
+        self.assertEqual([result.valid for result in results], [False, True, False, False])
+        self.assertTrue(all(error.parameter for error in results[0].errors))
+        self.assertIsNone(results[2].errors[0].parameter)
+        self.assertIs(results[3], results[0])
+
+    def test_batch_survives_unexpected_errors(self):
+        def broken(template_name, parameters):
+            if template_name == "python-cli":
+                raise OSError("metadata unreadable")
+            return validate_parameters(template_name, parameters)
+
+        with mock.patch("services.template_service.utils.template_service.validate_parameters", broken):
+            results = validate_batch([("python-cli", {}), ("fastapi-minimal", {})])
+        self.assertEqual([result.valid for result in results], [False, True])
+        self.assertIn("metadata unreadable", results[0].errors[0].message)
+
+
+if __name__ == "__main__":
+    unittest.main()
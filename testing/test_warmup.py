@@ -0,0 +1,76 @@
+import asyncio
+import unittest
+from unittest import mock
+
+from benchmarks.asgi import asgi_request
+from services.template_service.api import routes
+from services.template_service.main import app
+from services.template_service.utils.registry import template_registry
+from services.template_service.utils.snapshot import snapshot_store
+from services.template_service.utils.validators import validator_cache
+from services.template_service.utils.warmup import COLD, DEGRADED, READY, Warmup
+
+
+class TestWarmup(unittest.TestCase):
+    """Test cases for startup warm-up and readiness"""
+
+    def test_run_compiles_every_template(self):
+        warmup = Warmup(workers=4)
+        warmup.run()
+        self.assertEqual(warmup.state, READY)
+        names = template_registry.names()
+        self.assertEqual(warmup.templates, len(names))
+        self.assertGreaterEqual(validator_cache.stats()["validators"], len(names))
+        self.assertGreaterEqual(snapshot_store.stats()["snapshots"], len(names))
+
+    def test_broken_template_is_reported_not_fatal(self):
+        warmup = Warmup(workers=2)
+        original = snapshot_store.get
+
+        def get(name):
+            if name == "python-cli":
+                raise ValueError("corrupt")
+            return original(name)
+
+        with mock.patch.object(snapshot_store, "get", side_effect=get):
+            warmup.run()
+        self.assertTrue(warmup.ready)
+        self.assertEqual(warmup.failures, {"python-cli": "ValueError: corrupt"})
+
+    def test_failed_scan_is_retried(self):
+        warmup = Warmup(workers=2, attempts=3, backoff=0.01)
+        original = template_registry.names
+        with mock.patch.object(template_registry, "names", side_effect=[OSError("busy"), original()]):
+            warmup.run()
+        self.assertEqual(warmup.state, READY)
+        self.assertTrue(warmup.status()["warm"])
+        self.assertEqual(warmup.status()["attempts"], 2)
+        self.assertNotIn("error", warmup.status())
+
+    def test_exhausted_retries_report_ready(self):
+        warmup = Warmup(workers=2, attempts=2, backoff=0.01)
+        with mock.patch.object(template_registry, "names", side_effect=OSError("gone")):
+            warmup.run()
+        self.assertEqual(warmup.state, DEGRADED)
+        self.assertTrue(warmup.ready)
+        self.assertEqual(warmup.status()["error"], "OSError: gone")
+        with mock.patch.object(routes, "warmup", warmup):
+            response = asyncio.run(asgi_request(app, "GET", "/readyz"))
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.json()["status"], DEGRADED)
+        self.assertFalse(response.json()["warm"])
+
+    def test_readyz_is_public_and_waits_for_warmup(self):
+        warmup = Warmup()
+        with mock.patch.object(routes, "warmup", warmup):
+            response = asyncio.run(asgi_request(app, "GET", "/readyz"))
+            self.assertEqual(response.status, 503)
+            self.assertEqual(response.json()["status"], COLD)
+            warmup.run()
+            response = asyncio.run(asgi_request(app, "GET", "/readyz"))
+        self.assertEqual(response.status, 200)
+        self.assertEqual(response.json()["status"], READY)
+
+
+if __name__ == "__main__":
+    unittest.main()
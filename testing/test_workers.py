@@ -0,0 +1,40 @@
+import unittest
+import asyncio
+
+from services.template_service.utils.workers import GenerationPool, PoolSaturatedError
+
+
+class TestGenerationPool(unittest.TestCase):
+    """Test cases for the bounded generation pool"""
+
+    def test_requests_over_the_queue_cap_are_rejected(self):
+        async def scenario():
+            pool = GenerationPool(max_workers=1, max_queue=1, retry_after=3)
+            first = await pool.acquire()
+            queued = asyncio.ensure_future(pool.acquire())
+            await asyncio.sleep(0)
+            self.assertEqual(pool.waiting, 1)
+            with self.assertRaises(PoolSaturatedError) as raised:
+                await pool.acquire()
+            self.assertEqual(raised.exception.retry_after, 3)
+            first.release()
+            second = await queued
+            second.release()
+            self.assertEqual(pool.stats()["rejected"], 1)
+
+        asyncio.run(scenario())
+
+    def test_stream_runs_iterator_and_releases_slot(self):
+        async def scenario():
+            pool = GenerationPool(max_workers=1, max_queue=0)
+            slot = await pool.acquire()
+            chunks = [chunk async for chunk in pool.stream(slot, iter([b"a", b"b"]))]
+            self.assertEqual(chunks, [b"a", b"b"])
+            self.assertEqual(pool.active, 0)
+            (await pool.acquire()).release()
+
+        asyncio.run(scenario())
+
+
+if __name__ == "__main__":
+    unittest.main()